@@ -0,0 +1,243 @@
+"""
+solux 회계 관리 시스템 - 거래 데이터 집계
+DB 조회 결과를 숫자형 DataFrame으로 바꾸고 벡터 연산으로 집계 (Streamlit 의존 없음)
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+TRANSACTION_COLUMNS = ['id', 'created_at', 'transaction_date', 'transaction_type', 'amount', 'category', 'description']
+
+
+def to_typed_frame(rows, columns=TRANSACTION_COLUMNS):
+    """조회 결과(dict 목록)를 날짜/금액이 숫자형인 DataFrame으로 변환
+
+    DECIMAL 금액은 Decimal 객체(object 열)로 오므로 float64로 한 번만 변환한다
+    (pd.to_numeric보다 astype이 Decimal 변환에서 훨씬 빠름).
+    원 단위 금액은 2**53 이하에서 float64로 정확히 표현된다.
+    """
+    df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=columns)
+    if 'transaction_date' in df.columns:
+        df['transaction_date'] = pd.to_datetime(df['transaction_date'])
+    if 'amount' in df.columns:
+        df['amount'] = df['amount'].astype('float64')
+    return df
+
+
+def summarize_transactions(df):
+    """거래 목록의 수입/지출 합계, 카테고리별, 일자별 집계
+
+    반환값: (totals dict, 카테고리별 DataFrame, 일자별 DataFrame)
+    """
+    if df.empty:
+        empty = pd.DataFrame(columns=['수입', '지출'])
+        return {'income': 0.0, 'expense': 0.0, 'net': 0.0}, empty, empty
+
+    by_type = df.groupby('transaction_type', observed=True)['amount'].sum()
+    income = float(by_type.get('수입', 0.0))
+    expense = float(by_type.get('지출', 0.0))
+
+    by_category = (
+        df.groupby(['category', 'transaction_type'], observed=True)['amount'].sum()
+        .unstack('transaction_type', fill_value=0.0)
+        .reindex(columns=['수입', '지출'], fill_value=0.0)
+    )
+    by_category = by_category.loc[(by_category['수입'] + by_category['지출']).sort_values(ascending=False).index]
+
+    by_day = (
+        df.groupby([df['transaction_date'].dt.normalize(), 'transaction_type'], observed=True)['amount'].sum()
+        .unstack('transaction_type', fill_value=0.0)
+        .reindex(columns=['수입', '지출'], fill_value=0.0)
+        .sort_index(ascending=False)
+    )
+
+    totals = {'income': income, 'expense': expense, 'net': income - expense}
+    return totals, by_category, by_day
+
+
+@dataclass
+class MonthlyStats:
+    """한 달의 일자별 추이, 카테고리별 합계, 수입/지출 합계
+
+    daily: 날짜 x 유형(수입/지출) 표 (차트용)
+    categories: category, transaction_type, total 열 (유형별 합계 내림차순)
+    """
+    year_month: str
+    daily: pd.DataFrame = field(default_factory=pd.DataFrame)
+    categories: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=['category', 'transaction_type', 'total']))
+    income: float = 0.0
+    expense: float = 0.0
+
+    @property
+    def balance(self):
+        return self.income - self.expense
+
+    @property
+    def empty(self):
+        return self.daily.empty and self.categories.empty
+
+    @classmethod
+    def from_rows(cls, year_month, rows):
+        """get_monthly_stats의 UNION ALL 결과(kind가 'day' 또는 'category')로 생성"""
+        df = pd.DataFrame(rows, columns=['kind', 'transaction_date', 'transaction_type', 'category', 'total'])
+        if df.empty:
+            return cls(year_month)
+        df['total'] = df['total'].astype('float64')
+
+        days = df[df['kind'] == 'day']
+        daily = days.pivot_table(
+            index='transaction_date',
+            columns='transaction_type',
+            values='total',
+            aggfunc='sum'
+        ).fillna(0) if not days.empty else pd.DataFrame()
+
+        categories = (
+            df.loc[df['kind'] == 'category', ['category', 'transaction_type', 'total']]
+            .sort_values(['transaction_type', 'total'], ascending=[True, False])
+            .reset_index(drop=True)
+        )
+        by_type = categories.groupby('transaction_type')['total'].sum()
+        return cls(
+            year_month,
+            daily=daily,
+            categories=categories,
+            income=float(by_type.get('수입', 0.0)),
+            expense=float(by_type.get('지출', 0.0)),
+        )
+
+
+def balance_frame(rows, opening, start_date, end_date):
+    """거래일별 잔고 행(fetch_balance_series)을 기간의 모든 날짜에 대한 '잔고' 열 DataFrame으로
+
+    거래가 없는 날은 직전 거래일 잔고를, 기간 첫 거래일 이전은 opening(시작 전날 잔고)을 쓴다.
+    """
+    days = pd.date_range(start_date, end_date, freq='D')
+    if rows:
+        df = pd.DataFrame(rows, columns=['balance_date', 'net_amount', 'balance'])
+        balance = pd.Series(df['balance'].astype('float64').to_numpy(), index=pd.to_datetime(df['balance_date']))
+    else:
+        balance = pd.Series(dtype='float64')
+    balance = balance.reindex(days).ffill().fillna(float(opening))
+    return pd.DataFrame({'잔고': balance.to_numpy()}, index=days.date)
+
+
+TRANSACTION_TYPES = ['수입', '지출']
+
+# 학기 구분: 1학기 3~8월(여름방학 포함), 2학기 9월~다음 해 2월(겨울방학 포함, 학년도는 9월이 속한 해)
+SPRING_TERM_MONTHS = (3, 8)
+
+
+def month_totals_frame(rows):
+    """월별 합계 행(fetch_monthly_totals)을 월 1일 x (유형, 카테고리) 금액 표로"""
+    df = pd.DataFrame(rows, columns=['month_start', 'transaction_type', 'category', 'total'])
+    df['month_start'] = pd.to_datetime(df['month_start'])
+    df['total'] = df['total'].astype('float64')
+    return df.pivot_table(
+        index='month_start', columns=['transaction_type', 'category'], values='total', aggfunc='sum', fill_value=0.0
+    )
+
+
+def semester_labels(months):
+    """월 1일 인덱스의 학기 이름 ('2024-1학기', 1~2월은 전년도 2학기)"""
+    month = pd.Series(months.month, index=months)
+    year = months.year - (month < SPRING_TERM_MONTHS[0])
+    term = month.between(*SPRING_TERM_MONTHS).map({True: '1', False: '2'})
+    return year.astype(str) + '-' + term + '학기'
+
+
+def _change_rate(current, base):
+    """증감률(%), 기준값이 0이면 NaN"""
+    return (current - base).div(base.where(base != 0)) * 100
+
+
+@dataclass
+class TrendStats:
+    """여러 해의 월별 수입/지출 추이와 비교 지표
+
+    categories: 월 1일 x (유형, 카테고리) 합계 (거래 없는 달도 0으로 채운 연속 구간)
+    monthly: 월 1일 x 수입/지출/잔액 합계
+    전월/전년 동월 비교는 표 전체를 shift한 벡터 연산이라 기간 길이와 관계없이 같은 방식으로 계산한다.
+    """
+    categories: pd.DataFrame = field(default_factory=pd.DataFrame)
+    monthly: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=TRANSACTION_TYPES + ['잔액']))
+
+    @property
+    def empty(self):
+        return self.monthly.empty
+
+    @classmethod
+    def from_frames(cls, frames, end_month):
+        """month_totals_frame 표들(지난 달들, 이번 달)을 합쳐 end_month까지의 연속 구간으로"""
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return cls()
+        categories = pd.concat(frames).fillna(0.0)
+        categories = categories.groupby(level=0).sum().sort_index(axis=1)
+        months = pd.date_range(categories.index.min(), pd.Timestamp(end_month), freq='MS')
+        categories = categories.reindex(months, fill_value=0.0)
+
+        monthly = categories.T.groupby(level='transaction_type').sum().T.reindex(columns=TRANSACTION_TYPES, fill_value=0.0)
+        monthly['잔액'] = monthly['수입'] - monthly['지출']
+        monthly.columns.name = None
+        return cls(categories=categories, monthly=monthly)
+
+    def rolling(self, window):
+        """수입/지출의 window개월 이동 평균 (앞쪽 window-1개월은 NaN)"""
+        return self.monthly[TRANSACTION_TYPES].rolling(window, min_periods=window).mean()
+
+    def chart_frame(self, months=None):
+        """월별 수입/지출과 3/12개월 이동 평균 (최근 months개월, charts.SERIES_STYLES 열 이름)"""
+        chart = self.monthly[TRANSACTION_TYPES].copy()
+        for window in (3, 12):
+            averages = self.rolling(window)
+            for column in TRANSACTION_TYPES:
+                chart[f"{column} {window}개월 평균"] = averages[column]
+        chart = chart.iloc[-months:] if months else chart
+        chart.index = chart.index.date
+        return chart
+
+    def month_summary(self, month):
+        """month의 유형별 합계와 전월/전년 동월 대비 (행: 수입/지출/잔액)"""
+        month = pd.Timestamp(month)
+        current = self.monthly.reindex([month]).fillna(0.0).iloc[0]
+        previous = self.monthly.shift(1).reindex([month]).fillna(0.0).iloc[0]
+        last_year = self.monthly.shift(12).reindex([month]).fillna(0.0).iloc[0]
+        return pd.DataFrame({
+            '이번 달': current,
+            '전월': previous,
+            '전월 대비(%)': _change_rate(current, previous),
+            '전년 동월': last_year,
+            '전년 대비(%)': _change_rate(current, last_year),
+        })
+
+    def category_comparison(self, month):
+        """month의 카테고리별 합계와 전월/전년 동월 대비 (유형, 이번 달 금액 내림차순)"""
+        month = pd.Timestamp(month)
+        rows = [self.categories.shift(periods).reindex([month]).fillna(0.0).iloc[0] for periods in (0, 1, 12)]
+        current, previous, last_year = rows
+        table = pd.DataFrame({
+            '이번 달': current,
+            '전월': previous,
+            '전월 대비(%)': _change_rate(current, previous),
+            '전년 동월': last_year,
+            '전년 대비(%)': _change_rate(current, last_year),
+        })
+        table = table[(table[['이번 달', '전월', '전년 동월']] != 0).any(axis=1)]
+        return (
+            table.reset_index()
+            .rename(columns={'transaction_type': '유형', 'category': '카테고리'})
+            .sort_values(['유형', '이번 달'], ascending=[True, False])
+            .reset_index(drop=True)
+        )
+
+    def semesters(self):
+        """학기별 수입/지출/잔액 합계와 전년도 같은 학기 대비 (semester_labels 참고, 진행 중인 학기는 지금까지의 합계)"""
+        if self.empty:
+            return pd.DataFrame(columns=TRANSACTION_TYPES + ['잔액', '지출 전년 대비(%)'])
+        table = self.monthly.groupby(semester_labels(self.monthly.index)).sum()
+        # 학기는 1년에 두 번이므로 두 칸 앞이 전년도 같은 학기
+        table['지출 전년 대비(%)'] = _change_rate(table['지출'], table['지출'].shift(2))
+        table.index.name = '학기'
+        return table
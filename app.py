@@ -5,13 +5,27 @@ Python 3.8-3.9 + MySQL + Streamlit
 
 import streamlit as st
 import pymysql
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, date
-import calendar
+import os
+import threading
+from functools import partial
+from datetime import datetime, date, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# pandas(analytics, ledger_import)와 matplotlib(charts)는 처음 쓰는 화면에서 불러옴
+# (콜드 스타트와 차트가 없는 거래 입력 화면이 이 비용을 치르지 않도록, benchmarks/bench_import.py로 확인)
+from db import ConnectionPool, month_range
+from storage import TREND_START, open_storage
+from budget import ALL_MONTHS, TOTAL_CATEGORY, BudgetEngine
+from write_queue import QUEUE_PATH, WriteQueue
+from prefetch import Prefetcher
+from search import search_terms
+from query_cache import QueryCache, cached
+from ledger_export import export_ledger, new_export_path, remove_stale_exports
+from instrumentation import (
+    InstrumentedConnection, Recorder, activate, configure_sinks, deactivate, emit, sinks_configured, span
+)
+
 # 페이지 설정
 st.set_page_config(
     page_title="solux 회계 관리",
@@ -20,170 +34,382 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def get_connection():
-    """데이터베이스 연결 함수"""
-    try:
-        # Streamlit Cloud secrets에서 데이터베이스 정보 읽기
-        connection = pymysql.connect(
-            host=st.secrets["db"]["host"],
-            port=int(st.secrets["db"]["port"]),
-            user=st.secrets["db"]["user"],
-            password=st.secrets["db"]["password"],
-            database=st.secrets["db"]["database"],
+@st.cache_resource
+def get_pool():
+    """세션/재실행 간에 공유되는 연결 풀"""
+    db_secrets = st.secrets["db"]
+    return ConnectionPool(
+        connect_kwargs=dict(
+            host=db_secrets["host"],
+            port=int(db_secrets["port"]),
+            user=db_secrets["user"],
+            password=db_secrets["password"],
+            database=db_secrets["database"],
             charset='utf8mb4',
             cursorclass=pymysql.cursors.DictCursor
-        )
-        return connection
-    except Exception as e:
-        st.error(f"데이터베이스 연결 실패: {str(e)}")
-        return None
+        ),
+        max_size=int(db_secrets.get("pool_size", 5)),
+        idle_timeout=int(db_secrets.get("pool_idle_timeout", 300)),
+        connection_class=InstrumentedConnection
+    )
 
-def check_duplicate_transaction(transaction_date, transaction_type, amount, category, description):
-    """중복 거래 확인"""
-    connection = get_connection()
-    if not connection:
-        return False
-    
+@st.cache_resource
+def setup_perf_sinks():
+    """secrets.toml의 [perf] 섹션으로 성능 기록 파일 설정 (없으면 패널에만 표시)"""
+    perf_secrets = st.secrets.get("perf", {})
+    configure_sinks(
+        log_file=perf_secrets.get("log_file"),
+        prom_file=perf_secrets.get("prom_file"),
+        max_bytes=int(perf_secrets.get("log_max_bytes", 1024 * 1024)),
+        backup_count=int(perf_secrets.get("log_backup_count", 5))
+    )
+    return sinks_configured()
+
+def _storage_secrets():
+    """secrets.toml의 [storage] 섹션"""
     try:
-        with connection.cursor() as cursor:
-            sql = """
-            SELECT COUNT(*) as count FROM transactions 
-            WHERE transaction_date = %s 
-            AND transaction_type = %s 
-            AND amount = %s 
-            AND category = %s 
-            AND description = %s
-            """
-            cursor.execute(sql, (transaction_date, transaction_type, amount, category, description))
-            result = cursor.fetchone()
-            return result['count'] > 0
-    except Exception as e:
-        st.error(f"중복 확인 중 오류: {str(e)}")
-        return False
-    finally:
-        connection.close()
+        return st.secrets.get("storage", {})
+    except Exception:
+        # secrets.toml이 없는 오프라인 환경
+        return {}
 
-def check_monthly_expense_limit(transaction_date, amount):
-    """월별 지출 한도 확인 (200,000원)"""
-    connection = get_connection()
-    if not connection:
-        return False, 0
-    
+@st.cache_resource
+def get_storage():
+    """저장소 백엔드 (secrets.toml의 [storage] backend 또는 SOLUX_STORAGE 환경 변수, 기본 mysql)
+
+    embedded는 MySQL 없이 로컬 SQLite 파일로 동작한다 (오프라인 사용/테스트용).
+    archive_dir은 manage.py archive로 보관한 지난 회계연도 파일 디렉토리 (기본 data/archive).
+    """
+    storage_secrets = _storage_secrets()
+    backend = os.environ.get("SOLUX_STORAGE") or storage_secrets.get("backend", "mysql")
+    return open_storage(backend, pool_factory=get_pool, path=storage_secrets.get("path"),
+                        archive_dir=storage_secrets.get("archive_dir"))
+
+@st.cache_resource
+def get_budget_engine():
+    """세션/재실행 간에 공유되는 예산 엔진 (한도와 월/카테고리별 지출 누계를 메모리에 유지)"""
+    return BudgetEngine(get_storage())
+
+def save_transaction(transaction_date, transaction_type, amount, category, description, allow_over_limit=False):
+    """예산 한도 사전 확인(메모리 누계), 저장, 예산 누계 반영
+
+    저장은 그 달 지출 요약 행을 잠근 트랜잭션 안에서 한도를 다시 확인하므로(중복은 유니크 키로 판단),
+    다른 프로세스의 저장으로 엔진 누계가 뒤처져 있어도 한도를 넘겨 저장하지 않는다.
+    DB 저장은 예산 엔진 잠금 밖에서 하므로 다른 세션의 저장과 대시보드 조회를 막지 않는다.
+    저장 대기열을 켠 경우 DB 대신 로컬 대기열에 기록하고 바로 반환한다 ('queued', 사전 확인만 적용).
+    반환값: (상태, 한도를 넘는 BudgetStatus 목록) - 상태는 'saved', 'queued', 'duplicate', 'over_limit', 'error' 중 하나
+    """
+    queue = get_write_queue()
     try:
-        with connection.cursor() as cursor:
-            # 해당 월의 총 지출 계산
-            year_month = transaction_date.strftime('%Y-%m')
-            sql = """
-            SELECT COALESCE(SUM(amount), 0) as total_expense 
-            FROM transactions 
-            WHERE transaction_type = '지출' 
-            AND DATE_FORMAT(transaction_date, '%%Y-%%m') = %s
-            """
-            cursor.execute(sql, (year_month,))
-            result = cursor.fetchone()
-            current_total = result['total_expense']
-            
-            # 새로운 거래 추가 시 총액
-            new_total = current_total + amount
-            return new_total > 200000, new_total
+        engine = get_budget_engine()
+        if queue is not None:
+            # 로컬 저널 기록은 짧으므로 사전 확인부터 대기 지출 반영까지 엔진을 잠근 채 처리
+            with engine.writing():
+                exceeded = engine.check(transaction_date, transaction_type, amount, category)
+                if exceeded and not allow_over_limit:
+                    return 'over_limit', exceeded
+                # 중복은 대기열 안에서, 그리고 반영할 때 unique_transaction 키로 판단
+                status = queue.enqueue(transaction_date, transaction_type, amount, category, description)
+                if status == 'queued':
+                    engine.add_pending(transaction_date, transaction_type, amount, category, description)
+            return status, exceeded
+
+        exceeded = engine.check(transaction_date, transaction_type, amount, category)
+        if exceeded and not allow_over_limit:
+            return 'over_limit', exceeded
+        loads = engine.loads
+        status, exceeded = get_storage().save_transaction(
+            transaction_date, transaction_type, amount, category, description,
+            allow_over_limit=allow_over_limit
+        )
+        if status == 'over_limit':
+            # 사전 확인은 통과했으므로 다른 프로세스의 저장이 아직 누계에 없음
+            engine.reload()
+            return status, exceeded
+        if status == 'saved':
+            engine.record(transaction_date, transaction_type, amount, category, since=loads)
     except Exception as e:
-        st.error(f"월별 지출 확인 중 오류: {str(e)}")
-        return False, 0
-    finally:
-        connection.close()
+        if queue is None:
+            st.error(f"거래 저장 중 오류: {str(e)}")
+            return 'error', []
+        # 예산 누계를 처음 읽지 못한 경우(DB 연결 불가)에도 입력한 거래는 대기열에 보관
+        st.warning(f"예산을 확인하지 못해 한도 확인 없이 대기열에 넣습니다: {str(e)}")
+        try:
+            status = queue.enqueue(transaction_date, transaction_type, amount, category, description)
+            if status == 'queued':
+                get_budget_engine().add_pending(transaction_date, transaction_type, amount, category, description)
+            return status, []
+        except Exception as e:
+            st.error(f"거래 저장 중 오류: {str(e)}")
+            return 'error', []
+    if status == 'saved':
+        invalidate_cache(transaction_date, category)
+    return status, exceeded
 
-def insert_transaction(transaction_date, transaction_type, amount, category, description):
-    """거래 내역 저장"""
-    connection = get_connection()
-    if not connection:
-        return False
+@st.cache_resource
+def get_write_queue():
+    """로컬 저장 대기열 ([storage] write_queue = true 또는 SOLUX_WRITE_QUEUE=1일 때, 아니면 None)
+
+    만들면서 반영 스레드를 시작하므로, 이전 실행에서 남은 항목은 앱이 다시 뜨자마자 반영된다.
+    """
+    storage_secrets = _storage_secrets()
+    enabled = os.environ.get("SOLUX_WRITE_QUEUE") or storage_secrets.get("write_queue", False)
+    if str(enabled).lower() in ('', '0', 'false', 'no'):
+        return None
+    queue = WriteQueue(storage_secrets.get("queue_path", QUEUE_PATH))
+    # 반영 스레드에서 호출되므로 cache_resource 객체를 미리 잡아 둠
+    cache = get_query_cache()
+    engine = get_budget_engine()
     
+    # 이전 실행에서 남은 항목도 반영될 때까지 예산 사전 확인에 포함
+    for row in queue.pending_rows():
+        engine.add_pending(*row)
+    
+    def on_flushed(saved, duplicates, failed):
+        for transaction_date, _, _, category, _ in saved:
+            cache.invalidate(*write_tags(transaction_date, category))
+        engine.queue_flushed(saved, duplicates, failed)
+    
+    queue.start(get_storage(), on_flushed=on_flushed)
+    return queue
+
+def get_budget_statuses(year_month):
+    """그 달 예산 항목별 한도/지출/남은 금액 (메모리 누계, DB 조회 없음)"""
     try:
-        with connection.cursor() as cursor:
-            sql = """
-            INSERT INTO transactions (transaction_date, transaction_type, amount, category, description)
-            VALUES (%s, %s, %s, %s, %s)
-            """
-            cursor.execute(sql, (transaction_date, transaction_type, amount, category, description))
-            connection.commit()
-            return True
+        return get_budget_engine().statuses(year_month)
     except Exception as e:
-        st.error(f"거래 저장 중 오류: {str(e)}")
-        return False
-    finally:
-        connection.close()
+        st.error(f"예산 조회 중 오류: {str(e)}")
+        return []
 
-def get_transactions(limit=100):
-    """거래 내역 조회"""
-    connection = get_connection()
-    if not connection:
-        return pd.DataFrame()
+@st.cache_resource
+def get_query_cache():
+    """세션/재실행 간에 공유되는 조회 결과 캐시"""
+    return QueryCache(max_entries=256)
+
+def write_tags(transaction_date, category):
+    """거래 쓰기로 바뀌는 캐시 태그 (지난 달 거래면 추이 분석의 지난 달 합계 표도)"""
+    year_month = transaction_date.strftime('%Y-%m')
+    tags = ['transactions', f"month:{year_month}", f"category:{category}", 'balance']
+    if year_month < date.today().strftime('%Y-%m'):
+        tags.append('closed_months')
+    return tags
+
+def invalidate_cache(transaction_date, category):
+    """거래 쓰기 후 해당 월/카테고리와 관련된 캐시 항목 제거"""
+    get_query_cache().invalidate(*write_tags(transaction_date, category))
+
+@cached(get_query_cache, ttl=30, tags=lambda limit=100: ['transactions'])
+def _fetch_transactions(limit=100):
+    import pandas as pd
+    rows = get_storage().fetch_transactions(limit)
+    with span('frame', '거래 내역 DataFrame'):
+        return pd.DataFrame(rows)
+
+def _transaction_page_tags(*args, **kwargs):
+    return ['transactions']
+
+@cached(get_query_cache, ttl=30, tags=_transaction_page_tags)
+def _fetch_transaction_page(transaction_type, category, start_date, end_date, page_size, cursor, direction):
+    from analytics import to_typed_frame
+    # 한 행 더 읽어 해당 방향으로 다음 페이지가 있는지 판단
+    rows = get_storage().fetch_transaction_page(
+        transaction_type, category, start_date, end_date, page_size + 1, cursor, direction
+    )
     
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == 'prev':
+        rows.reverse()
+    with span('frame', '거래 목록 DataFrame'):
+        return to_typed_frame(rows), has_more
+
+def get_transaction_page(transaction_type=None, category=None, start_date=None, end_date=None,
+                         page_size=50, cursor=None, direction='next'):
+    """거래 내역 한 페이지 조회 (SQL 필터 + 키셋 페이지네이션)
+
+    cursor: 기준 행의 (transaction_date, created_at, id), None이면 첫 페이지
+    direction: 'next'는 기준 행보다 과거, 'prev'는 기준 행보다 최근 페이지
+    반환값: (DataFrame, 해당 방향으로 더 있는지 여부)
+    """
+    import pandas as pd
     try:
-        with connection.cursor() as cursor:
-            sql = """
-            SELECT * FROM transactions 
-            ORDER BY transaction_date DESC, created_at DESC 
-            LIMIT %s
-            """
-            cursor.execute(sql, (limit,))
-            results = cursor.fetchall()
-            return pd.DataFrame(results)
+        return _fetch_transaction_page(transaction_type, category, start_date, end_date, page_size, cursor, direction)
     except Exception as e:
         st.error(f"거래 내역 조회 중 오류: {str(e)}")
-        return pd.DataFrame()
-    finally:
-        connection.close()
+        return pd.DataFrame(), False
+
+@cached(get_query_cache, ttl=30, tags=_transaction_page_tags)
+def _fetch_search_page(query, transaction_type, category, start_date, end_date, order, page_size, page):
+    from analytics import to_typed_frame
+    rows = get_storage().search_transactions(
+        query, transaction_type, category, start_date, end_date,
+        order=order, limit=page_size + 1, offset=(page - 1) * page_size
+    )
+    has_more = len(rows) > page_size
+    with span('frame', '검색 결과 DataFrame'):
+        return to_typed_frame(rows[:page_size]), has_more
+
+def search_transactions(query, transaction_type=None, category=None, start_date=None, end_date=None,
+                        order='relevance', page_size=50, page=1):
+    """거래 설명 전문 검색 한 페이지 (필터와 함께 사용 가능)
+
+    order: 'relevance'(관련도순) 또는 'date'(최신순)
+    반환값: (DataFrame, 다음 페이지가 있는지 여부)
+    """
+    import pandas as pd
+    try:
+        return _fetch_search_page(query, transaction_type, category, start_date, end_date, order, page_size, page)
+    except Exception as e:
+        st.error(f"거래 검색 중 오류: {str(e)}")
+        return pd.DataFrame(), False
+
+@cached(get_query_cache, ttl=600, tags=lambda transaction_type=None: ['categories'])
+def _fetch_categories(transaction_type=None):
+    return get_storage().fetch_categories(transaction_type)
 
 def get_categories(transaction_type=None):
     """카테고리 목록 조회"""
-    connection = get_connection()
-    if not connection:
-        return []
-    
     try:
-        with connection.cursor() as cursor:
-            if transaction_type:
-                sql = "SELECT name FROM categories WHERE type = %s ORDER BY name"
-                cursor.execute(sql, (transaction_type,))
-            else:
-                sql = "SELECT name FROM categories ORDER BY type, name"
-                cursor.execute(sql)
-            
-            results = cursor.fetchall()
-            return [row['name'] for row in results]
+        return _fetch_categories(transaction_type)
     except Exception as e:
         st.error(f"카테고리 조회 중 오류: {str(e)}")
         return []
-    finally:
-        connection.close()
 
-def get_monthly_data(year_month):
-    """월별 데이터 조회"""
-    connection = get_connection()
-    if not connection:
-        return pd.DataFrame()
-    
+@cached(get_query_cache, ttl=60, tags=lambda year_month: [f"month:{year_month}"])
+def _fetch_monthly_stats(year_month):
+    from analytics import MonthlyStats
+    rows = get_storage().fetch_monthly_stats(year_month)
+    with span('pandas', '월별 통계 집계'):
+        return MonthlyStats.from_rows(year_month, rows)
+
+def get_monthly_stats(year_month):
+    """월별 통계 조회 (일자별 추이, 카테고리별 합계, 수입/지출 합계를 한 번에)"""
+    from analytics import MonthlyStats
     try:
-        with connection.cursor() as cursor:
-            sql = """
-            SELECT 
-                transaction_date,
-                transaction_type,
-                SUM(amount) as daily_total
-            FROM transactions 
-            WHERE DATE_FORMAT(transaction_date, '%%Y-%%m') = %s
-            GROUP BY transaction_date, transaction_type
-            ORDER BY transaction_date
-            """
-            cursor.execute(sql, (year_month,))
-            results = cursor.fetchall()
-            return pd.DataFrame(results)
+        return _fetch_monthly_stats(year_month)
     except Exception as e:
-        st.error(f"월별 데이터 조회 중 오류: {str(e)}")
+        st.error(f"월별 통계 조회 중 오류: {str(e)}")
+        return MonthlyStats(year_month)
+
+@cached(get_query_cache, ttl=60, tags=lambda as_of: ['balance'])
+def _fetch_balance_as_of(as_of):
+    return float(get_storage().balance_as_of(as_of))
+
+def get_balance_as_of(as_of=None):
+    """as_of(기본 오늘) 날짜 기준 동아리 전체 잔고 (누적 수입 - 지출, 인덱스 조회)"""
+    try:
+        return _fetch_balance_as_of(as_of or date.today())
+    except Exception as e:
+        st.error(f"잔고 조회 중 오류: {str(e)}")
+        return 0.0
+
+@cached(get_query_cache, ttl=60, tags=lambda start_date, end_date: ['balance'])
+def _fetch_balance_series(start_date, end_date):
+    from analytics import balance_frame
+    storage = get_storage()
+    rows = storage.fetch_balance_series(start_date, end_date)
+    opening = storage.balance_as_of(start_date - timedelta(days=1))
+    with span('frame', '잔고 추이 DataFrame'):
+        return balance_frame(rows, opening, start_date, end_date)
+
+def get_balance_series(start_date, end_date):
+    """기간의 날짜별 잔고 ('잔고' 열, 차트용)"""
+    import pandas as pd
+    try:
+        return _fetch_balance_series(start_date, end_date)
+    except Exception as e:
+        st.error(f"잔고 추이 조회 중 오류: {str(e)}")
         return pd.DataFrame()
-    finally:
-        connection.close()
+
+@cached(get_query_cache, ttl=3600, tags=lambda before: ['closed_months'])
+def _fetch_closed_month_totals(before):
+    """before(이번 달 1일) 이전 모든 달의 합계 표
+
+    지난 달은 소급 입력 때만 바뀌므로(write_tags의 closed_months) 오래 캐시하고,
+    달이 바뀌면 before가 달라져 새로 조회한다.
+    """
+    from analytics import month_totals_frame
+    rows = get_storage().fetch_monthly_totals(TREND_START, before)
+    with span('frame', '지난 달 합계 표'):
+        return month_totals_frame(rows)
+
+@cached(get_query_cache, ttl=60, tags=lambda year_month: [f"month:{year_month}"])
+def _fetch_month_totals(year_month):
+    from analytics import month_totals_frame
+    rows = get_storage().fetch_monthly_totals(*month_range(year_month))
+    with span('frame', f"{year_month} 합계 표"):
+        return month_totals_frame(rows)
+
+def get_trend_stats():
+    """전체 기간 월별 추이 (지난 달 합계는 캐시를 재사용하고 이번 달만 다시 조회)"""
+    import pandas as pd
+    from analytics import TrendStats
+    this_month = date.today().replace(day=1)
+    results = prefetch(
+        closed=(_fetch_closed_month_totals, this_month),
+        current=(_fetch_month_totals, this_month.strftime('%Y-%m'))
+    )
+    closed = prefetched(results['closed'], pd.DataFrame(), "지난 달 합계 조회 중 오류")
+    current = prefetched(results['current'], pd.DataFrame(), "이번 달 합계 조회 중 오류")
+    try:
+        with span('pandas', '추이 지표 계산'):
+            return TrendStats.from_frames([closed, current], this_month)
+    except Exception as e:
+        st.error(f"추이 분석 중 오류: {str(e)}")
+        return TrendStats()
+
+def get_history_years():
+    """거래가 있는 가장 이른 연도부터 올해까지 (지난 달 합계 표 캐시 재사용)"""
+    current_year = date.today().year
+    try:
+        closed = _fetch_closed_month_totals(date.today().replace(day=1))
+    except Exception as e:
+        st.error(f"연도 목록 조회 중 오류: {str(e)}")
+        return [current_year]
+    first_year = closed.index.min().year if not closed.empty else current_year
+    return list(range(min(first_year, current_year), current_year + 1))
+
+# 페이지 조회 동시 실행 시간 제한 (초)
+PREFETCH_TIMEOUT = 15
+
+@st.cache_resource
+def get_prefetcher():
+    """세션 간에 공유되는 조회 스레드 풀 (동시 조회 수는 연결 풀 크기 이하)"""
+    try:
+        workers = int(st.secrets["db"].get("prefetch_workers", 4))
+    except Exception:
+        workers = 4
+    return Prefetcher(max_workers=workers)
+
+def prefetch(**tasks):
+    """페이지의 독립적인 조회를 동시에 실행 (조회마다 풀에서 따로 연결을 대여)
+
+    tasks: 이름=(원본 조회 함수, 인자...) - 캐시된 _fetch_* 함수를 넘기면 결과가 조회 캐시에도 남음
+    반환값: {이름: PrefetchResult} - 실패/시간 초과는 해당 조회에만 기록됨
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    
+    ctx = get_script_run_ctx()
+    
+    def attach_context():
+        # 작업 스레드에서도 st.cache_resource(get_storage 등)를 쓸 수 있도록 실행 컨텍스트 연결
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+    
+    return get_prefetcher().fetch(
+        {name: partial(func, *args) for name, (func, *args) in tasks.items()},
+        timeout=PREFETCH_TIMEOUT,
+        # 같은 세션이 다른 메뉴로 재실행되면 이전 페이지의 남은 조회는 취소
+        owner=ctx.session_id if ctx is not None else None,
+        setup=attach_context
+    )
+
+def prefetched(result, fallback, label):
+    """동시 조회 결과 값, 실패했으면 오류를 표시하고 fallback 반환"""
+    if result.ok:
+        return result.value
+    st.error(f"{label}: {str(result.error)}")
+    return fallback
 
 # 메인 애플리케이션
 def main():
@@ -193,9 +419,36 @@ def main():
     # 사이드바 메뉴
     menu = st.sidebar.selectbox(
         "메뉴 선택",
-        ["🏠 대시보드", "📝 거래 입력", "📊 거래 목록", "📈 월별 통계"]
+        ["🏠 대시보드", "📝 거래 입력", "📊 거래 목록", "📈 월별 통계", "📉 추이 분석", "📥 일괄 가져오기", "📤 내보내기", "⚙️ 관리"]
     )
+    st.sidebar.radio("차트 렌더링", ["이미지", "네이티브"], key='chart_mode', horizontal=True)
+    show_perf = st.sidebar.checkbox("⏱️ 성능 패널", key='perf_panel')
+    
+    # 패널도 기록 파일도 없으면 기록기를 만들지 않음 (계측 지점은 즉시 반환)
+    try:
+        sinks_enabled = setup_perf_sinks()
+    except Exception:
+        sinks_enabled = False
+    recorder = Recorder(page=menu) if show_perf or sinks_enabled else None
+    token = activate(recorder)
+    try:
+        show_page(menu)
+    finally:
+        deactivate(token)
+    
+    if recorder is not None:
+        try:
+            emit(recorder)
+        except Exception as e:
+            st.sidebar.warning(f"성능 기록 저장 실패: {str(e)}")
+        if show_perf:
+            show_perf_panel(recorder)
     
+    show_pool_stats(recorder)
+    show_queue_status()
+
+def show_page(menu):
+    """선택한 메뉴의 화면 표시"""
     if menu == "🏠 대시보드":
         show_dashboard()
     elif menu == "📝 거래 입력":
@@ -204,20 +457,160 @@ def main():
         show_transaction_list()
     elif menu == "📈 월별 통계":
         show_monthly_statistics()
+    elif menu == "📉 추이 분석":
+        show_trends()
+    elif menu == "📥 일괄 가져오기":
+        show_bulk_import()
+    elif menu == "📤 내보내기":
+        show_export()
+    elif menu == "⚙️ 관리":
+        show_admin()
+
+def show_perf_panel(recorder):
+    """이번 재실행의 단계별 소요 시간, DB 왕복 수, 행 수, 전송량"""
+    import pandas as pd
+    summary = recorder.summary()
+    labels = {'connect': "연결", 'sql': "SQL", 'frame': "DataFrame", 'pandas': "pandas 집계", 'render': "렌더링"}
+    
+    with st.sidebar.expander("⏱️ 성능 패널", expanded=True):
+        st.write(f"- 전체: {summary['elapsed'] * 1000:,.1f}ms")
+        st.write(f"- DB 왕복: {summary['round_trips']}회")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    '단계': labels.get(kind, kind),
+                    '횟수': entry['count'],
+                    '시간(ms)': entry['seconds'] * 1000,
+                    '행': entry['rows'],
+                    '바이트': entry['bytes'],
+                }
+                for kind, entry in summary['by_kind'].items()
+            ]),
+            column_config={'시간(ms)': st.column_config.NumberColumn(format="%.1f")},
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        sql_events = [event for event in recorder.events if event[0] == 'sql']
+        if sql_events:
+            st.caption("SQL 실행 (캐시 적중 시 표시되지 않음)")
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, seconds * 1000, rows, nbytes) for _, name, seconds, rows, nbytes in sql_events],
+                    columns=['SQL', '시간(ms)', '행', '바이트']
+                ),
+                column_config={'시간(ms)': st.column_config.NumberColumn(format="%.1f")},
+                hide_index=True,
+                use_container_width=True
+            )
+
+def show_pool_stats(recorder):
+    """연결 풀 상태 (이 세션의 이번 실행은 기록기 이벤트로, 누적 통계는 모든 세션이 공유하는 풀 전체)"""
+    try:
+        pool = get_storage().pool
+    except Exception:
+        return
+    
+    stats = pool.stats.snapshot()
+    in_use, idle = pool.size()
+    
+    with st.sidebar.expander("🔌 연결 풀 상태"):
+        if recorder is not None:
+            # 풀 통계는 다른 세션의 대여도 함께 세므로 이번 실행 수치는 이 세션의 기록기에서 계산
+            connects = [seconds for kind, name, seconds, _, _ in recorder.events if (kind, name) == ('connect', '새 연결')]
+            waits = [seconds for kind, name, seconds, _, _ in recorder.events if (kind, name) == ('connect', '연결 대여')]
+            st.write(f"- 이번 실행 새 연결: {len(connects)}회")
+            st.write(f"- 이번 실행 대여: {len(waits)}회")
+            if waits:
+                st.write(f"- 평균 대기: {sum(waits) / len(waits) * 1000:,.1f}ms")
+        st.write(f"- 풀 크기: 사용 중 {in_use} / 유휴 {idle} (최대 {pool.max_size})")
+        st.caption("앱 전체 (모든 세션 누적)")
+        st.write(f"- 연결 {stats['connects']}회, 재연결 {stats['reconnects']}회, 유휴 정리 {stats['evictions']}회")
+        st.write(f"- 대여 {stats['checkouts']}회, 최대 대기 {stats['wait_max'] * 1000:,.1f}ms")
+
+def show_queue_status():
+    """저장 대기열 상태 (반영 대기 수, 마지막 반영, 오류), 대기열을 켠 경우만"""
+    try:
+        queue = get_write_queue()
+    except Exception as e:
+        st.sidebar.error(f"저장 대기열을 열 수 없습니다: {str(e)}")
+        return
+    if queue is None:
+        return
+    
+    status = queue.status()
+    with st.sidebar.expander(f"📮 저장 대기열 ({status['pending']}건 대기)",
+                             expanded=bool(status['pending'] or status['failed_rows'])):
+        st.write(f"- 반영 대기: {status['pending']}건")
+        if status['failed_rows']:
+            st.write(f"- DB가 거부해 보류: {status['failed_rows']}건")
+        st.write(f"- 앱 시작 이후 반영 {status['saved']}건, 이미 있던 거래 {status['duplicates']}건, 실패 {status['failed']}건")
+        if status['last_flush_at']:
+            st.write(f"- 마지막 반영: {status['last_flush_at']:%H:%M:%S}")
+        if status['pending'] and status['last_error']:
+            retry = f", {status['retry_at']:%H:%M:%S} 재시도" if status['retry_at'] else ""
+            st.warning(f"반영 오류 ({status['last_error_at']:%H:%M:%S}{retry}): {status['last_error']}")
+        if not status['running']:
+            st.error("반영 스레드가 멈춰 있습니다. 앱을 다시 시작하세요.")
+        if st.button("지금 반영", key='queue_flush'):
+            queue.flush_now()
+        if status['failed_rows'] and st.button("보류 항목 다시 시도", key='queue_retry'):
+            # 보류될 때 뺀 대기 지출을 다시 더함 (다시 보류되면 on_flushed가 또 뺌)
+            engine = get_budget_engine()
+            for row in queue.retry_failed():
+                engine.add_pending(*row)
+
+def show_trend_chart(chart_data, title):
+    """수입/지출 추이 차트 (대시보드/월별 통계 공용)
+
+    이미지 모드는 같은 데이터면 캐시된 PNG를 그대로 보내고,
+    네이티브 모드는 래스터화 없이 브라우저에서 벡터로 그린다.
+    """
+    from charts import SERIES_STYLES, render_trend_png
+    if st.session_state.get('chart_mode', "이미지") == "네이티브":
+        with span('render', f"차트(네이티브): {title}"):
+            st.line_chart(chart_data, color=[
+                SERIES_STYLES[column]['color'] for column in chart_data.columns if column in SERIES_STYLES
+            ])
+    else:
+        with span('render', f"차트(이미지): {title}"):
+            st.image(render_trend_png(chart_data, title), use_container_width=True)
+
+def show_budget_gauges(budgets):
+    """예산 항목별 사용 비율 막대 (대시보드/관리 화면 공용)"""
+    for budget in budgets:
+        if budget.exceeded:
+            text = f"{budget.label}: {budget.spent:,.0f}원 / {budget.limit:,.0f}원 (⚠️ {-budget.remaining:,.0f}원 초과)"
+        else:
+            text = f"{budget.label}: {budget.spent:,.0f}원 / {budget.limit:,.0f}원 ({budget.remaining:,.0f}원 남음)"
+        st.progress(min(budget.ratio, 1.0), text=text)
 
 def show_dashboard():
     """대시보드 화면"""
     st.header("🏠 대시보드")
+    # 제목을 먼저 보낸 뒤 pandas를 불러옴 (첫 화면 표시가 import를 기다리지 않도록)
+    import pandas as pd
+    from analytics import MonthlyStats
     
-    # 현재 월 데이터 조회
+    # 현재 월 통계, 잔고, 최근 1년 잔고 추이, 최근 거래를 동시에 조회
     current_month = datetime.now().strftime('%Y-%m')
-    monthly_data = get_monthly_data(current_month)
+    today = date.today()
+    results = prefetch(
+        stats=(_fetch_monthly_stats, current_month),
+        club_balance=(_fetch_balance_as_of, today),
+        balance_trend=(_fetch_balance_series, today - timedelta(days=365), today),
+        recent=(_fetch_transactions, 5)
+    )
+    stats = prefetched(results['stats'], MonthlyStats(current_month), "월별 통계 조회 중 오류")
+    club_balance = prefetched(results['club_balance'], 0.0, "잔고 조회 중 오류")
+    balance_trend = prefetched(results['balance_trend'], pd.DataFrame(), "잔고 추이 조회 중 오류")
+    recent = prefetched(results['recent'], pd.DataFrame(), "거래 내역 조회 중 오류")
+    budgets = get_budget_statuses(current_month)
     
-    if not monthly_data.empty:
-        # 수입/지출 합계 계산
-        income_total = monthly_data[monthly_data['transaction_type'] == '수입']['daily_total'].sum()
-        expense_total = monthly_data[monthly_data['transaction_type'] == '지출']['daily_total'].sum()
-        balance = income_total - expense_total
+    if not stats.empty:
+        income_total = stats.income
+        expense_total = stats.expense
+        balance = stats.balance
         
         # 메트릭 표시
         col1, col2, col3, col4 = st.columns(4)
@@ -229,55 +622,63 @@ def show_dashboard():
             st.metric("이번 달 지출", f"{expense_total:,.0f}원")
         
         with col3:
-            st.metric("잔액", f"{balance:,.0f}원", delta=f"{balance:,.0f}원")
+            st.metric("동아리 잔고", f"{club_balance:,.0f}원", delta=f"{balance:,.0f}원",
+                      help="전체 기간 누적 잔고 (아래는 이번 달 수입 - 지출)")
         
         with col4:
-            # 지출 한도 경고
-            if expense_total > 200000:
+            # 월 전체 예산 경고
+            total_budget = next((status for status in budgets if status.category == TOTAL_CATEGORY), None)
+            if total_budget is None:
+                st.info("이번 달 전체 예산이 설정되지 않았습니다.")
+            elif total_budget.exceeded:
                 st.error("⚠️ 지출 한도 초과!")
             else:
-                remaining = 200000 - expense_total
-                st.info(f"지출 한도: {remaining:,.0f}원 남음")
+                st.info(f"지출 한도: {total_budget.remaining:,.0f}원 남음")
         
         # 월별 차트
         st.subheader("이번 달 수입/지출 추이")
         
-        if not monthly_data.empty:
-            # 차트 데이터 준비
-            chart_data = monthly_data.pivot_table(
-                index='transaction_date', 
-                columns='transaction_type', 
-                values='daily_total', 
-                aggfunc='sum'
-            ).fillna(0)
-            
-            # matplotlib 차트 생성
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            if '수입' in chart_data.columns:
-                ax.plot(chart_data.index, chart_data['수입'], marker='o', linewidth=2, label='수입', color='green')
-            
-            if '지출' in chart_data.columns:
-                ax.plot(chart_data.index, chart_data['지출'], marker='s', linewidth=2, label='지출', color='red')
-            
-            ax.set_xlabel('날짜')
-            ax.set_ylabel('금액 (원)')
-            ax.set_title(f'{current_month} 수입/지출 추이')
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-            
-            # x축 날짜 포맷팅
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            st.pyplot(fig)
+        if not stats.daily.empty:
+            show_trend_chart(stats.daily, f'{current_month} 수입/지출 추이')
     else:
         st.info("이번 달 거래 내역이 없습니다.")
+    
+    if budgets:
+        st.subheader("이번 달 예산")
+        show_budget_gauges(budgets)
+    
+    # 거래가 하나도 없으면 0원 직선뿐이므로 생략
+    if not balance_trend.empty and balance_trend['잔고'].any():
+        st.subheader("잔고 추이 (최근 1년)")
+        show_trend_chart(balance_trend, f'{today:%Y-%m-%d} 기준 잔고 추이')
+    
+    if not recent.empty:
+        st.subheader("최근 거래")
+        with span('render', "최근 거래 표"):
+            st.dataframe(
+                recent[['transaction_date', 'transaction_type', 'amount', 'category', 'description']],
+                column_config={
+                    'transaction_date': st.column_config.DateColumn("날짜", format="YYYY-MM-DD"),
+                    'transaction_type': "유형",
+                    'amount': st.column_config.NumberColumn("금액", format="%,d원"),
+                    'category': "카테고리",
+                    'description': "설명",
+                },
+                hide_index=True,
+                use_container_width=True
+            )
 
 def show_transaction_form():
     """거래 입력 폼"""
     st.header("📝 거래 입력")
     
+    # 두 유형의 카테고리를 미리 동시에 조회 (유형을 바꿔도 다시 조회하지 않음)
+    results = prefetch(**{transaction_type: (_fetch_categories, transaction_type) for transaction_type in ["수입", "지출"]})
+    categories_by_type = {
+        transaction_type: prefetched(result, [], "카테고리 조회 중 오류")
+        for transaction_type, result in results.items()
+    }
+    
     with st.form("transaction_form"):
         col1, col2 = st.columns(2)
         
@@ -288,7 +689,7 @@ def show_transaction_form():
         
         with col2:
             # 카테고리 동적 로딩
-            categories = get_categories(transaction_type)
+            categories = categories_by_type[transaction_type]
             category = st.selectbox("카테고리", categories)
             description = st.text_area("설명", height=100)
         
@@ -303,30 +704,100 @@ def show_transaction_form():
                 st.error("설명을 입력해주세요.")
                 return
             
-            # 중복 확인
-            if check_duplicate_transaction(transaction_date, transaction_type, amount, category, description):
-                st.error("⚠️ 동일한 거래가 이미 존재합니다. (날짜, 유형, 금액, 카테고리, 설명이 모두 동일)")
-                return
+            # 예산 한도 확인, 저장(중복 확인 포함)을 한 번에 처리
+            status, exceeded = save_transaction(transaction_date, transaction_type, amount, category, description)
             
-            # 지출 한도 확인
-            if transaction_type == "지출":
-                over_limit, total_expense = check_monthly_expense_limit(transaction_date, amount)
-                if over_limit:
-                    st.warning(f"⚠️ 월별 지출 한도(200,000원)를 초과합니다! 총 지출: {total_expense:,.0f}원")
-                    if not st.checkbox("경고를 무시하고 저장하시겠습니까?"):
-                        return
+            if status == 'over_limit':
+                for budget in exceeded:
+                    st.warning(
+                        f"⚠️ {budget.year_month} {budget.label} 예산({budget.limit:,.0f}원)을 초과합니다! "
+                        f"저장 시 지출: {budget.spent:,.0f}원"
+                    )
+                if not st.checkbox("경고를 무시하고 저장하시겠습니까?"):
+                    return
+                status, exceeded = save_transaction(
+                    transaction_date, transaction_type, amount, category, description, allow_over_limit=True
+                )
             
-            # 거래 저장
-            if insert_transaction(transaction_date, transaction_type, amount, category, description):
+            if status == 'duplicate':
+                st.error("⚠️ 동일한 거래가 이미 존재합니다. (날짜, 유형, 금액, 카테고리, 설명이 모두 동일)")
+            elif status == 'saved':
                 st.success("✅ 거래가 성공적으로 저장되었습니다!")
                 st.balloons()
+            elif status == 'queued':
+                st.success("✅ 거래를 저장 대기열에 넣었습니다. 잠시 후 DB에 반영됩니다. (사이드바에서 상태 확인)")
             else:
                 st.error("❌ 거래 저장에 실패했습니다.")
 
+def _page_key(row):
+    """DataFrame 행에서 키셋 커서 (transaction_date, created_at, id) 추출"""
+    import pandas as pd
+    return row['transaction_date'].date(), pd.Timestamp(row['created_at']).to_pydatetime(), int(row['id'])
+
+def _set_list_page(cursor, direction, page_delta):
+    """거래 목록 페이지 이동 (버튼 콜백)"""
+    st.session_state['list_cursor'] = cursor
+    st.session_state['list_direction'] = direction
+    st.session_state['list_page'] += page_delta
+
+def _set_search_page(page_delta):
+    """검색 결과 페이지 이동 (버튼 콜백)"""
+    st.session_state['search_page'] += page_delta
+
+def show_search_results(query, order, transaction_type, category, start_date, end_date, limit):
+    """설명 검색 결과 (목록 필터와 함께 적용)"""
+    if not search_terms(query):
+        st.info("검색어는 2글자 이상 입력하세요.")
+        return
+    
+    # 검색어/필터/정렬이 바뀌면 첫 페이지로
+    filters = (query, order, transaction_type, category, start_date, end_date, limit)
+    if st.session_state.get('search_filters') != filters:
+        st.session_state['search_filters'] = filters
+        st.session_state['search_page'] = 1
+    page = st.session_state['search_page']
+    
+    results_df, has_more = search_transactions(
+        query, transaction_type, category, start_date, end_date,
+        order=order, page_size=limit, page=page
+    )
+    if results_df.empty:
+        st.info(f"'{query}' 검색 결과가 없습니다.")
+        return
+    
+    with span('render', "검색 결과 표"):
+        st.dataframe(
+            results_df[['transaction_date', 'transaction_type', 'amount', 'category', 'description']],
+            column_config={
+                'transaction_date': st.column_config.DateColumn("날짜", format="YYYY-MM-DD"),
+                'transaction_type': "유형",
+                'amount': st.column_config.NumberColumn("금액", format="%,d원"),
+                'category': "카테고리",
+                'description': "설명",
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("◀ 이전", key='search_prev', disabled=page <= 1, on_click=_set_search_page, args=(-1,))
+    with col2:
+        st.write(f"검색 결과 {page} 페이지")
+    with col3:
+        st.button("다음 ▶", key='search_next', disabled=not has_more, on_click=_set_search_page, args=(1,))
+
 def show_transaction_list():
     """거래 목록 조회"""
     st.header("📊 거래 목록")
     
+    # 설명 검색 (입력하면 아래 필터와 함께 검색 결과를 표시)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_query = st.text_input("🔍 설명 검색", placeholder="예: 회식, 송지민 재입금").strip()
+    with col2:
+        search_order = st.radio("정렬", ["관련도순", "최신순"], horizontal=True, disabled=not search_query)
+    
     # 필터 옵션
     col1, col2, col3 = st.columns(3)
     
@@ -334,148 +805,489 @@ def show_transaction_list():
         transaction_type_filter = st.selectbox("거래 유형", ["전체", "수입", "지출"])
     
     with col2:
+        category_options = get_categories(None if transaction_type_filter == "전체" else transaction_type_filter)
+        category_filter = st.selectbox("카테고리", ["전체"] + category_options)
+    
+    with col3:
         limit = st.selectbox("표시 개수", [50, 100, 200, 500])
     
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        start_date = st.date_input("시작 날짜", value=None)
+    
+    with col2:
+        end_date = st.date_input("종료 날짜", value=None)
+    
     with col3:
         if st.button("새로고침"):
+            get_query_cache().invalidate('transactions')
             st.experimental_rerun()
     
+    transaction_type = None if transaction_type_filter == "전체" else transaction_type_filter
+    category = None if category_filter == "전체" else category_filter
+    
+    if search_query:
+        show_search_results(
+            search_query, 'relevance' if search_order == "관련도순" else 'date',
+            transaction_type, category, start_date, end_date, limit
+        )
+        return
+    
+    # 필터가 바뀌면 첫 페이지로
+    filters = (transaction_type, category, start_date, end_date, limit)
+    if st.session_state.get('list_filters') != filters:
+        st.session_state['list_filters'] = filters
+        st.session_state['list_cursor'] = None
+        st.session_state['list_direction'] = 'next'
+        st.session_state['list_page'] = 1
+    
     # 거래 내역 조회
-    transactions_df = get_transactions(limit)
+    direction = st.session_state['list_direction']
+    transactions_df, has_more = get_transaction_page(
+        transaction_type, category, start_date, end_date,
+        page_size=limit, cursor=st.session_state['list_cursor'], direction=direction
+    )
     
     if not transactions_df.empty:
-        # 필터 적용
-        if transaction_type_filter != "전체":
-            transactions_df = transactions_df[transactions_df['transaction_type'] == transaction_type_filter]
-        
-        # 날짜 포맷팅
-        transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date']).dt.strftime('%Y-%m-%d')
-        transactions_df['amount'] = transactions_df['amount'].apply(lambda x: f"{x:,.0f}원")
+        first = transactions_df.iloc[0]
+        last = transactions_df.iloc[-1]
+        has_next = has_more if direction == 'next' else True
+        has_prev = st.session_state['list_page'] > 1
         
-        # 표시할 컬럼만 선택
-        display_df = transactions_df[['transaction_date', 'transaction_type', 'amount', 'category', 'description']]
-        display_df.columns = ['날짜', '유형', '금액', '카테고리', '설명']
+        # 숫자형 그대로 두고 표시 형식만 열 설정으로 지정
+        with span('render', "거래 목록 표"):
+            st.dataframe(
+                transactions_df[['transaction_date', 'transaction_type', 'amount', 'category', 'description']],
+                column_config={
+                    'transaction_date': st.column_config.DateColumn("날짜", format="YYYY-MM-DD"),
+                    'transaction_type': "유형",
+                    'amount': st.column_config.NumberColumn("금액", format="%,d원"),
+                    'category': "카테고리",
+                    'description': "설명",
+                },
+                hide_index=True,
+                use_container_width=True
+            )
         
-        st.dataframe(display_df, use_container_width=True)
+        # 페이지 이동
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button(
+                "◀ 이전", disabled=not has_prev, on_click=_set_list_page,
+                args=(_page_key(first), 'prev', -1)
+            )
+        with col2:
+            st.write(f"{st.session_state['list_page']} 페이지")
+        with col3:
+            st.button(
+                "다음 ▶", disabled=not has_next, on_click=_set_list_page,
+                args=(_page_key(last), 'next', 1)
+            )
         
         # 통계 정보
         st.subheader("📈 통계 정보")
-        total_income = transactions_df[transactions_df['transaction_type'] == '수입']['amount'].str.replace('원', '').str.replace(',', '').astype(float).sum()
-        total_expense = transactions_df[transactions_df['transaction_type'] == '지출']['amount'].str.replace('원', '').str.replace(',', '').astype(float).sum()
+        with span('pandas', "거래 목록 통계"):
+            from analytics import summarize_transactions
+            totals, by_category, by_day = summarize_transactions(transactions_df)
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("총 수입", f"{total_income:,.0f}원")
+            st.metric("총 수입", f"{totals['income']:,.0f}원")
         with col2:
-            st.metric("총 지출", f"{total_expense:,.0f}원")
+            st.metric("총 지출", f"{totals['expense']:,.0f}원")
         with col3:
-            st.metric("순액", f"{total_income - total_expense:,.0f}원")
+            st.metric("순액", f"{totals['net']:,.0f}원")
+        
+        amount_columns = {
+            '수입': st.column_config.NumberColumn("수입", format="%,d원"),
+            '지출': st.column_config.NumberColumn("지출", format="%,d원"),
+        }
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**카테고리별**")
+            st.dataframe(by_category, column_config={'_index': "카테고리", **amount_columns}, use_container_width=True)
+        with col2:
+            st.write("**일자별**")
+            st.dataframe(
+                by_day,
+                column_config={'_index': st.column_config.DateColumn("날짜", format="YYYY-MM-DD"), **amount_columns},
+                use_container_width=True
+            )
     else:
         st.info("거래 내역이 없습니다.")
 
 def show_monthly_statistics():
     """월별 통계"""
     st.header("📈 월별 통계")
+    from analytics import MonthlyStats
     
-    # 월 선택
-    current_year = datetime.now().year
-    selected_year = st.selectbox("연도", range(current_year-2, current_year+1), index=2)
+    # 월 선택 (거래가 있는 가장 이른 연도부터)
+    years = get_history_years()
+    selected_year = st.selectbox("연도", years, index=len(years) - 1)
     selected_month = st.selectbox("월", range(1, 13), index=datetime.now().month-1)
     
     year_month = f"{selected_year:04d}-{selected_month:02d}"
     
-    # 월별 데이터 조회
-    monthly_data = get_monthly_data(year_month)
+    # 선택한 월과 전월 통계를 동시에 조회 (전월은 증감 표시용)
+    previous_month = f"{selected_year - (selected_month == 1):04d}-{(selected_month - 2) % 12 + 1:02d}"
+    results = prefetch(
+        stats=(_fetch_monthly_stats, year_month),
+        previous=(_fetch_monthly_stats, previous_month)
+    )
+    stats = prefetched(results['stats'], MonthlyStats(year_month), "월별 통계 조회 중 오류")
+    # 전월 조회 실패는 증감만 생략
+    previous = results['previous'].value if results['previous'].ok else None
     
-    if not monthly_data.empty:
-        # 수입/지출 합계
-        income_total = monthly_data[monthly_data['transaction_type'] == '수입']['daily_total'].sum()
-        expense_total = monthly_data[monthly_data['transaction_type'] == '지출']['daily_total'].sum()
+    if not stats.empty:
+        income_total = stats.income
+        expense_total = stats.expense
+        
+        def delta(current, attribute):
+            if previous is None or previous.empty:
+                return None
+            return f"{current - getattr(previous, attribute):+,.0f}원 (전월 대비)"
         
         # 메트릭
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("월 수입", f"{income_total:,.0f}원")
+            st.metric("월 수입", f"{income_total:,.0f}원", delta=delta(income_total, 'income'))
         with col2:
-            st.metric("월 지출", f"{expense_total:,.0f}원")
+            st.metric("월 지출", f"{expense_total:,.0f}원", delta=delta(expense_total, 'expense'), delta_color="inverse")
         with col3:
-            st.metric("월 잔액", f"{income_total - expense_total:,.0f}원")
+            st.metric("월 잔액", f"{income_total - expense_total:,.0f}원", delta=delta(stats.balance, 'balance'))
         
         # 차트
         st.subheader(f"{year_month} 수입/지출 추이")
         
-        # 차트 데이터 준비
-        chart_data = monthly_data.pivot_table(
-            index='transaction_date', 
-            columns='transaction_type', 
-            values='daily_total', 
-            aggfunc='sum'
-        ).fillna(0)
-        
-        # matplotlib 차트
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        if '수입' in chart_data.columns:
-            ax.plot(chart_data.index, chart_data['수입'], marker='o', linewidth=2, label='수입', color='green')
-        
-        if '지출' in chart_data.columns:
-            ax.plot(chart_data.index, chart_data['지출'], marker='s', linewidth=2, label='지출', color='red')
-        
-        ax.set_xlabel('날짜')
-        ax.set_ylabel('금액 (원)')
-        ax.set_title(f'{year_month} 수입/지출 추이')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        st.pyplot(fig)
+        show_trend_chart(stats.daily, f'{year_month} 수입/지출 추이')
         
         # 카테고리별 분석
         st.subheader("카테고리별 분석")
         
-        # 카테고리별 데이터 조회
-        connection = get_connection()
-        if connection:
-            try:
-                with connection.cursor() as cursor:
-                    sql = """
-                    SELECT category, transaction_type, SUM(amount) as total
-                    FROM transactions 
-                    WHERE DATE_FORMAT(transaction_date, '%%Y-%%m') = %s
-                    GROUP BY category, transaction_type
-                    ORDER BY transaction_type, total DESC
-                    """
-                    cursor.execute(sql, (year_month,))
-                    category_data = cursor.fetchall()
-                    
-                    if category_data:
-                        category_df = pd.DataFrame(category_data)
-                        
-                        # 수입/지출별로 분리
-                        income_categories = category_df[category_df['transaction_type'] == '수입']
-                        expense_categories = category_df[category_df['transaction_type'] == '지출']
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            if not income_categories.empty:
-                                st.write("**수입 카테고리**")
-                                for _, row in income_categories.iterrows():
-                                    st.write(f"- {row['category']}: {row['total']:,.0f}원")
-                        
-                        with col2:
-                            if not expense_categories.empty:
-                                st.write("**지출 카테고리**")
-                                for _, row in expense_categories.iterrows():
-                                    st.write(f"- {row['category']}: {row['total']:,.0f}원")
-            except Exception as e:
-                st.error(f"카테고리 분석 중 오류: {str(e)}")
-            finally:
-                connection.close()
+        category_df = stats.categories
+        if not category_df.empty:
+            # 수입/지출별로 분리
+            income_categories = category_df[category_df['transaction_type'] == '수입']
+            expense_categories = category_df[category_df['transaction_type'] == '지출']
+            
+            with span('render', "카테고리별 분석"):
+                col1, col2 = st.columns(2)
+            
+                with col1:
+                    if not income_categories.empty:
+                        st.write("**수입 카테고리**")
+                        for _, row in income_categories.iterrows():
+                            st.write(f"- {row['category']}: {row['total']:,.0f}원")
+            
+                with col2:
+                    if not expense_categories.empty:
+                        st.write("**지출 카테고리**")
+                        for _, row in expense_categories.iterrows():
+                            st.write(f"- {row['category']}: {row['total']:,.0f}원")
     else:
         st.info(f"{year_month} 거래 내역이 없습니다.")
 
+# 추이 분석 표시 기간 (개월 수, None은 전체)
+TREND_PERIODS = {"1년": 12, "3년": 36, "전체": None}
+
+def show_trends():
+    """여러 해의 월별 추이, 전월/전년 동월 대비, 이동 평균, 학기별 합계"""
+    st.header("📉 추이 분석")
+    
+    stats = get_trend_stats()
+    if stats.empty:
+        st.info("거래 내역이 없습니다.")
+        return
+    
+    months = [month.strftime('%Y-%m') for month in stats.monthly.index[::-1]]
+    col1, col2 = st.columns(2)
+    with col1:
+        year_month = st.selectbox("기준 월", months, index=0)
+    with col2:
+        period = st.radio("표시 기간", list(TREND_PERIODS), horizontal=True)
+    month = month_range(year_month)[0]
+    
+    # 기준 월 합계와 전월/전년 동월 대비
+    summary = stats.month_summary(month)
+    labels = {'수입': "월 수입", '지출': "월 지출", '잔액': "월 잔액"}
+    for column, (key, label) in zip(st.columns(3), labels.items()):
+        row = summary.loc[key]
+        with column:
+            st.metric(label, f"{row['이번 달']:,.0f}원",
+                      delta=f"{row['이번 달'] - row['전월']:+,.0f}원 (전월 대비)",
+                      delta_color="inverse" if key == '지출' else "normal")
+            st.caption(f"전년 동월 {row['전년 동월']:,.0f}원 ({row['이번 달'] - row['전년 동월']:+,.0f}원)")
+    
+    st.subheader("월별 수입/지출과 이동 평균")
+    show_trend_chart(stats.chart_frame(TREND_PERIODS[period]), f'월별 수입/지출 추이 ({period})')
+    
+    amount = st.column_config.NumberColumn(format="%,d원")
+    rate = st.column_config.NumberColumn(format="%+.1f%%")
+    
+    st.subheader(f"{year_month} 카테고리별 비교")
+    comparison = stats.category_comparison(month)
+    if comparison.empty:
+        st.info(f"{year_month} 거래 내역이 없습니다.")
+    else:
+        with span('render', "카테고리별 비교 표"):
+            st.dataframe(
+                comparison,
+                column_config={
+                    '이번 달': amount, '전월': amount, '전년 동월': amount,
+                    '전월 대비(%)': rate, '전년 대비(%)': rate,
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+    
+    st.subheader("학기별 합계")
+    st.caption("1학기 3~8월, 2학기 9월~다음 해 2월 (진행 중인 학기는 지금까지의 합계)")
+    with span('render', "학기별 합계 표"):
+        st.dataframe(
+            stats.semesters().iloc[::-1],
+            column_config={'수입': amount, '지출': amount, '잔액': amount, '지출 전년 대비(%)': rate},
+            use_container_width=True
+        )
+
+def show_bulk_import():
+    """은행/CSV 거래 내역 일괄 가져오기"""
+    st.header("📥 일괄 가져오기")
+    import pandas as pd
+    from ledger_import import import_csv
+    
+    uploaded = st.file_uploader("CSV 파일", type=["csv"])
+    encoding = st.selectbox("인코딩", ["utf-8", "cp949", "utf-8-sig"])
+    if uploaded is None:
+        st.info("은행 거래 내역 등 CSV 파일을 업로드하세요.")
+        return
+    
+    try:
+        columns = list(pd.read_csv(uploaded, nrows=0, encoding=encoding).columns)
+    except Exception as e:
+        st.error(f"CSV 읽기 오류: {str(e)}")
+        return
+    
+    # 열 매핑
+    st.subheader("열 매핑")
+    amount_mode = st.radio("금액 형식", ["입금/출금 열", "유형/금액 열"], horizontal=True)
+    options = [""] + columns
+    mapping = {}
+    col1, col2 = st.columns(2)
+    with col1:
+        mapping['date'] = st.selectbox("날짜", options)
+        mapping['description'] = st.selectbox("설명", options)
+        mapping['category'] = st.selectbox("카테고리 (없으면 기타 수입/기타 지출)", options)
+    with col2:
+        if amount_mode == "입금/출금 열":
+            mapping['deposit'] = st.selectbox("입금액", options)
+            mapping['withdrawal'] = st.selectbox("출금액", options)
+        else:
+            mapping['type'] = st.selectbox("유형 (수입/지출)", options)
+            mapping['amount'] = st.selectbox("금액", options)
+    dry_run = st.checkbox("검증만 하기 (저장하지 않음)")
+    
+    if not st.button("가져오기"):
+        return
+    
+    uploaded.seek(0)
+    reports = []
+    progress = st.empty()
+    try:
+        for report in import_csv(get_storage(), uploaded, mapping, encoding=encoding, dry_run=dry_run):
+            reports.append({key: value for key, value in report.items() if key != 'errors'})
+            progress.write(f"청크 {report['chunk']} 처리 중...")
+            for line, reason in report['errors'][:20]:
+                st.warning(f"{line}번 줄: {reason}")
+    except ValueError as e:
+        st.error(str(e))
+        return
+    except Exception as e:
+        st.error(f"가져오기 중 오류: {str(e)}")
+    finally:
+        if not dry_run:
+            get_query_cache().clear()
+            get_budget_engine().reload()
+    
+    if reports:
+        report_df = pd.DataFrame(reports)
+        progress.success(
+            f"✅ 완료: 저장 {report_df['inserted'].sum():,}건, "
+            f"중복 {report_df['duplicates'].sum():,}건, 거부 {report_df['rejected'].sum():,}건"
+        )
+        if report_df['skipped'].any():
+            st.warning(f"DB가 저장하지 않은 행 {report_df['skipped'].sum():,}건 (보관된 회계연도 등)")
+        report_df.columns = ['청크', '행 수', '저장', '중복', '건너뜀', '거부']
+        st.dataframe(report_df, hide_index=True, use_container_width=True)
+
+# .streamlit/config.toml의 enableStaticServing으로 app/static/exports/...에서 내려받음
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exports')
+EXPORT_MAX_AGE = 3600
+
+def show_export():
+    """거래 내역 내보내기 (CSV/Parquet)"""
+    st.header("📤 내보내기")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("시작 날짜", value=None)
+        transaction_type_filter = st.selectbox("거래 유형", ["전체", "수입", "지출"])
+        fmt = st.selectbox("형식", ["csv", "parquet"])
+    with col2:
+        end_date = st.date_input("종료 날짜", value=None)
+        category_options = get_categories(None if transaction_type_filter == "전체" else transaction_type_filter)
+        category_filter = st.selectbox("카테고리", ["전체"] + category_options)
+    
+    if st.button("내보내기 파일 만들기"):
+        # 이 세션의 이전 파일과, 다음 내보내기 없이 끝난 세션의 오래된 파일 정리
+        previous = st.session_state.pop('export_path', None)
+        if previous and os.path.exists(previous):
+            os.remove(previous)
+        remove_stale_exports(EXPORT_DIR, EXPORT_MAX_AGE)
+        
+        # DB → 파일은 배치 단위로 디스크에 바로 기록 (전체 결과를 메모리에 올리지 않음)
+        path = new_export_path(EXPORT_DIR, fmt)
+        try:
+            with st.spinner("내보내는 중..."):
+                count = export_ledger(
+                    get_storage(), path, fmt=fmt,
+                    start_date=start_date, end_date=end_date,
+                    transaction_type=None if transaction_type_filter == "전체" else transaction_type_filter,
+                    category=None if category_filter == "전체" else category_filter
+                )
+            st.session_state['export_path'] = path
+            st.session_state['export_name'] = f"solux_transactions_{date.today():%Y%m%d}.{fmt}"
+            st.success(f"✅ {count:,}건을 내보냈습니다.")
+        except Exception as e:
+            if os.path.exists(path):
+                os.remove(path)
+            st.error(f"내보내기 중 오류: {str(e)}")
+    
+    path = st.session_state.get('export_path')
+    if path and os.path.exists(path):
+        name = st.session_state['export_name']
+        if st.get_option('server.enableStaticServing'):
+            # Streamlit 정적 파일 서버가 디스크에서 조각 단위로 보냄 (파일 전체를 메모리에 올리지 않음)
+            st.markdown(
+                f'<a href="app/static/exports/{os.path.basename(path)}" download="{name}">⬇️ 다운로드</a>',
+                unsafe_allow_html=True
+            )
+        else:
+            # 정적 파일 제공이 꺼져 있으면 클릭할 때 파일 전체를 읽어 보냄 (.streamlit/config.toml 참고)
+            st.download_button("⬇️ 다운로드", data=partial(_read_export, path), file_name=name)
+        st.caption(f"파일은 {EXPORT_MAX_AGE // 60}분 뒤나 다음 내보내기 때 삭제됩니다.")
+
+def _read_export(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def show_admin():
+    """관리 화면 (예산, 조회 캐시 상태)"""
+    st.header("⚙️ 관리")
+    
+    show_budget_settings()
+    
+    st.subheader("조회 캐시")
+    cache = get_query_cache()
+    stats = cache.stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("적중", f"{stats['hits']:,}")
+    with col2:
+        st.metric("미적중", f"{stats['misses']:,}")
+    with col3:
+        st.metric("적중률", f"{stats['hit_rate']:.1%}")
+    with col4:
+        st.metric("항목 수", f"{stats['entries']} / {stats['max_entries']}")
+    
+    st.write(f"- LRU 제거: {stats['evictions']:,}회")
+    st.write(f"- TTL 만료: {stats['expirations']:,}회")
+    st.write(f"- 쓰기 무효화: {stats['invalidations']:,}회")
+    
+    if st.button("캐시 비우기"):
+        cache.clear()
+        st.success("캐시를 비웠습니다.")
+
+def _budget_month_label(budget_month):
+    return "모든 달" if budget_month == ALL_MONTHS else budget_month
+
+def show_budget_settings():
+    """예산 한도 설정/삭제와 예산 누계 확인"""
+    import pandas as pd
+    st.subheader("예산")
+    engine = get_budget_engine()
+    
+    try:
+        budgets = get_storage().fetch_budgets()
+    except Exception as e:
+        st.error(f"예산 조회 중 오류: {str(e)}")
+        budgets = []
+    if budgets:
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    '적용 월': _budget_month_label(row['budget_month']),
+                    '카테고리': row['category'] or "월 전체",
+                    '한도': float(row['limit_amount']),
+                }
+                for row in budgets
+            ]),
+            column_config={'한도': st.column_config.NumberColumn(format="%,d원")},
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.info("설정된 예산이 없습니다. (한도 확인 없이 저장됩니다)")
+    
+    with st.form("budget_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            budget_month = st.text_input("적용 월 (YYYY-MM, 비우면 모든 달)").strip() or ALL_MONTHS
+        with col2:
+            category = st.selectbox("카테고리", ["월 전체"] + get_categories("지출"))
+        with col3:
+            limit_amount = st.number_input("한도 (원)", min_value=0, step=10000, value=200000)
+        col1, col2 = st.columns(2)
+        with col1:
+            save = st.form_submit_button("저장")
+        with col2:
+            delete = st.form_submit_button("삭제")
+    
+    if save or delete:
+        category = TOTAL_CATEGORY if category == "월 전체" else category
+        try:
+            if budget_month != ALL_MONTHS:
+                datetime.strptime(budget_month, '%Y-%m')
+        except ValueError:
+            st.error("적용 월은 YYYY-MM 형식으로 입력하세요.")
+            return
+        try:
+            if save:
+                get_storage().set_budget(budget_month, category, limit_amount)
+                st.success("✅ 예산을 저장했습니다.")
+            elif get_storage().delete_budget(budget_month, category):
+                st.success("✅ 예산을 삭제했습니다.")
+            else:
+                st.warning("해당 예산이 없습니다.")
+            engine.reload()
+        except Exception as e:
+            st.error(f"예산 저장 중 오류: {str(e)}")
+    
+    if st.button("예산 누계 확인"):
+        try:
+            drift = engine.verify()
+        except Exception as e:
+            st.error(f"예산 누계 확인 중 오류: {str(e)}")
+            return
+        if not drift:
+            st.success("✅ 예산 누계가 거래 내역과 일치합니다.")
+        else:
+            st.error(f"❌ 불일치 {len(drift)}건 - 누계를 다시 읽습니다.")
+            for (month_start, category), expected, actual in drift:
+                st.write(f"- {month_start:%Y-%m} {category}: 실제 {expected:,.0f}원 / 누계 {actual:,.0f}원")
+            st.caption("다시 읽은 뒤에도 어긋나면 monthly_summary를 확인하세요 (python manage.py summary verify)")
+            engine.reload()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,107 @@
+"""
+solux 회계 관리 시스템 - 지난 회계연도 보관 파일
+manage.py archive가 DB에서 내보낸 연도별 Parquet 파일(zstd 압축, 열 지향)을 관리하고,
+보관되어 DB 파티션이 삭제된 연도의 월별 통계를 이 파일에서 계산 (Streamlit 의존 없음, pyarrow 필요)
+"""
+
+import os
+from datetime import date
+from decimal import Decimal
+
+from db import month_range
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(BASE_DIR, "data", "archive")
+
+
+def fiscal_year_range(year):
+    """회계연도 year의 [1월 1일, 다음 해 1월 1일) 구간"""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+class LedgerArchive:
+    """보관 디렉토리의 transactions_<연도>.parquet 파일 묶음
+
+    각 파일은 그 연도 12월 31일까지 아직 보관되지 않았던 거래 전체이며(ledger_export.EXPORT_COLUMNS),
+    읽을 때는 모든 파일을 하나의 데이터셋으로 보고 날짜 조건을 걸어 행 그룹 통계로 다른 연도 파일을 건너뛴다.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+
+    def path(self, year):
+        return os.path.join(self.directory, f"transactions_{year}.parquet")
+
+    def files(self):
+        """보관 파일 경로 목록 (연도순)"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith('transactions_') and name.endswith('.parquet')
+        )
+
+    def write(self, year, batches):
+        """배치들(ledger_export.iter_batches)을 year의 보관 파일로 기록하고 행 수를 반환
+
+        임시 파일에 다 쓴 뒤 이름을 바꾸므로 도중에 실패해도 불완전한 보관 파일이 남지 않는다.
+        """
+        from ledger_export import write_parquet
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(year)
+        partial = path + '.partial'
+        try:
+            count = write_parquet(batches, partial)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return count
+
+    def totals(self, year):
+        """year 보관 파일의 (행 수, 수입 합계, 지출 합계) - DB와 대조용"""
+        import pyarrow.parquet as pq
+
+        frame = pq.read_table(self.path(year), columns=['transaction_type', 'amount']).to_pandas()
+        by_type = frame.groupby('transaction_type')['amount'].sum()
+        return len(frame), Decimal(by_type.get('수입', 0)), Decimal(by_type.get('지출', 0))
+
+    def read_range(self, start_date, end_date, columns=('transaction_date', 'transaction_type', 'amount', 'category')):
+        """보관 파일 전체에서 [start_date, end_date) 거래를 DataFrame으로"""
+        import pyarrow.dataset as ds
+
+        files = self.files()
+        if not files:
+            raise FileNotFoundError(f"보관 파일이 없습니다: {self.directory}")
+        field = ds.field('transaction_date')
+        table = ds.dataset(files, format='parquet').to_table(
+            columns=list(columns), filter=(field >= start_date) & (field < end_date)
+        )
+        return table.to_pandas()
+
+    def monthly_data(self, year_month):
+        """storage.MONTHLY_DATA_SQL과 같은 행 (transaction_date, transaction_type, daily_total)"""
+        frame = self.read_range(*month_range(year_month))
+        daily = frame.groupby(['transaction_date', 'transaction_type'], as_index=False)['amount'].sum()
+        return [
+            {'transaction_date': row.transaction_date, 'transaction_type': row.transaction_type,
+             'daily_total': row.amount}
+            for row in daily.sort_values('transaction_date').itertuples(index=False)
+        ]
+
+    def monthly_stats(self, year_month):
+        """storage.MONTHLY_STATS_SQL과 같은 행 (kind, transaction_date, transaction_type, category, total)"""
+        frame = self.read_range(*month_range(year_month))
+        daily = frame.groupby(['transaction_date', 'transaction_type'], as_index=False)['amount'].sum()
+        categories = frame.groupby(['transaction_type', 'category'], as_index=False)['amount'].sum()
+        return [
+            {'kind': 'day', 'transaction_date': row.transaction_date, 'transaction_type': row.transaction_type,
+             'category': None, 'total': row.amount}
+            for row in daily.itertuples(index=False)
+        ] + [
+            {'kind': 'category', 'transaction_date': None, 'transaction_type': row.transaction_type,
+             'category': row.category, 'total': row.amount}
+            for row in categories.itertuples(index=False)
+        ]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+차트 렌더링 메모리 벤치마크
+대시보드 재실행을 수천 번 흉내 내며 RSS와 pyplot 레지스트리 크기가 일정한지 확인
+사용법: python benchmarks/bench_charts.py [--reruns 2000] [--distinct 20]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from charts import png_cache, render_trend_png
+
+# 한글 글꼴이 없는 환경의 글리프 경고 무시
+warnings.filterwarnings('ignore')
+
+
+def make_chart_data(seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-05-01', periods=31, freq='D').date
+    return pd.DataFrame({
+        '수입': rng.integers(0, 100, 31) * 1000.0,
+        '지출': rng.integers(0, 100, 31) * 1000.0,
+    }, index=index)
+
+
+def rss_mb():
+    # Linux의 ru_maxrss는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="차트 렌더링 메모리 벤치마크")
+    parser.add_argument('--reruns', type=int, default=2000)
+    parser.add_argument('--distinct', type=int, default=20, help="서로 다른 데이터 세트 수 (나머지는 캐시 적중)")
+    parser.add_argument('--max-growth-mb', type=float, default=30.0, help="워밍업 이후 RSS 증가 허용치")
+    args = parser.parse_args()
+
+    datasets = [make_chart_data(seed) for seed in range(args.distinct)]
+
+    # 워밍업: 폰트 캐시 등 1회성 할당
+    for data in datasets:
+        render_trend_png(data, '워밍업')
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    for i in range(args.reruns):
+        data = datasets[i % args.distinct]
+        # 절반은 재실행마다 새 제목(캐시 미스)으로 실제 래스터화를 강제
+        title = f'추이 {i}' if i % 2 else '2024-05 수입/지출 추이'
+        render_trend_png(data, title)
+    elapsed = time.perf_counter() - start
+
+    growth = rss_mb() - baseline
+    stats = png_cache.stats()
+    print(f"재실행 {args.reruns:,}회: {elapsed:.1f}초 (회당 {elapsed / args.reruns * 1000:.1f}ms)")
+    print(f"PNG 캐시: 적중 {stats['hits']:,}, 미적중 {stats['misses']:,}, 항목 {stats['entries']}")
+    print(f"pyplot 열린 Figure: {len(plt.get_fignums())}개")
+    print(f"최대 RSS 증가: {growth:.1f}MB")
+
+    if plt.get_fignums() or growth > args.max_growth_mb:
+        print("❌ 메모리가 일정하지 않습니다.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+거래 내역 내보내기 메모리 벤치마크
+앱과 같은 경로(storage.stream_transactions → ledger_export.export_ledger)로 CSV/Parquet을 기록하고,
+처음 몇 배치를 기록한 뒤부터 끝날 때까지 최대 RSS 증가량이 상한 안인지 확인
+(스트리밍이면 기록기/변환 버퍼가 자리 잡은 뒤로는 행 수와 관계없이 거의 늘지 않음,
+ MySQL은 SSCursor, 임베디드는 SQLite 커서에서 배치 단위로 읽음)
+사용법: python benchmarks/bench_export.py [--rows 500000] [--max-growth-mb 20]
+        python benchmarks/bench_export.py --embedded data/bench.db   # ledger_gen.py로 만든 파일
+        python benchmarks/bench_export.py --mysql                   # ledger_gen.py로 만든 벤치마크 DB
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import SECRETS_FILE
+from ledger_export import export_ledger
+from ledger_gen import BENCH_DATABASE
+
+
+def peak_rss_mb():
+    # Linux의 ru_maxrss는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def track_warmup(storage, warmup_batches):
+    """stream_transactions를 감싸 처음 warmup_batches개 배치를 넘긴 시점의 최대 RSS를 기록"""
+    stream = storage.stream_transactions
+    marks = {}
+
+    def tracked(*args, **kwargs):
+        for i, rows in enumerate(stream(*args, **kwargs)):
+            if i == warmup_batches:
+                marks['warm'] = peak_rss_mb()
+            yield rows
+
+    storage.stream_transactions = tracked
+    return marks
+
+
+def open_bench_storage(args):
+    if args.mysql:
+        import pymysql
+
+        from db import ConnectionPool, load_db_config
+        from storage import MySQLStorage
+
+        config = load_db_config(args.secrets)
+        config.update(database=args.database, cursorclass=pymysql.cursors.DictCursor)
+        return MySQLStorage(ConnectionPool(config, max_size=1))
+    from storage import EmbeddedStorage
+
+    return EmbeddedStorage(args.embedded, analytics=False)
+
+
+def run_one(args):
+    """한 형식을 기록하고 (경과 시간, 준비 후 최대 RSS MB, 최대 RSS MB, 파일 크기 MB, 행 수) 출력 - 하위 프로세스에서 실행"""
+    storage = open_bench_storage(args)
+    marks = track_warmup(storage, args.warmup_batches)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"export.{args.child}")
+            start = time.perf_counter()
+            count = export_ledger(storage, path, fmt=args.child, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+            size_mb = os.path.getsize(path) / 1024 / 1024
+    finally:
+        storage.close()
+    peak_mb = peak_rss_mb()
+    print(f"{elapsed:.3f} {marks.get('warm', peak_mb):.1f} {peak_mb:.1f} {size_mb:.1f} {count}")
+
+
+def measure(fmt, args):
+    command = [sys.executable, __file__, '--child', fmt,
+               '--batch-size', str(args.batch_size), '--warmup-batches', str(args.warmup_batches)]
+    if args.mysql:
+        command += ['--mysql', '--database', args.database, '--secrets', args.secrets]
+    else:
+        command += ['--embedded', args.embedded]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout.split()
+    elapsed, warm_mb, peak_mb, size_mb, count = output
+    return float(elapsed), float(warm_mb), float(peak_mb), float(size_mb), int(count)
+
+
+def build_embedded(path, rows):
+    """합성 거래 rows개를 담은 임베디드 DB 파일 생성 (ledger_gen.py와 같은 분포)"""
+    from ledger_gen import load_storage
+    from storage import EmbeddedStorage
+
+    storage = EmbeddedStorage(path, analytics=False)
+    try:
+        load_storage(storage, rows, log=lambda message: print(message, file=sys.stderr))
+    finally:
+        storage.close()
+
+
+def run_all(args):
+    failed = False
+    for fmt in ('csv', 'parquet'):
+        elapsed, warm_mb, peak_mb, size_mb, count = measure(fmt, args)
+        growth = peak_mb - warm_mb
+        print(f"{fmt:8s} {count:>10,}행: {elapsed:6.1f}초, 최대 RSS {peak_mb:6.1f}MB "
+              f"({args.warmup_batches}배치 후 {warm_mb:.1f}MB, +{growth:.1f}MB), 파일 {size_mb:,.1f}MB")
+        if growth > args.max_growth_mb:
+            print(f"❌ {fmt}: 최대 RSS 증가 {growth:.1f}MB > {args.max_growth_mb}MB")
+            failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거래 내역 내보내기 메모리 벤치마크")
+    parser.add_argument('--rows', type=int, default=500_000, help="--embedded/--mysql이 없을 때 임시 DB에 만들 합성 거래 수")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--warmup-batches', type=int, default=3, help="RSS 기준점을 잡기 전에 기록할 배치 수")
+    parser.add_argument('--max-growth-mb', type=float, default=20.0,
+                        help="기준점 이후 최대 RSS 증가량이 이 값을 넘으면 종료 코드 1")
+    parser.add_argument('--embedded', metavar='PATH', help="ledger_gen.py --embedded로 만든 SQLite 파일")
+    parser.add_argument('--mysql', action='store_true', help="ledger_gen.py로 만든 MySQL 벤치마크 DB (SSCursor)")
+    parser.add_argument('--database', default=BENCH_DATABASE)
+    parser.add_argument('--secrets', default=SECRETS_FILE)
+    parser.add_argument('--child', choices=['csv', 'parquet'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args)
+        return 0
+    if args.mysql or args.embedded:
+        return run_all(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.embedded = os.path.join(tmp, 'export_bench.db')
+        print(f"📦 임시 DB에 합성 거래 {args.rows:,}행 적재 중...", file=sys.stderr)
+        build_embedded(args.embedded, args.rows)
+        return run_all(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
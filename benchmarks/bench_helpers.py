@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+데이터 조회/저장 함수 벤치마크
+ledger_gen.py로 적재한 벤치마크 데이터베이스에서 저장소(storage.py)의 각 조회/저장 메서드와 예산 사전 확인을 반복 실행해
+p50/p95 지연 시간, 검사한 행 수(Handler_read_*, MySQL만), 최대 메모리를 JSON으로 기록
+사용법: python benchmarks/bench_helpers.py [--iterations 50] [--output results.json]
+        python benchmarks/bench_helpers.py --embedded [data/bench.db]   # MySQL 없이 (경로를 생략하면 메모리에 --rows행 생성)
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import pymysql
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from budget import BudgetEngine
+from db import SECRETS_FILE, ConnectionPool, load_db_config
+from storage import EmbeddedStorage, MySQLStorage
+from ledger_gen import BENCH_DATABASE, load_storage
+
+HANDLER_READ_SQL = "SHOW SESSION STATUS LIKE 'Handler_read%%'"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def handler_reads(pool):
+    """현재 세션의 Handler_read_* 합계 (크기 1인 풀이므로 함수들과 같은 연결)"""
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(HANDLER_READ_SQL)
+            return sum(int(row['Value']) for row in cursor.fetchall())
+
+
+def build_cases(storage):
+    """(이름, 인자 없이 호출 가능한 함수 생성기) 목록"""
+    samples = [
+        (row['transaction_date'], row['transaction_type'], row['amount'], row['category'], row['description'])
+        for row in storage.fetch_transactions(200)
+    ]
+    if not samples:
+        raise SystemExit("❌ 벤치마크 데이터가 없습니다. 먼저 benchmarks/ledger_gen.py를 실행하세요.")
+    # 거래가 있는 달 (요약 테이블)
+    months = sorted({
+        row['month_start'].strftime('%Y-%m')
+        for row in storage.fetch_monthly_totals(date(1000, 1, 1), date(9999, 12, 1))
+    })
+
+    rng = random.Random(0)
+    run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+    counter = iter(range(10 ** 9))
+
+    def new_row():
+        n = next(counter)
+        return (date.today(), '지출', 1000 + n % 50, '식비', f"벤치마크 {run_id} #{n}")
+
+    # 예산 사전 확인은 메모리 누계만 보므로 처음 적재는 측정 전에 끝냄
+    engine = BudgetEngine(storage)
+    engine.reload()
+
+    return [
+        ("fetch_transactions", lambda: storage.fetch_transactions(100)),
+        ("fetch_transaction_page", lambda: storage.fetch_transaction_page(None, None, None, None, 50, None, 'next')),
+        ("fetch_categories", lambda: storage.fetch_categories('지출')),
+        ("fetch_monthly_data", lambda: storage.fetch_monthly_data(rng.choice(months))),
+        ("fetch_monthly_stats (category breakdown)", lambda: storage.fetch_monthly_stats(rng.choice(months))),
+        ("budget check (engine)", lambda: engine.check(date.today(), '지출', 1000, '식비')),
+        ("transaction_exists", lambda: storage.transaction_exists(*rng.choice(samples))),
+        ("save_transaction", lambda: storage.save_transaction(*new_row(), allow_over_limit=True)),
+    ]
+
+
+def measure(pool, func, iterations, status_overhead):
+    """pool이 None이면(임베디드 저장소) 검사 행 수는 재지 않음"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # 검사 행 수와 메모리는 별도 1회 실행으로 측정 (tracemalloc 오버헤드가 지연 시간에 섞이지 않도록)
+    before = handler_reads(pool) if pool is not None else 0
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rows_examined = max(handler_reads(pool) - before - status_overhead, 0) if pool is not None else None
+
+    return {
+        'n': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'rows_examined': rows_examined,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(baseline_file, report):
+    """이전 결과 대비 p50/p95 변화를 표준 오류로 출력"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n📊 {baseline.get('git_commit')} → {report['git_commit']}", file=sys.stderr)
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        rows = (
+            f", 검사 행 {before['rows_examined']:,} → {result['rows_examined']:,}"
+            if before.get('rows_examined') is not None and result['rows_examined'] is not None else ""
+        )
+        print(
+            f"  {name}: p50 {before['p50_ms']:.2f} → {result['p50_ms']:.2f}ms, "
+            f"p95 {before['p95_ms']:.2f} → {result['p95_ms']:.2f}ms{rows}",
+            file=sys.stderr
+        )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 조회/저장 함수 벤치마크")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--database', default=BENCH_DATABASE)
+    parser.add_argument('--secrets', default=SECRETS_FILE)
+    parser.add_argument('--output', help="JSON 결과 파일 (기본: 표준 출력)")
+    parser.add_argument('--baseline', help="비교할 이전 JSON 결과 파일")
+    parser.add_argument('--embedded', metavar='PATH', nargs='?', const=':memory:',
+                        help="MySQL 대신 EmbeddedStorage (경로 생략 시 메모리 DB에 --rows행 합성)")
+    parser.add_argument('--rows', type=int, default=10_000, help="메모리 DB에 만들 합성 거래 수")
+    args = parser.parse_args()
+
+    if args.embedded:
+        # 메모리 DB는 연결(스레드)마다 따로 생기므로 모든 함수를 이 스레드에서 호출
+        storage = EmbeddedStorage(args.embedded)
+        if args.embedded == ':memory:':
+            print(f"📦 메모리 DB에 합성 거래 {args.rows:,}행 적재 중...", file=sys.stderr)
+            load_storage(storage, args.rows, log=lambda message: print(message, file=sys.stderr))
+        pool = None
+        status_overhead = 0
+        row_count = storage._query("SELECT COUNT(*) as count FROM transactions")[0]['count']
+    else:
+        config = load_db_config(args.secrets)
+        config.update(database=args.database, cursorclass=pymysql.cursors.DictCursor)
+        # 크기 1인 풀의 저장소: 모든 함수가 같은 세션을 쓰므로 세션 상태 차이로 검사 행 수를 잴 수 있음
+        pool = ConnectionPool(config, max_size=1)
+        storage = MySQLStorage(pool)
+        # SHOW STATUS 자체가 올리는 Handler_read 값 보정
+        baseline_reads = handler_reads(pool)
+        status_overhead = handler_reads(pool) - baseline_reads
+        with pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) as count FROM transactions")
+                row_count = cursor.fetchone()['count']
+    cases = build_cases(storage)
+
+    results = {}
+    for name, func in cases:
+        print(f"⏱️ {name}...", file=sys.stderr)
+        results[name] = measure(pool, func, args.iterations, status_overhead)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'backend': storage.backend,
+        'database': args.embedded or args.database,
+        'row_count': row_count,
+        'iterations': args.iterations,
+        'pool': pool.stats.snapshot() if pool is not None else None,
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"✅ 결과 저장: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        compare(args.baseline, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
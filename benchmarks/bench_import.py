@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+앱 시작(import) 시간 확인
+새 프로세스에서 python -X importtime으로 app.py를 불러와 모듈별 시간을 집계하고,
+무거운 모듈(pandas, matplotlib 등)이 시작 시 불러와지거나 전체 시간이 기준을 넘으면 종료 코드 1
+(Streamlit 자체 import 시간은 빼고 앱이 더하는 시간만 비교)
+사용법: python benchmarks/bench_import.py [--runs 5] [--max-ms 150] [--baseline import.json] [--output import.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 처음 쓰는 화면에서만 불러와야 하는 모듈
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'pyarrow', 'duckdb']
+
+# 기준 대비 이 비율 이상 느려지면 회귀로 판단 (프로세스 시작 시간 편차 감안)
+REGRESSION_RATIO = 1.25
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → {최상위 패키지: 누적 µs}, 불러온 모듈 이름 집합"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # 머리글 줄
+        name = fields[2].rstrip()
+        modules.add(name.strip())
+        # '|' 뒤 공백 1칸이면 프로세스가 직접 불러온 최상위 모듈 (하위 모듈은 단계마다 2칸씩 더 들여씀)
+        if not name.startswith('  '):
+            top_level[name.strip()] = int(fields[1])
+    return top_level, modules
+
+
+def measure_once(statement):
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"❌ import 실패:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure(runs):
+    """최소값 기준 (캐시/스케줄링 잡음 제거): streamlit만, app 전체, app이 더하는 시간"""
+    streamlit_times = []
+    app_times = []
+    modules = set()
+    children = {}
+    for _ in range(runs):
+        top_level, _ = measure_once("import streamlit")
+        streamlit_times.append(top_level.get('streamlit', 0))
+
+        # streamlit을 먼저 불러와 app의 누적 시간에 streamlit이 섞이지 않게 함
+        top_level, modules = measure_once("import streamlit; import app")
+        app_times.append(top_level.get('app', 0))
+        for name, value in top_level.items():
+            children[name] = min(children.get(name, value), value)
+
+    return {
+        'streamlit_ms': round(min(streamlit_times) / 1000, 1),
+        'app_ms': round(min(app_times) / 1000, 1),
+        'heavy_modules': sorted(name for name in HEAVY_MODULES if name in modules),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 시작(import) 시간 확인")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=150.0, help="app.py가 streamlit 외에 더하는 import 시간 상한")
+    parser.add_argument('--baseline', help="비교할 이전 JSON 결과 파일")
+    parser.add_argument('--output', help="JSON 결과 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    failures = []
+    if report['heavy_modules']:
+        failures.append(f"시작 시 불러온 무거운 모듈: {', '.join(report['heavy_modules'])}")
+    if report['app_ms'] > args.max_ms:
+        failures.append(f"app import {report['app_ms']}ms > 상한 {args.max_ms}ms")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if report['app_ms'] > baseline['app_ms'] * REGRESSION_RATIO:
+            failures.append(f"app import {baseline['app_ms']} → {report['app_ms']}ms (기준 대비 {REGRESSION_RATIO}배 초과)")
+
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    if not failures:
+        print(f"✅ app import {report['app_ms']}ms (streamlit {report['streamlit_ms']}ms 별도)", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
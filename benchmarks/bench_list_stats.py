@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+거래 목록 통계 벤치마크
+문자열 포맷 후 다시 파싱하던 기존 방식과 숫자형 벡터 집계 방식을 비교
+사용법: python benchmarks/bench_list_stats.py [--rows 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import summarize_transactions, to_typed_frame
+
+CATEGORIES = [('회비', '수입'), ('후원금', '수입'), ('기타 수입', '수입'),
+              ('식비', '지출'), ('교통비', '지출'), ('재료비', '지출'), ('행사비', '지출'), ('기타 지출', '지출')]
+
+
+def make_rows(n, seed=0):
+    """pymysql DictCursor 결과와 같은 형태(date, Decimal)의 합성 거래 행"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(CATEGORIES), n)
+    days = rng.integers(0, 365, n)
+    amounts = rng.integers(1, 200, n) * 1000
+    start = date(2024, 1, 1)
+    created = datetime(2024, 1, 1)
+    return [
+        {
+            'id': i + 1,
+            'created_at': created + timedelta(seconds=i),
+            'transaction_date': start + timedelta(days=int(days[i])),
+            'transaction_type': CATEGORIES[picks[i]][1],
+            'amount': Decimal(int(amounts[i])),
+            'category': CATEGORIES[picks[i]][0],
+            'description': f"거래 {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_stats(df):
+    """기존 show_transaction_list 방식: 행마다 문자열 포맷 후 다시 float로 파싱"""
+    df = df.copy()
+    df['transaction_date'] = pd.to_datetime(df['transaction_date']).dt.strftime('%Y-%m-%d')
+    df['amount'] = df['amount'].apply(lambda x: f"{x:,.0f}원")
+    total_income = df[df['transaction_type'] == '수입']['amount'].str.replace('원', '').str.replace(',', '').astype(float).sum()
+    total_expense = df[df['transaction_type'] == '지출']['amount'].str.replace('원', '').str.replace(',', '').astype(float).sum()
+    return total_income, total_expense
+
+
+def typed_stats(df):
+    """현재 방식: 숫자형 변환 + 벡터 집계 (카테고리별/일자별 집계 포함)"""
+    df = df.copy()
+    df['transaction_date'] = pd.to_datetime(df['transaction_date'])
+    df['amount'] = df['amount'].astype('float64')
+    totals, _, _ = summarize_transactions(df)
+    return totals['income'], totals['expense']
+
+
+def best_of(func, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거래 목록 통계 벤치마크")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    # 조회 결과 → DataFrame 생성은 두 방식 공통 비용이므로 따로 측정
+    frame_time, df = best_of(pd.DataFrame, rows, args.repeat)
+    legacy_time, legacy_result = best_of(legacy_stats, df, args.repeat)
+    typed_time, typed_result = best_of(typed_stats, df, args.repeat)
+
+    assert legacy_result == typed_result, (legacy_result, typed_result)
+    assert typed_stats(df) == typed_stats(to_typed_frame(rows))
+    print(f"행 수: {args.rows:,}")
+    print(f"DataFrame 생성 (공통): {frame_time * 1000:,.1f}ms")
+    print(f"기존 (문자열 왕복): {legacy_time * 1000:,.1f}ms")
+    print(f"현재 (벡터 집계):   {typed_time * 1000:,.1f}ms")
+    print(f"개선: {legacy_time / typed_time:,.1f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+합성 장부 생성기
+카테고리/날짜 분포가 치우친 현실적인 거래 내역을 벤치마크용 MySQL 데이터베이스(또는 로컬 SQLite 파일)에 적재
+사용법: python benchmarks/ledger_gen.py --size medium [--database solux_finance_bench]
+        python benchmarks/ledger_gen.py --size medium --embedded data/bench.db   # MySQL 없이
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pymysql
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import SECRETS_FILE, load_db_config
+from manage import bootstrap_schema
+
+SIZES = {'small': 10_000, 'medium': 1_000_000, 'large': 10_000_000}
+
+BENCH_DATABASE = "solux_finance_bench"
+
+# (카테고리, 유형, 상대 빈도, 금액 로그 평균) - 식비/회비에 몰리는 분포
+CATEGORY_PROFILE = [
+    ('식비', '지출', 40, 10.3),
+    ('회비', '수입', 25, 10.0),
+    ('교통비', '지출', 12, 8.8),
+    ('재료비', '지출', 8, 10.0),
+    ('행사비', '지출', 6, 11.5),
+    ('후원금', '수입', 4, 11.0),
+    ('기타 지출', '지출', 3, 9.5),
+    ('기타 수입', '수입', 2, 9.5),
+]
+
+# 월별 가중치: 학기 중(3~6월, 9~12월)에 거래가 몰림
+MONTH_WEIGHTS = np.array([2, 2, 9, 8, 7, 6, 2, 2, 9, 8, 7, 6], dtype=float)
+
+MEMBERS = ['송지민', '김하늘', '이서연', '박도윤', '최유진', '정민준', '강지우', '윤서아']
+DESCRIPTIONS = {
+    '식비': ['회식', '정기 모임 간식', '스터디 점심'],
+    '회비': ['{member} 회비', '{member} 재입금'],
+    '교통비': ['행사 참여 교통비', '답사 교통비'],
+    '재료비': ['프로젝트 재료 구매', '인쇄비'],
+    '행사비': ['해커톤 대관료', '세미나 다과'],
+    '후원금': ['교수님 지원금', '동문 후원'],
+    '기타 지출': ['비품 구매', '은행 수수료'],
+    '기타 수입': ['이자', '환불'],
+}
+
+
+def generate_batch(rng, start, count, first_year, years):
+    """start번째부터 count개의 거래 튜플 생성 (최근 연도일수록 거래가 많음)"""
+    weights = np.array([row[2] for row in CATEGORY_PROFILE], dtype=float)
+    picks = rng.choice(len(CATEGORY_PROFILE), size=count, p=weights / weights.sum())
+
+    year_weights = np.arange(1, years + 1, dtype=float)
+    year_offsets = rng.choice(years, size=count, p=year_weights / year_weights.sum())
+    months = rng.choice(12, size=count, p=MONTH_WEIGHTS / MONTH_WEIGHTS.sum()) + 1
+    days = rng.integers(1, 29, size=count)
+    means = np.array([CATEGORY_PROFILE[i][3] for i in picks])
+    amounts = np.maximum(np.round(rng.lognormal(means, 0.6) / 1000) * 1000, 1000)
+    member_picks = rng.integers(0, len(MEMBERS), size=count)
+    template_picks = rng.integers(0, 3, size=count)
+
+    rows = []
+    for i in range(count):
+        category, transaction_type, _, _ = CATEGORY_PROFILE[picks[i]]
+        templates = DESCRIPTIONS[category]
+        description = templates[template_picks[i] % len(templates)].format(member=MEMBERS[member_picks[i]])
+        rows.append((
+            date(first_year + int(year_offsets[i]), int(months[i]), int(days[i])),
+            transaction_type,
+            float(amounts[i]),
+            category,
+            # 일련번호를 붙여 unique_transaction 키와 겹치지 않게 함
+            f"{description} #{start + i}",
+        ))
+    return rows
+
+
+def write_batches(write, rows, years=5, batch_size=10_000, seed=42, log=print):
+    """합성 거래 rows개를 batch_size씩 만들어 write(batch)로 기록"""
+    rng = np.random.default_rng(seed)
+    first_year = date.today().year - years + 1
+    started = time.perf_counter()
+    for start in range(0, rows, batch_size):
+        batch = generate_batch(rng, start, min(batch_size, rows - start), first_year, years)
+        write(batch)
+        done = start + len(batch)
+        if done % (batch_size * 10) == 0 or done == rows:
+            log(f"  {done:,}/{rows:,}행 ({time.perf_counter() - started:.0f}초)")
+
+
+def load_ledger(connection, rows, years=5, batch_size=10_000, seed=42, log=print):
+    """합성 거래 rows개를 batch_size씩 다중 행 INSERT로 MySQL에 적재"""
+    sql = """
+    INSERT IGNORE INTO transactions (transaction_date, transaction_type, amount, category, description)
+    VALUES (%s, %s, %s, %s, %s)
+    """
+
+    def write(batch):
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        connection.commit()
+
+    write_batches(write, rows, years, batch_size, seed, log)
+
+
+def load_storage(storage, rows, years=5, batch_size=10_000, seed=42, log=print):
+    """합성 거래 rows개를 저장소(EmbeddedStorage 등)의 insert_ignore로 배치마다 한 트랜잭션씩 적재"""
+    write_batches(storage.insert_ignore, rows, years, batch_size, seed, log)
+
+
+def connect_bench(secrets_file=SECRETS_FILE, database=BENCH_DATABASE, create=False):
+    """벤치마크 전용 데이터베이스 연결 (create=True면 데이터베이스 생성)"""
+    config = load_db_config(secrets_file)
+    if create:
+        server = pymysql.connect(**{**config, 'database': None})
+        with server.cursor() as cursor:
+            cursor.execute(
+                f"CREATE DATABASE IF NOT EXISTS `{database}` "
+                "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+            )
+        server.close()
+    config['database'] = database
+    return pymysql.connect(**config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 장부 생성기")
+    parser.add_argument('--size', choices=list(SIZES), default='small', help="10k / 1M / 10M 행")
+    parser.add_argument('--rows', type=int, help="행 수 직접 지정 (--size보다 우선)")
+    parser.add_argument('--years', type=int, default=5, help="생성할 기간 (최근 N년)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', default=BENCH_DATABASE, help="대상 데이터베이스 (운영 DB와 분리)")
+    parser.add_argument('--secrets', default=SECRETS_FILE)
+    parser.add_argument('--embedded', metavar='PATH', help="MySQL 대신 이 SQLite 파일에 적재 (EmbeddedStorage)")
+    parser.add_argument('--reset', action='store_true', help="적재 전 transactions와 요약/잔고 테이블 비우기")
+    args = parser.parse_args()
+
+    rows = args.rows or SIZES[args.size]
+    if args.embedded:
+        return main_embedded(args.embedded, rows, args)
+    connection = connect_bench(args.secrets, args.database, create=True)
+    try:
+        print(f"🔧 스키마 준비: {args.database}")
+        bootstrap_schema(connection)
+        if args.reset:
+            with connection.cursor() as cursor:
+                # TRUNCATE는 행 단위 트리거를 실행하지 않으므로 요약 테이블도 함께 비움
+                cursor.execute("TRUNCATE TABLE transactions")
+                cursor.execute("TRUNCATE TABLE monthly_summary")
+                cursor.execute("TRUNCATE TABLE daily_balance")
+                cursor.execute("TRUNCATE TABLE monthly_balance")
+            connection.commit()
+        print(f"📦 합성 거래 {rows:,}행 적재 중...")
+        load_ledger(connection, rows, years=args.years, seed=args.seed)
+        print("✅ 완료!")
+    finally:
+        connection.close()
+    return 0
+
+
+def main_embedded(path, rows, args):
+    from storage import EmbeddedStorage
+
+    if args.reset:
+        # 파일을 새로 만들면 스키마/기본 예산도 다시 생성됨
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    print(f"🔧 스키마 준비: {path}")
+    storage = EmbeddedStorage(path, analytics=False)
+    try:
+        print(f"📦 합성 거래 {rows:,}행 적재 중...")
+        load_storage(storage, rows, years=args.years, seed=args.seed)
+        print("✅ 완료!")
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+solux 회계 관리 시스템 - 예산 엔진
+budgets 테이블의 월/카테고리별 지출 한도와 메모리의 (월, 카테고리) 지출 누계로
+한도 확인과 남은 예산을 DB 합계 조회 없이 계산 (Streamlit 의존 없음)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+
+from content_hash import transaction_hash
+from db import month_range
+
+# budgets.budget_month: 'YYYY-MM' 또는 모든 달에 적용되는 기본값
+ALL_MONTHS = '*'
+# budgets.category: 빈 문자열은 카테고리 구분 없는 월 전체 지출 한도
+TOTAL_CATEGORY = ''
+# 예산을 따로 정하지 않았을 때의 월 전체 지출 한도 (migrations/007의 기본 행)
+DEFAULT_MONTHLY_LIMIT = 200000
+
+
+def _decimal(value):
+    # MySQL DECIMAL은 Decimal, SQLite NUMERIC 합계는 int/float로 옴
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+@dataclass
+class BudgetStatus:
+    """한 달의 한 예산 항목 (category가 TOTAL_CATEGORY면 월 전체)"""
+
+    year_month: str
+    category: str
+    limit: Decimal
+    spent: Decimal
+
+    @property
+    def label(self):
+        return "월 전체" if self.category == TOTAL_CATEGORY else self.category
+
+    @property
+    def remaining(self):
+        return self.limit - self.spent
+
+    @property
+    def ratio(self):
+        """사용 비율 (0 이상, 한도 초과 시 1보다 큼)"""
+        return float(self.spent / self.limit) if self.limit > 0 else 0.0
+
+    @property
+    def exceeded(self):
+        return self.spent > self.limit
+
+
+def month_limits(limits, year_month):
+    """{(budget_month, category): 한도}에서 그 달에 적용되는 {카테고리: 한도} - 그 달 전용 한도가 모든 달 기본값보다 우선"""
+    applied = {category: limit for (month, category), limit in limits.items() if month == ALL_MONTHS}
+    applied.update({category: limit for (month, category), limit in limits.items() if month == year_month})
+    return applied
+
+
+def exceeded_budgets(year_month, limits, spent, category, amount):
+    """그 달 지출에 amount(category)를 더했을 때 한도를 넘는 BudgetStatus 목록
+
+    limits: month_limits 결과, spent: {카테고리: 지출 합계} (TOTAL_CATEGORY는 월 전체)
+    """
+    amount = _decimal(amount)
+    exceeded = []
+    for name in (TOTAL_CATEGORY, category):
+        if name in limits:
+            status = BudgetStatus(year_month, name, limits[name], spent.get(name, Decimal(0)) + amount)
+            if status.exceeded:
+                exceeded.append(status)
+    return exceeded
+
+
+def check_rows(budget_rows, expense_rows, transaction_date, amount, category):
+    """DB에서 읽은 행으로 지출 거래의 한도 확인 (저장 트랜잭션 안에서 쓰는 exceeded_budgets)
+
+    budget_rows: budgets 행 (budget_month, category, limit_amount)
+    expense_rows: 그 달 monthly_summary 지출 행 (category, total_amount)
+    """
+    year_month = transaction_date.strftime('%Y-%m')
+    limits = month_limits(
+        {(row['budget_month'], row['category']): _decimal(row['limit_amount']) for row in budget_rows}, year_month
+    )
+    spent = {TOTAL_CATEGORY: Decimal(0)}
+    for row in expense_rows:
+        total = _decimal(row['total_amount'])
+        spent[row['category']] = spent.get(row['category'], Decimal(0)) + total
+        spent[TOTAL_CATEGORY] += total
+    return exceeded_budgets(year_month, limits, spent, category, amount)
+
+
+class BudgetEngine:
+    """예산 한도와 월/카테고리별 지출 누계를 메모리에 두는 스레드 안전 엔진
+
+    처음 사용할 때(그리고 refresh_interval초마다) 한도 전체와 monthly_summary의 지출 합계를
+    각각 한 번의 조회로 읽고, 이후에는 앱의 쓰기마다 record()로 누계를 갱신한다.
+    다른 프로세스(manage.py import 등)의 쓰기는 다음 새로 읽기 때 반영되며,
+    verify()로 transactions와 직접 비교할 수 있다.
+    그래서 check()는 DB 조회 없는 사전 확인이고, 최종 한도 확인은 storage.save_transaction이
+    그 달 지출 요약 행을 잠근 저장 트랜잭션 안에서 다시 한다.
+
+    저장 대기열(write_queue.py)에 들어 있는 지출은 DB에 없으므로 누계와 따로 내용 해시별로 두고
+    (add_pending), 새로 읽기와 관계없이 spent()에 더한다. 반영되면 queue_flushed()가 빼고 DB에서 다시 읽는다.
+    """
+
+    def __init__(self, storage, refresh_interval=300):
+        self.storage = storage
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._limits = {}  # (budget_month, category) -> 한도
+        self._totals = {}  # (월 1일, category) -> 지출 누계, (월 1일, TOTAL_CATEGORY)는 그 달 전체
+        self._pending = {}  # 대기열 거래의 내용 해시 -> (월 1일, category, 금액)
+        self._pending_totals = {}  # _totals와 같은 키의 대기열 지출 합계
+        self._loaded_at = None
+        self.loads = 0
+        self.last_error = None
+
+    def _ensure_loaded(self):
+        # 잠금 보유 상태에서 호출
+        if self._loaded_at is None:
+            self._load()
+        elif time.monotonic() - self._loaded_at >= self.refresh_interval:
+            try:
+                self._load()
+            except Exception as e:
+                # DB에 연결할 수 없으면 이미 읽은 값으로 계속하고 다음 간격에 다시 시도
+                self.last_error = str(e)
+                self._loaded_at = time.monotonic()
+
+    def _load(self):
+        limits = {
+            (row['budget_month'], row['category']): _decimal(row['limit_amount'])
+            for row in self.storage.fetch_budgets()
+        }
+        totals = {}
+        for row in self.storage.fetch_expense_totals():
+            self._add(totals, row['month_start'], row['category'], _decimal(row['total']))
+        self._limits, self._totals = limits, totals
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+
+    @staticmethod
+    def _add(totals, month_start, category, amount):
+        for key in ((month_start, category), (month_start, TOTAL_CATEGORY)):
+            totals[key] = totals.get(key, Decimal(0)) + amount
+
+    def reload(self):
+        """한도와 누계를 DB에서 다시 읽음 (예산 변경, 일괄 가져오기 후)"""
+        with self._lock:
+            self._load()
+
+    @contextmanager
+    def writing(self):
+        """확인과 누계 반영 사이에 같은 프로세스의 다른 쓰기가 끼어들지 않도록 엔진을 잠근 구간
+
+        로컬 대기열 기록처럼 짧은 쓰기에만 쓴다. 원격 DB 저장은 잠금 밖에서 하고
+        record(since=저장 전 loads)로 반영한다 (대시보드 조회가 DB 왕복 동안 막히지 않도록).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            yield self
+
+    def limits_for(self, year_month):
+        """{카테고리: 한도} - 그 달 전용 한도가 모든 달 기본값보다 우선"""
+        with self._lock:
+            self._ensure_loaded()
+            return month_limits(self._limits, year_month)
+
+    def spent(self, year_month, category=TOTAL_CATEGORY):
+        """그 달의 지출 누계 (category가 TOTAL_CATEGORY면 전체)"""
+        with self._lock:
+            self._ensure_loaded()
+            key = (month_range(year_month)[0], category)
+            return self._totals.get(key, Decimal(0)) + self._pending_totals.get(key, Decimal(0))
+
+    def statuses(self, year_month):
+        """그 달 예산 항목별 BudgetStatus (월 전체 먼저, 나머지는 카테고리 이름순)"""
+        with self._lock:
+            limits = self.limits_for(year_month)
+            return [
+                BudgetStatus(year_month, category, limits[category], self.spent(year_month, category))
+                for category in sorted(limits, key=lambda name: (name != TOTAL_CATEGORY, name))
+            ]
+
+    def check(self, transaction_date, transaction_type, amount, category):
+        """거래를 더했을 때 한도를 넘는 예산 항목의 BudgetStatus 목록 (수입이면 항상 빈 목록)"""
+        if transaction_type != '지출':
+            return []
+        year_month = transaction_date.strftime('%Y-%m')
+        with self._lock:
+            spent = {name: self.spent(year_month, name) for name in (TOTAL_CATEGORY, category)}
+            return exceeded_budgets(year_month, self.limits_for(year_month), spent, category, amount)
+
+    def record(self, transaction_date, transaction_type, amount, category, since=None):
+        """저장된 거래를 누계에 반영 (삭제는 amount에 음수)
+
+        since: 잠금 밖에서 저장하기 전에 읽은 loads 값. 저장 도중 누계를 다시 읽었다면
+        그 읽기에 이 거래가 들어 있는지 알 수 없으므로 더하지 않고 DB에서 한 번 더 읽는다.
+        """
+        if transaction_type != '지출':
+            return
+        with self._lock:
+            if since is not None and since != self.loads:
+                self._reload_after_write()
+            # 아직 읽지 않았다면 다음 읽기에 이 거래가 포함됨
+            elif self._loaded_at is not None:
+                self._add(self._totals, transaction_date.replace(day=1), category, _decimal(amount))
+
+    def _reload_after_write(self):
+        """잠금 보유 상태에서 호출, 성공 여부 반환 (실패하면 다음 사용 때 다시 읽도록 표시)"""
+        try:
+            self._load()
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            self._loaded_at = time.monotonic() - self.refresh_interval
+            return False
+
+    def add_pending(self, transaction_date, transaction_type, amount, category, description):
+        """대기열에 넣은 지출을 반영될 때까지 따로 더함 (같은 내용은 한 번만)"""
+        if transaction_type != '지출':
+            return
+        content_hash = transaction_hash(transaction_date, transaction_type, amount, category, description)
+        with self._lock:
+            if content_hash in self._pending:
+                return
+            entry = (transaction_date.replace(day=1), category, _decimal(amount))
+            self._pending[content_hash] = entry
+            self._add(self._pending_totals, *entry)
+
+    def queue_flushed(self, saved, duplicates, failed):
+        """WriteQueue.flush의 on_flushed: 반영/중복/보류된 행을 대기 지출에서 빼고 저장된 지출은 DB에서 다시 읽음
+
+        저장 커밋 뒤에 읽으므로 반영 도중 새로 읽었더라도 두 번 더하거나 빠뜨리지 않는다.
+        """
+        with self._lock:
+            for row in saved + duplicates + failed:
+                entry = self._pending.pop(transaction_hash(*row), None)
+                if entry is not None:
+                    month_start, category, amount = entry
+                    self._add(self._pending_totals, month_start, category, -amount)
+            expenses = [row for row in saved if row[1] == '지출']
+            if self._loaded_at is not None and expenses and not self._reload_after_write():
+                # 다시 읽지 못했으면 지금 누계에는 없으므로 직접 더함
+                for transaction_date, _, amount, category, _ in expenses:
+                    self._add(self._totals, transaction_date.replace(day=1), category, _decimal(amount))
+
+    def verify(self):
+        """메모리 누계와 transactions에서 다시 계산한 월/카테고리별 지출의 차이 목록
+
+        반환값: [((월 1일, 카테고리), 실제 합계, 엔진 누계)]
+        보관된 회계연도(storage.archive_boundary() 이전)는 원본 거래가 DB에 없을 수 있으므로 비교하지 않는다.
+        """
+        boundary = self.storage.archive_boundary()
+        expected = {}
+        # 잠근 채 읽어 같은 프로세스의 저장이 조회와 누계 사이에 끼어들지 않게 함
+        with self._lock:
+            self._ensure_loaded()
+            for row in self.storage.fetch_daily_expense_totals():
+                key = (row['transaction_date'].replace(day=1), row['category'])
+                expected[key] = expected.get(key, Decimal(0)) + _decimal(row['total'])
+            actual = {
+                key: total for key, total in self._totals.items() if key[1] != TOTAL_CATEGORY and total != 0
+            }
+        if boundary is not None:
+            expected = {key: total for key, total in expected.items() if key[0] >= boundary}
+            actual = {key: total for key, total in actual.items() if key[0] >= boundary}
+        return [
+            (key, expected.get(key, Decimal(0)), actual.get(key, Decimal(0)))
+            for key in sorted(set(expected) | set(actual))
+            if expected.get(key, Decimal(0)) != actual.get(key, Decimal(0))
+        ]
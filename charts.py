@@ -0,0 +1,81 @@
+"""
+solux 회계 관리 시스템 - 수입/지출 추이 차트
+pyplot 전역 레지스트리를 거치지 않는 Figure로 그리고, 데이터 해시 기준으로 PNG를 캐시
+"""
+
+import hashlib
+import io
+
+import matplotlib
+import pandas as pd
+
+# 디스플레이가 없는 서버: GUI 백엔드 탐색 없이 Agg로 고정 (pyplot을 쓰는 코드가 있어도 같은 백엔드)
+matplotlib.use('Agg')
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from query_cache import QueryCache
+
+# 렌더링된 PNG 캐시 (같은 데이터면 다시 래스터화하지 않음)
+png_cache = QueryCache(max_entries=64)
+PNG_TTL = 3600
+
+SERIES_STYLES = {
+    '수입': dict(marker='o', linewidth=2, label='수입', color='green'),
+    '지출': dict(marker='s', linewidth=2, label='지출', color='red'),
+    '잔고': dict(linewidth=2, label='잔고', color='blue'),
+    # 추이 분석 이동 평균 (analytics.TrendStats.chart_frame)
+    '수입 3개월 평균': dict(linewidth=1.5, linestyle='--', label='수입 3개월 평균', color='green'),
+    '지출 3개월 평균': dict(linewidth=1.5, linestyle='--', label='지출 3개월 평균', color='red'),
+    '수입 12개월 평균': dict(linewidth=1.5, linestyle=':', label='수입 12개월 평균', color='#006400'),
+    '지출 12개월 평균': dict(linewidth=1.5, linestyle=':', label='지출 12개월 평균', color='#8b0000'),
+}
+
+
+def chart_key(chart_data, title):
+    """차트 데이터(값, 인덱스, 열)와 제목의 해시"""
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(chart_data, index=True).to_numpy().tobytes())
+    digest.update(repr(list(chart_data.columns)).encode('utf-8'))
+    digest.update(title.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def draw_trend(chart_data, title, figsize=(12, 6), dpi=100):
+    """수입/지출/잔고 추이 Figure 생성 (pyplot을 쓰지 않으므로 전역 레지스트리에 남지 않음)"""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    for column, style in SERIES_STYLES.items():
+        if column in chart_data.columns:
+            ax.plot(chart_data.index, chart_data[column], **style)
+
+    ax.set_xlabel('날짜')
+    ax.set_ylabel('금액 (원)')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # x축 날짜 포맷팅
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def render_trend_png(chart_data, title):
+    """수입/지출 추이 PNG bytes (데이터 해시 기준 캐시)"""
+    key = chart_key(chart_data, title)
+    found, png = png_cache.get(key)
+    if found:
+        return png
+
+    fig = draw_trend(chart_data, title)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    # 캔버스/아티스트 참조를 끊어 즉시 해제되도록 정리
+    fig.clear()
+    png = buffer.getvalue()
+    png_cache.set(key, png, PNG_TTL)
+    return png
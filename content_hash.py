@@ -0,0 +1,71 @@
+"""
+solux 회계 관리 시스템 - 거래 내용 해시 (중복 판정 키)
+날짜/유형/금액/카테고리/설명 전체를 정규화해 SHA-256으로 만든 값 (Streamlit 의존 없음)
+
+MySQL은 migrations/005의 생성 열이 TRANSACTION_HASH_SQL로, SQLite와 CSV 가져오기는
+transaction_hash()로 같은 값을 계산한다. 정규화 규칙:
+- 날짜는 'YYYY-MM-DD', 금액은 소수 둘째 자리까지 ('50000.00', DECIMAL(10, 2)의 문자열 변환과 같음)
+- 설명은 NULL을 빈 문자열로 보고 앞뒤 공백 제거 (MySQL TRIM과 같이 공백 문자만)
+- 필드 사이는 단위 구분 문자(0x1F)로 연결
+"""
+
+import hashlib
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+HASH_SEPARATOR = '\x1f'
+
+# migrations/005의 content_hash 생성 열 식 (transaction_hash()와 같은 값)
+TRANSACTION_HASH_SQL = (
+    "SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), transaction_date, transaction_type, amount, category, "
+    "TRIM(COALESCE(description, ''))), 256)"
+)
+
+# SQLite에서 같은 값을 계산하는 식 (transaction_hash는 EmbeddedStorage가 연결마다 등록)
+SQLITE_HASH_SQL = "transaction_hash(transaction_date, transaction_type, amount, category, description)"
+
+_CENT = Decimal('0.01')
+
+
+def _date_text(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _amount_text(value):
+    return str(Decimal(str(value)).quantize(_CENT, rounding=ROUND_HALF_UP))
+
+
+def transaction_hash(transaction_date, transaction_type, amount, category, description):
+    """거래 내용 해시 (64자리 16진수)"""
+    text = HASH_SEPARATOR.join([
+        _date_text(transaction_date),
+        str(transaction_type),
+        _amount_text(amount),
+        str(category),
+        (description or '').strip(' '),
+    ])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def collisions_sql(hash_expression):
+    """해시가 같은 거래 묶음 (content_hash, count, ids) 조회 SQL
+
+    생성 열/색인이 생기기 전에도 쓸 수 있도록 저장된 열 대신 해시 식으로 직접 묶는다.
+    """
+    return f"""
+    SELECT {hash_expression} as content_hash, COUNT(*) as count, GROUP_CONCAT(id) as ids
+    FROM transactions
+    GROUP BY 1
+    HAVING COUNT(*) > 1
+    ORDER BY MIN(id)
+    """
+
+
+def format_collisions(collisions):
+    """충돌 보고 줄 목록"""
+    return [
+        f"  - 거래 id {row['ids']}: 같은 내용 {row['count']}건 (해시 {row['content_hash'][:12]}…)"
+        for row in collisions
+    ]
@@ -0,0 +1,320 @@
+-- 동아리 회계 관리 시스템 임베디드(로컬/오프라인) 데이터베이스 설정
+-- SQLite 3.35 이상, database_setup.sql + migrations/ 와 같은 스키마
+-- storage.EmbeddedStorage가 파일을 열 때마다 실행 (모든 문장은 여러 번 실행해도 안전)
+-- description_ngrams(), transaction_hash() 함수는 EmbeddedStorage가 연결마다 등록 (search.py, content_hash.py)
+
+PRAGMA journal_mode = WAL;
+
+-- 거래 내역 테이블
+-- (금액은 원 단위 정수/소수를 그대로 저장, 날짜는 'YYYY-MM-DD' 문자열)
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_date DATE NOT NULL,
+    transaction_type TEXT NOT NULL CHECK (transaction_type IN ('수입', '지출')),
+    amount NUMERIC NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    content_hash TEXT
+);
+
+-- 중복 입력 방지: 내용 해시 유니크 인덱스 (migrations/005와 같은 기준)
+-- content_hash는 EmbeddedStorage가 INSERT마다 transaction_hash()로 계산해 넣음
+CREATE UNIQUE INDEX IF NOT EXISTS unique_transaction ON transactions (content_hash);
+
+-- 앱 밖에서 해시 없이 넣은 행 (이전 버전 파일 포함) 채우기
+UPDATE transactions SET content_hash = transaction_hash(transaction_date, transaction_type, amount, category, description)
+WHERE content_hash IS NULL;
+
+-- 월 구간 조회 / 거래 목록 키셋 페이지네이션 (migrations/001, 003과 같은 인덱스)
+CREATE INDEX IF NOT EXISTS idx_date_type_category_amount
+    ON transactions (transaction_date, transaction_type, category, amount);
+CREATE INDEX IF NOT EXISTS idx_date_created ON transactions (transaction_date, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_type_date_created ON transactions (transaction_type, transaction_date, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_category_date_created ON transactions (category, transaction_date, created_at, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_updated_at
+AFTER UPDATE OF transaction_date, transaction_type, amount, category, description ON transactions
+FOR EACH ROW
+BEGIN
+    UPDATE transactions SET
+        updated_at = CURRENT_TIMESTAMP,
+        content_hash = transaction_hash(NEW.transaction_date, NEW.transaction_type, NEW.amount, NEW.category, NEW.description)
+    WHERE id = NEW.id;
+END;
+
+-- 카테고리 테이블 (기본 카테고리)
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL CHECK (type IN ('수입', '지출')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO categories (name, type) VALUES
+-- 수입 카테고리
+('회비', '수입'),
+('후원금', '수입'),
+('기타 수입', '수입'),
+-- 지출 카테고리
+('식비', '지출'),
+('교통비', '지출'),
+('재료비', '지출'),
+('행사비', '지출'),
+('기타 지출', '지출');
+
+-- 월별 요약 테이블 (migrations/002와 같은 구조, 트리거로 유지)
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    month_start DATE NOT NULL,
+    transaction_type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total_amount NUMERIC NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (month_start, transaction_type, category)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_summary_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO monthly_summary (month_start, transaction_type, category, total_amount, transaction_count)
+    VALUES (date(NEW.transaction_date, 'start of month'), NEW.transaction_type, NEW.category, NEW.amount, 1)
+    ON CONFLICT (month_start, transaction_type, category) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_summary_update
+AFTER UPDATE OF transaction_date, transaction_type, category, amount ON transactions
+FOR EACH ROW
+BEGIN
+    UPDATE monthly_summary SET
+        total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE month_start = date(OLD.transaction_date, 'start of month')
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category;
+
+    INSERT INTO monthly_summary (month_start, transaction_type, category, total_amount, transaction_count)
+    VALUES (date(NEW.transaction_date, 'start of month'), NEW.transaction_type, NEW.category, NEW.amount, 1)
+    ON CONFLICT (month_start, transaction_type, category) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        transaction_count = transaction_count + 1,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_summary_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    UPDATE monthly_summary SET
+        total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE month_start = date(OLD.transaction_date, 'start of month')
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category;
+END;
+
+-- 누적 잔고 (migrations/006과 같은 구조, 트리거로 유지)
+-- X일 잔고 = X 이전 달의 월말 잔고(monthly_balance) + X 달의 X일까지 누계(daily_balance)
+-- (SQLite 트리거는 프로시저를 부를 수 없어 apply_balance_delta의 내용을 트리거마다 풀어 씀)
+CREATE TABLE IF NOT EXISTS daily_balance (
+    balance_date DATE NOT NULL PRIMARY KEY,
+    month_start DATE NOT NULL,
+    net_amount NUMERIC NOT NULL DEFAULT 0,
+    month_balance NUMERIC NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS monthly_balance (
+    month_start DATE NOT NULL PRIMARY KEY,
+    net_amount NUMERIC NOT NULL DEFAULT 0,
+    closing_balance NUMERIC NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- 비어 있으면 (이 버전 이전에 만든 파일) 기존 거래로 채움
+INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+SELECT balance_date, month_start, net_amount,
+       SUM(net_amount) OVER (PARTITION BY month_start ORDER BY balance_date)
+FROM (
+    SELECT t.transaction_date AS balance_date,
+           date(t.transaction_date, 'start of month') AS month_start,
+           SUM(CASE WHEN t.transaction_type = '수입' THEN t.amount ELSE -t.amount END) AS net_amount
+    -- CROSS JOIN은 왼쪽을 바깥 루프로 고정: 이미 채워져 있으면 transactions를 읽지 않음
+    FROM (SELECT 1 WHERE NOT EXISTS (SELECT 1 FROM daily_balance)) AS empty
+    CROSS JOIN transactions t
+    GROUP BY t.transaction_date
+);
+
+INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+SELECT month_start, net_amount, SUM(net_amount) OVER (ORDER BY month_start)
+FROM (
+    SELECT month_start, SUM(net_amount) AS net_amount
+    FROM daily_balance
+    WHERE NOT EXISTS (SELECT 1 FROM monthly_balance)
+    GROUP BY month_start
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+    VALUES (NEW.transaction_date, date(NEW.transaction_date, 'start of month'), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END) + COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= date(NEW.transaction_date, 'start of month') AND balance_date < NEW.transaction_date
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (balance_date) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        month_balance = month_balance + excluded.net_amount;
+    UPDATE daily_balance SET month_balance = month_balance + (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END)
+    WHERE balance_date > NEW.transaction_date AND balance_date < date(NEW.transaction_date, 'start of month', '+1 month');
+
+    INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+    VALUES (date(NEW.transaction_date, 'start of month'), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END) + COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < date(NEW.transaction_date, 'start of month')
+        ORDER BY month_start DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (month_start) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        closing_balance = closing_balance + excluded.net_amount;
+    UPDATE monthly_balance SET closing_balance = closing_balance + (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END)
+    WHERE month_start > date(NEW.transaction_date, 'start of month');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update
+AFTER UPDATE OF transaction_date, transaction_type, amount ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+    VALUES (OLD.transaction_date, date(OLD.transaction_date, 'start of month'), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END) + COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= date(OLD.transaction_date, 'start of month') AND balance_date < OLD.transaction_date
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (balance_date) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        month_balance = month_balance + excluded.net_amount;
+    UPDATE daily_balance SET month_balance = month_balance + (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END)
+    WHERE balance_date > OLD.transaction_date AND balance_date < date(OLD.transaction_date, 'start of month', '+1 month');
+
+    INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+    VALUES (date(OLD.transaction_date, 'start of month'), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END) + COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < date(OLD.transaction_date, 'start of month')
+        ORDER BY month_start DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (month_start) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        closing_balance = closing_balance + excluded.net_amount;
+    UPDATE monthly_balance SET closing_balance = closing_balance + (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END)
+    WHERE month_start > date(OLD.transaction_date, 'start of month');
+
+    INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+    VALUES (NEW.transaction_date, date(NEW.transaction_date, 'start of month'), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END) + COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= date(NEW.transaction_date, 'start of month') AND balance_date < NEW.transaction_date
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (balance_date) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        month_balance = month_balance + excluded.net_amount;
+    UPDATE daily_balance SET month_balance = month_balance + (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END)
+    WHERE balance_date > NEW.transaction_date AND balance_date < date(NEW.transaction_date, 'start of month', '+1 month');
+
+    INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+    VALUES (date(NEW.transaction_date, 'start of month'), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END), (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END) + COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < date(NEW.transaction_date, 'start of month')
+        ORDER BY month_start DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (month_start) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        closing_balance = closing_balance + excluded.net_amount;
+    UPDATE monthly_balance SET closing_balance = closing_balance + (CASE WHEN NEW.transaction_type = '수입' THEN NEW.amount ELSE -NEW.amount END)
+    WHERE month_start > date(NEW.transaction_date, 'start of month');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+    VALUES (OLD.transaction_date, date(OLD.transaction_date, 'start of month'), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END) + COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= date(OLD.transaction_date, 'start of month') AND balance_date < OLD.transaction_date
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (balance_date) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        month_balance = month_balance + excluded.net_amount;
+    UPDATE daily_balance SET month_balance = month_balance + (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END)
+    WHERE balance_date > OLD.transaction_date AND balance_date < date(OLD.transaction_date, 'start of month', '+1 month');
+
+    INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+    VALUES (date(OLD.transaction_date, 'start of month'), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END), (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END) + COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < date(OLD.transaction_date, 'start of month')
+        ORDER BY month_start DESC LIMIT 1
+    ), 0))
+    ON CONFLICT (month_start) DO UPDATE SET
+        net_amount = net_amount + excluded.net_amount,
+        closing_balance = closing_balance + excluded.net_amount;
+    UPDATE monthly_balance SET closing_balance = closing_balance + (CASE WHEN OLD.transaction_type = '수입' THEN -OLD.amount ELSE OLD.amount END)
+    WHERE month_start > date(OLD.transaction_date, 'start of month');
+END;
+
+-- 설명 전문 검색 (migrations/004의 FULLTEXT ngram 인덱스에 해당)
+-- 설명을 2글자 조각 문자열로 바꿔 저장하는 내용 없는(contentless) FTS5 테이블, rowid = transactions.id
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    grams,
+    content = '',
+    tokenize = 'unicode61 remove_diacritics 0'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO transactions_fts (rowid, grams) VALUES (NEW.id, description_ngrams(NEW.description));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+AFTER UPDATE OF description ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, grams)
+    VALUES ('delete', OLD.id, description_ngrams(OLD.description));
+    INSERT INTO transactions_fts (rowid, grams) VALUES (NEW.id, description_ngrams(NEW.description));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, grams)
+    VALUES ('delete', OLD.id, description_ngrams(OLD.description));
+END;
+
+-- 색인이 비어 있으면 (이 버전 이전에 만든 파일) 기존 거래로 채움 (CROSS JOIN: 위 잔고 채우기와 같은 이유)
+INSERT INTO transactions_fts (rowid, grams)
+SELECT t.id, description_ngrams(t.description)
+FROM (SELECT 1 WHERE NOT EXISTS (SELECT 1 FROM transactions_fts)) AS empty
+CROSS JOIN transactions t;
+
+-- 월/카테고리별 예산 한도 (migrations/007과 같은 구조)
+-- budget_month: 'YYYY-MM' 또는 '*'(모든 달), category: 카테고리 이름 또는 ''(월 전체)
+-- 기본 한도(매월 전체 200,000원)는 테이블을 처음 만들 때 EmbeddedStorage가 넣음 (삭제하면 다시 생기지 않도록)
+CREATE TABLE IF NOT EXISTS budgets (
+    budget_month TEXT NOT NULL DEFAULT '*',
+    category TEXT NOT NULL DEFAULT '',
+    limit_amount NUMERIC NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (budget_month, category)
+) WITHOUT ROWID;
@@ -0,0 +1,205 @@
+"""
+solux 회계 관리 시스템 - 데이터베이스 공통 모듈
+연결 설정, 월 구간 계산, Streamlit 세션/재실행 간에 공유되는 MySQL 연결 풀
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import date
+
+import pymysql
+
+from instrumentation import record
+
+SECRETS_FILE = ".streamlit/secrets.toml"
+
+
+def load_db_config(secrets_file=SECRETS_FILE):
+    """secrets.toml의 [db] 섹션을 pymysql.connect 인자로 변환 (CLI 도구용)"""
+    import toml
+
+    with open(secrets_file, 'r', encoding='utf-8') as f:
+        secrets = toml.load(f)
+    return {
+        'host': secrets['db']['host'],
+        'port': int(secrets['db']['port']),
+        'user': secrets['db']['user'],
+        'password': secrets['db']['password'],
+        'database': secrets['db']['database'],
+        'charset': 'utf8mb4',
+    }
+
+
+def month_range(year_month):
+    """'YYYY-MM' 문자열을 [해당 월 1일, 다음 달 1일) 구간으로 변환
+
+    DATE_FORMAT(transaction_date, ...) = %s 대신 이 구간으로 비교해야
+    transaction_date 인덱스의 range 접근을 사용할 수 있다.
+    """
+    year, month = (int(part) for part in year_month.split('-'))
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+class PoolStats:
+    """연결 풀 통계 (연결 생성 수, 대여 대기 시간)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reconnects = 0
+        self.evictions = 0
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self):
+        """현재 누적 통계를 dict로 반환"""
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'reconnects': self.reconnects,
+                'evictions': self.evictions,
+                'checkouts': self.checkouts,
+                'wait_total': self.wait_total,
+                'wait_max': self.wait_max,
+            }
+
+
+class ConnectionPool:
+    """크기 제한, 대여 시 생존 확인, 유휴 연결 정리를 지원하는 연결 풀"""
+
+    def __init__(self, connect_kwargs, max_size=5, idle_timeout=300, checkout_timeout=10,
+                 connection_class=pymysql.connections.Connection):
+        self._connect_kwargs = connect_kwargs
+        self._connection_class = connection_class
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.stats = PoolStats()
+        self._idle = deque()  # (connection, 반납 시각)
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def _create(self):
+        start = time.perf_counter()
+        connection = self._connection_class(**self._connect_kwargs)
+        self.stats.incr('connects')
+        record('connect', '새 연결', time.perf_counter() - start)
+        return connection
+
+    def _evict_idle(self, now):
+        # 가장 오래 쉬고 있던 연결부터 정리 (잠금 보유 상태에서 호출)
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            connection, _ = self._idle.popleft()
+            self.stats.incr('evictions')
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def acquire(self):
+        """풀에서 연결을 대여 (없으면 생성, 가득 차면 대기)"""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        with self._cond:
+            while True:
+                self._evict_idle(time.monotonic())
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    connection = None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"연결 풀 대기 시간 초과 ({self.checkout_timeout}초)")
+                self._cond.wait(remaining)
+
+        try:
+            if connection is None:
+                connection = self._create()
+            else:
+                # 대여 시 생존 확인, 끊어졌으면 재연결
+                try:
+                    connection.ping(reconnect=False)
+                except Exception:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connection = self._create()
+                    self.stats.incr('reconnects')
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        self.stats.record_checkout(waited)
+        record('connect', '연결 대여', waited)
+        return connection
+
+    def release(self, connection, discard=False):
+        """연결을 풀에 반납"""
+        if not discard:
+            try:
+                # 커밋되지 않은 작업이 다음 사용자에게 넘어가지 않도록 정리
+                connection.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """with 문으로 연결을 대여하고 자동 반납"""
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except pymysql.err.OperationalError:
+            # 연결 자체가 깨졌을 수 있으므로 풀에 돌려놓지 않음
+            discard = True
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def size(self):
+        """(사용 중, 유휴) 연결 수"""
+        with self._cond:
+            return self._in_use, len(self._idle)
+
+    def close_all(self):
+        """유휴 연결을 모두 닫음"""
+        with self._cond:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                try:
+                    connection.close()
+                except Exception:
+                    pass
@@ -0,0 +1,223 @@
+"""
+solux 회계 관리 시스템 - 성능 계측
+재실행 단위로 연결 대여, SQL 왕복, DataFrame/pandas 처리, 렌더링 시간을 기록
+(기록기가 활성화되지 않은 재실행에서는 ContextVar 조회 한 번만 하고 바로 반환)
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pymysql
+
+_current = ContextVar('perf_recorder', default=None)
+
+# 이벤트 종류 (패널/로그에 표시되는 순서)
+KINDS = ['connect', 'sql', 'frame', 'pandas', 'render']
+
+
+class Recorder:
+    """한 번의 재실행 동안 발생한 이벤트 모음"""
+
+    def __init__(self, page=None):
+        self.page = page
+        self.started = time.perf_counter()
+        self.events = []  # (kind, name, 초, 행 수, 바이트)
+        self._lock = threading.Lock()
+
+    def add(self, kind, name, seconds, rows=0, nbytes=0):
+        # 동시 조회(스레드 풀)에서도 기록될 수 있으므로 잠금
+        with self._lock:
+            self.events.append((kind, name, seconds, rows, nbytes))
+
+    def summary(self):
+        """종류별 (횟수, 초, 행 수, 바이트)와 전체 경과 시간"""
+        by_kind = {kind: {'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0} for kind in KINDS}
+        for kind, _, seconds, rows, nbytes in self.events:
+            entry = by_kind.setdefault(kind, {'count': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['rows'] += rows
+            entry['bytes'] += nbytes
+        return {
+            'page': self.page,
+            'elapsed': time.perf_counter() - self.started,
+            'round_trips': by_kind['sql']['count'],
+            'by_kind': by_kind,
+        }
+
+
+def activate(recorder):
+    """현재 컨텍스트의 기록기 지정 (None이면 계측 비활성), deactivate용 토큰 반환"""
+    return _current.set(recorder)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current_recorder():
+    return _current.get()
+
+
+def record(kind, name, seconds, rows=0, nbytes=0):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add(kind, name, seconds, rows, nbytes)
+
+
+@contextmanager
+def span(kind, name):
+    """with 블록 실행 시간을 기록"""
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(kind, name, time.perf_counter() - start)
+
+
+_SQL_SPACE = re.compile(r'\s+')
+
+
+def sql_label(sql, length=80):
+    """로그/패널 표시용 한 줄 SQL 요약"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    return _SQL_SPACE.sub(' ', sql).strip()[:length]
+
+
+class InstrumentedConnection(pymysql.connections.Connection):
+    """모든 쿼리 왕복의 시간, 반환 행 수, 송수신 바이트를 기록하는 pymysql 연결
+
+    모든 커서(Dict/SS 포함)의 execute는 Connection.query를 거치므로 여기서 한 번에 계측한다.
+    """
+
+    bytes_sent = 0
+    bytes_received = 0
+
+    def _write_bytes(self, data):
+        self.bytes_sent += len(data)
+        return super()._write_bytes(data)
+
+    def _read_bytes(self, num_bytes):
+        data = super()._read_bytes(num_bytes)
+        self.bytes_received += len(data)
+        return data
+
+    def query(self, sql, unbuffered=False):
+        recorder = _current.get()
+        if recorder is None:
+            return super().query(sql, unbuffered)
+
+        sent, received = self.bytes_sent, self.bytes_received
+        start = time.perf_counter()
+        rows = 0
+        try:
+            rows = super().query(sql, unbuffered)
+            return rows
+        finally:
+            recorder.add(
+                'sql', sql_label(sql), time.perf_counter() - start,
+                rows=rows or 0,
+                nbytes=(self.bytes_sent - sent) + (self.bytes_received - received)
+            )
+
+
+# --- 기록 내보내기 (구조화 로그 / Prometheus 텍스트 파일) ---
+
+_sinks = {'logger': None, 'prom_file': None}
+_totals = defaultdict(float)
+_totals_lock = threading.Lock()
+
+
+def configure_sinks(log_file=None, prom_file=None, max_bytes=1024 * 1024, backup_count=5):
+    """기록을 남길 곳 설정 (둘 다 None이면 패널에만 표시)"""
+    if log_file:
+        logger = logging.getLogger('solux.perf')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        _sinks['logger'] = logger
+    _sinks['prom_file'] = prom_file
+
+
+def sinks_configured():
+    return bool(_sinks['logger'] or _sinks['prom_file'])
+
+
+def emit(recorder):
+    """재실행 하나의 기록을 설정된 곳에 남김"""
+    if not sinks_configured():
+        return
+    summary = recorder.summary()
+    if _sinks['logger']:
+        _sinks['logger'].info(json.dumps({
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'page': summary['page'],
+            'elapsed_ms': round(summary['elapsed'] * 1000, 2),
+            'round_trips': summary['round_trips'],
+            'by_kind': {
+                kind: {**entry, 'seconds': round(entry['seconds'], 6)}
+                for kind, entry in summary['by_kind'].items() if entry['count']
+            },
+            'sql': [
+                {'sql': name, 'ms': round(seconds * 1000, 2), 'rows': rows, 'bytes': nbytes}
+                for kind, name, seconds, rows, nbytes in recorder.events if kind == 'sql'
+            ],
+        }, ensure_ascii=False))
+    if _sinks['prom_file']:
+        _write_prometheus(summary)
+
+
+def _write_prometheus(summary):
+    page = (summary['page'] or 'unknown').replace('"', '')
+    with _totals_lock:
+        _totals[('reruns', page, '')] += 1
+        _totals[('rerun_seconds', page, '')] += summary['elapsed']
+        for kind, entry in summary['by_kind'].items():
+            _totals[('events', page, kind)] += entry['count']
+            _totals[('seconds', page, kind)] += entry['seconds']
+            _totals[('rows', page, kind)] += entry['rows']
+            _totals[('bytes', page, kind)] += entry['bytes']
+        snapshot = sorted(_totals.items())
+
+    metrics = {
+        'reruns': ('solux_reruns_total', 'counter', "페이지 재실행 횟수"),
+        'rerun_seconds': ('solux_rerun_seconds_total', 'counter', "재실행 총 소요 시간"),
+        'events': ('solux_events_total', 'counter', "종류별 이벤트 수 (sql은 DB 왕복 수)"),
+        'seconds': ('solux_event_seconds_total', 'counter', "종류별 소요 시간"),
+        'rows': ('solux_rows_total', 'counter', "SQL 반환/변경 행 수"),
+        'bytes': ('solux_bytes_total', 'counter', "SQL 송수신 바이트"),
+    }
+    lines = []
+    for metric, (name, metric_type, help_text) in metrics.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for (key, page, kind), value in snapshot:
+            if key != metric:
+                continue
+            labels = f'page="{page}"' + (f',kind="{kind}"' if kind else '')
+            lines.append(f"{name}{{{labels}}} {value:g}")
+
+    # node_exporter textfile collector가 쓰다 만 파일을 읽지 않도록 임시 파일 후 교체
+    directory = os.path.dirname(os.path.abspath(_sinks['prom_file']))
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(f.name, _sinks['prom_file'])
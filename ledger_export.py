@@ -0,0 +1,141 @@
+"""
+solux 회계 관리 시스템 - 거래 내역 내보내기
+저장소에서 고정 크기 배치로 스트리밍해 CSV/Parquet에 바로 기록 (메모리 일정)
+(MySQL은 서버 측 비버퍼 커서(SSCursor)로 읽음, storage.MySQLStorage.stream_transactions 참고)
+"""
+
+import csv
+import io
+import os
+import secrets
+import time
+
+EXPORT_COLUMNS = ['id', 'transaction_date', 'transaction_type', 'amount', 'category', 'description', 'created_at']
+
+EXPORT_FORMATS = ['csv', 'parquet']
+
+
+def build_export_query(start_date=None, end_date=None, transaction_type=None, category=None):
+    """필터 조건으로 내보내기 SQL과 파라미터 생성"""
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append("transaction_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("transaction_date <= %s")
+        params.append(end_date)
+    if transaction_type:
+        conditions.append("transaction_type = %s")
+        params.append(transaction_type)
+    if category:
+        conditions.append("category = %s")
+        params.append(category)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+    SELECT {', '.join(EXPORT_COLUMNS)}
+    FROM transactions
+    {where}
+    ORDER BY transaction_date, id
+    """
+    return sql, params
+
+
+def iter_batches(cursor, batch_size=10000):
+    """실행된 커서에서 batch_size 행씩 튜플 목록을 yield"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(batches, out):
+    """배치들을 텍스트 파일 객체에 CSV로 기록하고 행 수를 반환"""
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for rows in batches:
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.int64()),
+        ('transaction_date', pa.date32()),
+        ('transaction_type', pa.string()),
+        ('amount', pa.decimal128(12, 2)),
+        ('category', pa.string()),
+        ('description', pa.string()),
+        ('created_at', pa.timestamp('s')),
+    ])
+
+
+def write_parquet(batches, out):
+    """배치들을 Parquet 파일(경로 또는 바이너리 파일 객체)에 행 그룹 단위로 기록하고 행 수를 반환"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    count = 0
+    with pq.ParquetWriter(out, schema, compression='zstd') as writer:
+        for rows in batches:
+            columns = list(zip(*rows))
+            arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+
+def export_ledger(storage, out, fmt='csv', batch_size=10000, **filters):
+    """저장소의 거래 내역을 out에 fmt 형식으로 내보내고 행 수를 반환
+
+    CSV는 엑셀에서 한글이 깨지지 않도록 UTF-8 BOM으로 기록한다 (out은 바이너리 파일 객체 또는 경로).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    batches = storage.stream_transactions(batch_size=batch_size, **filters)
+    if fmt == 'parquet':
+        return write_parquet(batches, out)
+
+    if isinstance(out, str):
+        with open(out, 'w', encoding='utf-8-sig', newline='') as f:
+            return write_csv(batches, f)
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    try:
+        return write_csv(batches, text)
+    finally:
+        # 호출자의 바이너리 파일 객체는 닫지 않음
+        text.flush()
+        text.detach()
+
+
+def new_export_path(directory, fmt):
+    """directory 안에 추측하기 어려운 이름의 내보내기 파일 경로 생성
+
+    앱은 이 파일을 Streamlit 정적 파일(app/static/...)로 내려주므로 이름을 아는 사람만 받을 수 있어야 한다.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{secrets.token_urlsafe(16)}.{fmt}")
+
+
+def remove_stale_exports(directory, max_age, now=None):
+    """max_age초보다 오래된 내보내기 파일을 지우고 지운 수를 반환 (다음 내보내기 없이 끝난 세션의 파일 정리)"""
+    if not os.path.isdir(directory):
+        return 0
+    now = time.time() if now is None else now
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.rsplit('.', 1)[-1] in EXPORT_FORMATS and now - entry.stat().st_mtime > max_age:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                # 다른 세션이 먼저 지움
+                pass
+    return removed
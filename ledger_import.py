@@ -0,0 +1,126 @@
+"""
+solux 회계 관리 시스템 - 은행/CSV 거래 내역 일괄 가져오기
+CSV를 청크 단위로 읽어 검증 후 새 거래만 INSERT IGNORE로 저장 (파일 크기와 무관하게 메모리 일정)
+"""
+
+import pandas as pd
+
+from content_hash import transaction_hash
+
+# 가져오기 대상 필드 (CSV 열 매핑 키)
+IMPORT_FIELDS = ['date', 'type', 'amount', 'deposit', 'withdrawal', 'category', 'description']
+
+# 카테고리 열이 없거나 비어 있을 때 사용할 기본 카테고리
+DEFAULT_CATEGORIES = {'수입': '기타 수입', '지출': '기타 지출'}
+
+
+def validate_mapping(mapping):
+    """열 매핑 검증: 날짜/설명은 필수, 금액은 (유형+금액) 또는 (입금+출금) 중 하나"""
+    mapping = {field: column for field, column in mapping.items() if column}
+    unknown = set(mapping) - set(IMPORT_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 매핑 필드: {', '.join(sorted(unknown))}")
+    for field in ('date', 'description'):
+        if field not in mapping:
+            raise ValueError(f"'{field}' 열 매핑이 필요합니다.")
+    if not ({'type', 'amount'} <= set(mapping) or {'deposit', 'withdrawal'} <= set(mapping)):
+        raise ValueError("'type'+'amount' 또는 'deposit'+'withdrawal' 열 매핑이 필요합니다.")
+    return mapping
+
+
+def _parse_amount(series):
+    cleaned = series.fillna('').astype(str).str.replace(r'[,원\s]', '', regex=True)
+    return pd.to_numeric(cleaned.replace('', '0'), errors='coerce')
+
+
+def normalize_chunk(chunk, mapping, categories, default_categories=DEFAULT_CATEGORIES):
+    """CSV 청크를 transactions 행 형태로 변환하고 검증
+
+    반환값: (정상 행 DataFrame, 거부 목록 [(CSV 줄 번호, 사유)])
+    """
+    # CSV 줄 번호 (헤더가 1번 줄)
+    line_numbers = chunk.index + 2
+    df = pd.DataFrame(index=chunk.index)
+    df['transaction_date'] = pd.to_datetime(chunk[mapping['date']], errors='coerce').dt.date
+
+    if 'deposit' in mapping:
+        deposit = _parse_amount(chunk[mapping['deposit']])
+        withdrawal = _parse_amount(chunk[mapping['withdrawal']])
+        df['transaction_type'] = (deposit > 0).map({True: '수입', False: '지출'})
+        df['amount'] = deposit.where(deposit > 0, withdrawal)
+    else:
+        df['transaction_type'] = chunk[mapping['type']].astype(str).str.strip()
+        df['amount'] = _parse_amount(chunk[mapping['amount']]).abs()
+
+    if 'category' in mapping:
+        df['category'] = chunk[mapping['category']].fillna('').astype(str).str.strip()
+    else:
+        df['category'] = ''
+    df['category'] = df['category'].where(df['category'] != '', df['transaction_type'].map(default_categories))
+    df['description'] = chunk[mapping['description']].fillna('').astype(str).str.strip()
+
+    # 검증 규칙별 거부 사유 (먼저 걸린 사유 하나만 기록)
+    reasons = pd.Series('', index=df.index)
+    checks = [
+        (df['transaction_date'].isna(), "날짜 형식 오류"),
+        (~df['transaction_type'].isin(['수입', '지출']), "거래 유형 오류"),
+        (df['amount'].isna() | (df['amount'] <= 0), "금액 오류"),
+        (~df['category'].isin(list(categories)), "등록되지 않은 카테고리"),
+        (df['category'].map(categories) != df['transaction_type'], "카테고리 유형 불일치"),
+        (df['description'] == '', "설명 없음"),
+    ]
+    for failed, reason in checks:
+        reasons = reasons.mask(failed & (reasons == ''), reason)
+
+    rejected_mask = reasons != ''
+    rejected = [(int(line), reason) for line, reason in zip(line_numbers[rejected_mask.to_numpy()], reasons[rejected_mask])]
+    return df[~rejected_mask], rejected
+
+
+def import_csv(storage, source, mapping, chunksize=1000, encoding='utf-8', dry_run=False):
+    """CSV를 청크 단위로 저장소에 가져오며 청크별 결과를 yield
+
+    각 청크는 한 트랜잭션으로 저장된다. 중복은 내용 해시(unique_transaction 키)로 판단한다:
+    청크 안에서 해시가 겹치는 행을 빼고, 남은 해시를 IN 묶음으로 조회해 이미 저장된 행을 뺀 뒤 저장한다.
+    INSERT IGNORE는 중복 외에도 보관된 회계연도 트리거(SIGNAL)나 파티션 오류로 행을 건너뛰므로,
+    저장된 수가 모자라면 해시를 다시 조회해 그 사이 다른 곳에서 저장된 행(중복)과 나머지(skipped)를 나눈다.
+    결과 dict: chunk, rows, inserted, duplicates, skipped, rejected, errors
+    """
+    mapping = validate_mapping(mapping)
+    categories = storage.load_categories()
+    reader = pd.read_csv(
+        source, chunksize=chunksize, encoding=encoding,
+        dtype=str, usecols=list(set(mapping.values())), skipinitialspace=True
+    )
+    columns = ['transaction_date', 'transaction_type', 'amount', 'category', 'description']
+
+    for number, chunk in enumerate(reader, start=1):
+        valid, rejected = normalize_chunk(chunk, mapping, categories)
+
+        hashes = pd.Series(
+            [transaction_hash(*row) for row in valid[columns].itertuples(index=False, name=None)],
+            index=valid.index, dtype=object
+        )
+        # 같은 청크 안의 중복은 DB에 보내기 전에 제거
+        unique_hashes = hashes[~hashes.duplicated()]
+        existing = storage.existing_hashes(unique_hashes.tolist()) if len(unique_hashes) else set()
+        new_rows = valid.loc[unique_hashes[~unique_hashes.isin(list(existing))].index]
+
+        params = list(new_rows[columns].itertuples(index=False, name=None))
+        inserted = 0
+        raced = 0
+        if params and not dry_run:
+            inserted = storage.insert_ignore(params)
+            if inserted < len(params):
+                # 다시 조회한 해시에는 방금 저장한 행도 들어 있음
+                raced = len(storage.existing_hashes(hashes[new_rows.index].tolist())) - inserted
+
+        yield {
+            'chunk': number,
+            'rows': len(chunk),
+            'inserted': inserted,
+            'duplicates': len(valid) - len(new_rows) + raced,
+            'skipped': len(params) - inserted - raced if not dry_run else 0,
+            'rejected': len(rejected),
+            'errors': rejected,
+        }
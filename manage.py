@@ -0,0 +1,788 @@
+#!/usr/bin/env python3
+"""
+solux 회계 관리 시스템 - 관리 명령
+사용법: python manage.py <명령> [옵션]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime
+
+import pymysql
+
+from archive import ARCHIVE_DIR
+from db import SECRETS_FILE, ConnectionPool, load_db_config
+from write_queue import QUEUE_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+SETUP_FILE = os.path.join(BASE_DIR, "database_setup.sql")
+
+
+def connect(secrets_file=SECRETS_FILE, **overrides):
+    """secrets.toml 설정으로 새 연결 생성"""
+    config = load_db_config(secrets_file)
+    config.update(overrides)
+    return pymysql.connect(**config)
+
+
+def open_cli_storage(args):
+    """--embedded가 주어지면 로컬 SQLite 저장소, 아니면 secrets.toml의 MySQL 저장소"""
+    from storage import EmbeddedStorage, MySQLStorage
+
+    if args.embedded:
+        return EmbeddedStorage(args.embedded)
+    return MySQLStorage(ConnectionPool(load_db_config(args.secrets), max_size=1))
+
+
+def split_sql(script):
+    """SQL 스크립트를 문장 단위로 분리 (mysql 클라이언트의 DELIMITER 지시어 지원)"""
+    statements = []
+    delimiter = ';'
+    buffer = []
+    for line in script.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if not buffer and (not stripped or stripped.startswith('--')):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = '\n'.join(buffer).rstrip()[:-len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    if buffer and '\n'.join(buffer).strip():
+        statements.append('\n'.join(buffer).strip())
+    return statements
+
+
+def list_migrations():
+    """migrations/ 디렉토리의 (버전, 경로) 목록을 버전 순으로 반환"""
+    migrations = []
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if name.endswith('.sql'):
+            migrations.append((name[:-4], os.path.join(MIGRATIONS_DIR, name)))
+    return migrations
+
+
+def pending_migrations(connection):
+    """schema_migrations에 기록되지 않은 (버전, 경로) 목록"""
+    with connection.cursor(pymysql.cursors.Cursor) as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(100) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+    return [(version, path) for version, path in list_migrations() if version not in applied]
+
+
+def content_hash_collisions(connection):
+    """005 적용 전 확인: 새 유니크 키(content_hash)에서 겹치게 될 기존 거래 묶음"""
+    from content_hash import TRANSACTION_HASH_SQL, collisions_sql, format_collisions
+
+    with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute(collisions_sql(TRANSACTION_HASH_SQL))
+        return format_collisions(cursor.fetchall())
+
+
+# 적용 전에 확인할 마이그레이션: {버전: 연결을 받아 문제 설명 줄 목록을 반환하는 함수}
+MIGRATION_CHECKS = {
+    '005_content_hash': content_hash_collisions,
+}
+
+
+class MigrationCheckError(Exception):
+    """마이그레이션 사전 확인 실패 (args: 버전, 문제 목록)"""
+
+
+def check_migration(connection, version):
+    check = MIGRATION_CHECKS.get(version)
+    problems = check(connection) if check else []
+    if problems:
+        raise MigrationCheckError(version, problems)
+
+
+def apply_migration(connection, version, path):
+    """마이그레이션 하나를 사전 확인 후 적용하고 버전을 기록"""
+    check_migration(connection, version)
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = split_sql(f.read())
+    # DDL은 암묵적으로 커밋되므로 문장 단위로 실행하고 마지막에 버전을 기록
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+    connection.commit()
+
+
+def bootstrap_schema(connection, setup_file=SETUP_FILE):
+    """현재 연결의 데이터베이스에 database_setup.sql과 모든 마이그레이션을 적용
+
+    CREATE DATABASE/USE 문은 건너뛰므로 벤치마크용 등 다른 이름의 데이터베이스에도 쓸 수 있다.
+    """
+    with open(setup_file, 'r', encoding='utf-8') as f:
+        statements = split_sql(f.read())
+    with connection.cursor() as cursor:
+        for statement in statements:
+            if statement.upper().startswith(('CREATE DATABASE', 'USE ')):
+                continue
+            cursor.execute(statement)
+    connection.commit()
+    for version, path in pending_migrations(connection):
+        apply_migration(connection, version, path)
+
+
+def cmd_migrate(args):
+    """적용되지 않은 스키마 마이그레이션을 순서대로 적용"""
+    connection = connect(args.secrets)
+    try:
+        pending = pending_migrations(connection)
+        if not pending:
+            print("✅ 적용할 마이그레이션이 없습니다.")
+            return 0
+
+        for version, path in pending:
+            if args.dry_run:
+                print(f"📋 적용 예정: {version}")
+                check_migration(connection, version)
+                continue
+            print(f"🔧 적용 중: {version}")
+            apply_migration(connection, version, path)
+        print("✅ 마이그레이션 완료!")
+        return 0
+    except MigrationCheckError as e:
+        version, problems = e.args
+        print(f"❌ {version} 사전 확인 실패: 새 키에서 겹치는 거래 {len(problems)}묶음 (정리 후 다시 실행)")
+        for line in problems:
+            print(line)
+        return 1
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+# MySQL DATE의 최솟값 (보관한 연도가 없을 때 확인/재구축 범위의 시작)
+MYSQL_MIN_DATE = date(1000, 1, 1)
+
+
+def live_start(cursor):
+    """확인/재구축할 범위의 시작: 보관된 회계연도(archived_years) 다음 해 1월 1일
+
+    보관 후 파티션을 삭제한 연도는 원본 거래가 없지만 요약/잔고 테이블의 행은 그대로 두어야 하므로
+    verify/rebuild는 이 날짜 이후만 다룬다.
+    """
+    from storage import read_archive_boundary
+
+    return read_archive_boundary(cursor) or MYSQL_MIN_DATE
+
+
+SUMMARY_SOURCE_SQL = """
+    SELECT
+        transaction_date - INTERVAL (DAYOFMONTH(transaction_date) - 1) DAY AS month_start,
+        transaction_type,
+        category,
+        SUM(amount) AS total_amount,
+        COUNT(*) AS transaction_count
+    FROM transactions
+    WHERE transaction_date >= %s
+    GROUP BY 1, transaction_type, category
+"""
+
+
+def summary_drift(cursor, start):
+    """transactions에서 다시 집계한 값과 monthly_summary의 차이 목록 (start 이후 월)"""
+    cursor.execute(SUMMARY_SOURCE_SQL, (start,))
+    expected = {row[:3]: row[3:] for row in cursor.fetchall()}
+    cursor.execute("""
+        SELECT month_start, transaction_type, category, total_amount, transaction_count
+        FROM monthly_summary
+        WHERE (transaction_count <> 0 OR total_amount <> 0) AND month_start >= %s
+    """, (start,))
+    actual = {row[:3]: row[3:] for row in cursor.fetchall()}
+
+    drift = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            drift.append((key, expected.get(key), actual.get(key)))
+    return drift
+
+
+def cmd_summary(args):
+    """monthly_summary 드리프트 확인(verify) 또는 전체 재구축(rebuild)"""
+    connection = connect(args.secrets)
+    try:
+        with connection.cursor() as cursor:
+            start = live_start(cursor)
+            if args.action == 'rebuild':
+                # 재구축 중 쓰기가 끼어들지 않도록 원본 테이블을 잠근 채 다시 집계 (보관된 연도의 요약은 유지)
+                cursor.execute("SELECT COUNT(*) FROM transactions FOR UPDATE")
+                cursor.execute("DELETE FROM monthly_summary WHERE month_start >= %s", (start,))
+                cursor.execute(
+                    "INSERT INTO monthly_summary "
+                    "(month_start, transaction_type, category, total_amount, transaction_count) "
+                    + SUMMARY_SOURCE_SQL, (start,)
+                )
+                connection.commit()
+                print(f"✅ monthly_summary 재구축 완료: {cursor.rowcount}개 행")
+                return 0
+
+            drift = summary_drift(cursor, start)
+        if not drift:
+            print("✅ monthly_summary가 transactions와 일치합니다.")
+            return 0
+        print(f"❌ 불일치 {len(drift)}건 (재구축: python manage.py summary rebuild)")
+        for (month_start, transaction_type, category), expected, actual in drift:
+            print(f"  - {month_start:%Y-%m} {transaction_type} {category}: 실제 {expected} / 요약 {actual}")
+        return 1
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+BALANCE_DAILY_SOURCE_SQL = """
+    SELECT balance_date, month_start, net_amount,
+           SUM(net_amount) OVER (PARTITION BY month_start ORDER BY balance_date) AS month_balance
+    FROM (
+        SELECT transaction_date AS balance_date,
+               transaction_date - INTERVAL (DAYOFMONTH(transaction_date) - 1) DAY AS month_start,
+               SUM(IF(transaction_type = '수입', amount, -amount)) AS net_amount
+        FROM transactions
+        WHERE transaction_date >= %s
+        GROUP BY transaction_date
+    ) days
+"""
+
+# 월말 잔고 = 시작 잔고(보관된 연도의 마지막 월말 잔고) + 그 뒤 순액 누계
+BALANCE_MONTHLY_SOURCE_SQL = """
+    SELECT month_start, net_amount, %s + SUM(net_amount) OVER (ORDER BY month_start) AS closing_balance
+    FROM (
+        SELECT transaction_date - INTERVAL (DAYOFMONTH(transaction_date) - 1) DAY AS month_start,
+               SUM(IF(transaction_type = '수입', amount, -amount)) AS net_amount
+        FROM transactions
+        WHERE transaction_date >= %s
+        GROUP BY 1
+    ) months
+"""
+
+
+def opening_balance(cursor, start):
+    """start 직전 월말 잔고 (보관된 연도의 monthly_balance 행은 파티션 삭제 후에도 남아 있음)"""
+    cursor.execute(
+        "SELECT closing_balance FROM monthly_balance WHERE month_start < %s ORDER BY month_start DESC LIMIT 1",
+        (start,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _running_drift(expected, actual, scope=lambda key: None, opening=0):
+    """{키: (순액, 누계)} 두 개를 비교한 차이 목록 [(키, 기대값, 실제값)]
+
+    거래가 모두 지워진 날/월은 순액 0인 행으로 남으므로, 기대값에 없는 키는
+    순액 0이고 누계가 같은 범위(scope)의 직전 키 누계(처음이면 opening)와 같으면 정상으로 본다.
+    """
+    drift = []
+    previous = {}
+    for key in sorted(set(expected) | set(actual)):
+        if key in expected:
+            want = expected[key]
+        else:
+            want = (0, previous.get(scope(key), opening))
+        if want != actual.get(key):
+            drift.append((key, expected.get(key), actual.get(key)))
+        previous[scope(key)] = want[1]
+    return drift
+
+
+def balance_drift(cursor, start):
+    """transactions에서 다시 계산한 누적 잔고와 daily_balance/monthly_balance의 차이 목록 (start 이후)"""
+    opening = opening_balance(cursor, start)
+    cursor.execute(BALANCE_DAILY_SOURCE_SQL, (start,))
+    expected_days = {row[0]: (row[2], row[3]) for row in cursor.fetchall()}
+    cursor.execute("SELECT balance_date, net_amount, month_balance FROM daily_balance WHERE balance_date >= %s",
+                   (start,))
+    actual_days = {row[0]: row[1:] for row in cursor.fetchall()}
+    cursor.execute(BALANCE_MONTHLY_SOURCE_SQL, (opening, start))
+    expected_months = {row[0]: row[1:] for row in cursor.fetchall()}
+    cursor.execute("SELECT month_start, net_amount, closing_balance FROM monthly_balance WHERE month_start >= %s",
+                   (start,))
+    actual_months = {row[0]: row[1:] for row in cursor.fetchall()}
+
+    return (
+        [('일', *item) for item in _running_drift(expected_days, actual_days, scope=lambda day: day.replace(day=1))]
+        + [('월', *item) for item in _running_drift(expected_months, actual_months, opening=opening)]
+    )
+
+
+def cmd_balance(args):
+    """누적 잔고 테이블 드리프트 확인(verify) 또는 전체 재구축(rebuild)"""
+    connection = connect(args.secrets)
+    try:
+        with connection.cursor() as cursor:
+            start = live_start(cursor)
+            if args.action == 'rebuild':
+                # 재구축 중 쓰기가 끼어들지 않도록 원본 테이블을 잠근 채 다시 계산
+                # (보관된 연도의 잔고 행은 유지하고 그 마지막 월말 잔고에서 이어서 계산)
+                cursor.execute("SELECT COUNT(*) FROM transactions FOR UPDATE")
+                opening = opening_balance(cursor, start)
+                cursor.execute("DELETE FROM daily_balance WHERE balance_date >= %s", (start,))
+                cursor.execute("DELETE FROM monthly_balance WHERE month_start >= %s", (start,))
+                cursor.execute(
+                    "INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance) "
+                    + BALANCE_DAILY_SOURCE_SQL, (start,)
+                )
+                days = cursor.rowcount
+                cursor.execute(
+                    "INSERT INTO monthly_balance (month_start, net_amount, closing_balance) "
+                    + BALANCE_MONTHLY_SOURCE_SQL, (opening, start)
+                )
+                connection.commit()
+                print(f"✅ 누적 잔고 재구축 완료: {days}일, {cursor.rowcount}개월")
+                return 0
+
+            drift = balance_drift(cursor, start)
+        if not drift:
+            print("✅ 누적 잔고가 transactions와 일치합니다.")
+            return 0
+        print(f"❌ 불일치 {len(drift)}건 (재구축: python manage.py balance rebuild)")
+        for unit, key, expected, actual in drift:
+            print(f"  - {unit} {key}: 실제 (순액, 누계) {expected} / 잔고 테이블 {actual}")
+        return 1
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+PARTITIONS_SQL = """
+    SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'transactions' AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+
+def transaction_partitions(cursor):
+    """transactions 파티션 [(이름, 상한 날짜 또는 None(MAXVALUE), 행 수 추정, 바이트)], 파티셔닝 전이면 빈 목록"""
+    cursor.execute(PARTITIONS_SQL)
+    partitions = []
+    for name, description, rows, nbytes in cursor.fetchall():
+        # RANGE COLUMNS 상한은 '2024-01-01'처럼 따옴표가 붙은 문자열
+        bound = None if description == 'MAXVALUE' else date.fromisoformat(description.strip("'"))
+        partitions.append((name, bound, rows or 0, nbytes or 0))
+    return partitions
+
+
+def cmd_partitions(args):
+    """transactions 연도별 파티션 목록(list) 또는 다음 해까지 파티션 추가(extend)"""
+    connection = connect(args.secrets)
+    try:
+        with connection.cursor() as cursor:
+            partitions = transaction_partitions(cursor)
+            if not partitions:
+                print("❌ transactions가 파티셔닝되어 있지 않습니다 (python manage.py migrate로 008 적용)")
+                return 1
+            if args.action == 'extend':
+                through = args.through or date.today().year + 1
+                last_bound = max(bound for _, bound, _, _ in partitions if bound is not None)
+                years = range(last_bound.year, through + 1)
+                if not years:
+                    print(f"✅ {through}년까지 파티션이 이미 있습니다.")
+                else:
+                    # pmax만 나누므로 기존 연도 파티션의 행은 옮기지 않음
+                    new_partitions = ''.join(
+                        f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01'), " for year in years
+                    )
+                    cursor.execute(
+                        "ALTER TABLE transactions REORGANIZE PARTITION pmax INTO "
+                        f"({new_partitions}PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+                    )
+                    print(f"✅ 파티션 추가: {', '.join(f'p{year}' for year in years)}")
+                    partitions = transaction_partitions(cursor)
+
+            for name, bound, rows, nbytes in partitions:
+                upper = f"< {bound}" if bound else "이후 전체"
+                print(f"  - {name:<6} {upper:<14} 약 {rows:,}행, {nbytes / 1024 / 1024:,.1f}MB")
+        return 0
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+ARCHIVE_TOTALS_SQL = """
+    SELECT COUNT(*),
+           COALESCE(SUM(IF(transaction_type = '수입', amount, 0)), 0),
+           COALESCE(SUM(IF(transaction_type = '지출', amount, 0)), 0)
+    FROM transactions
+    WHERE transaction_date >= %s AND transaction_date < %s
+"""
+
+
+class ArchiveError(Exception):
+    """보관할 수 없는 연도이거나 보관 파일과 DB가 일치하지 않음"""
+
+
+def archived_years(cursor):
+    """archived_years 행 [(연도, 파일 이름, 행 수, 수입 합계, 지출 합계, 보관 시각, 삭제 시각)] (연도순)"""
+    cursor.execute("""
+        SELECT fiscal_year, file_name, row_count, income_total, expense_total, archived_at, dropped_at
+        FROM archived_years ORDER BY fiscal_year
+    """)
+    return list(cursor.fetchall())
+
+
+def archive_ranges(years):
+    """{보관 연도: 그 파일이 담은 [시작, 끝) 구간} - 첫 파일은 그 해까지의 모든 거래, 이후는 직전 보관 연도 다음 해부터"""
+    from archive import fiscal_year_range
+
+    ranges = {}
+    start = MYSQL_MIN_DATE
+    for year in sorted(years):
+        end = fiscal_year_range(year)[1]
+        ranges[year] = (start, end)
+        start = end
+    return ranges
+
+
+def export_archive(connection, archive, year, batch_size):
+    """year까지 아직 보관하지 않은 거래를 보관 파일로 내보내고 (행 수, 수입 합계, 지출 합계)를 반환
+
+    archived_years에 먼저 기록해 보관 트리거로 그 기간의 쓰기를 막은 뒤 내보내고,
+    새 스냅샷에서 다시 집계한 DB 값과 파일을 대조한다. 실패하면 기록과 파일을 되돌린다.
+    """
+    from ledger_export import build_export_query, iter_batches
+
+    if year >= date.today().year:
+        raise ArchiveError(f"{year}년은 아직 끝나지 않은 회계연도입니다.")
+    with connection.cursor() as cursor:
+        years = [row[0] for row in archived_years(cursor)]
+        if years and year <= years[-1]:
+            raise ArchiveError(f"{years[-1]}년까지 이미 보관되어 있습니다.")
+        start, end = archive_ranges(years + [year])[year]
+        cursor.execute(
+            "INSERT INTO archived_years (fiscal_year, file_name) VALUES (%s, %s)",
+            (year, os.path.basename(archive.path(year)))
+        )
+    connection.commit()
+
+    try:
+        # build_export_query의 end_date는 그날을 포함
+        sql, params = build_export_query(start_date=start, end_date=date(year, 12, 31))
+        with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(sql, params)
+            archive.write(year, iter_batches(cursor, batch_size))
+        # 기록 전에 시작한 쓰기가 내보낸 뒤 커밋되었는지 새 스냅샷에서 확인
+        connection.commit()
+        with connection.cursor() as cursor:
+            cursor.execute(ARCHIVE_TOTALS_SQL, (start, end))
+            totals = tuple(cursor.fetchone())
+        if archive.totals(year) != totals:
+            raise ArchiveError(f"보관 파일 {archive.totals(year)}와 DB {totals}의 (행 수, 수입, 지출)이 다릅니다.")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE archived_years SET row_count = %s, income_total = %s, expense_total = %s "
+                "WHERE fiscal_year = %s", (*totals, year)
+            )
+        connection.commit()
+        return totals
+    except BaseException:
+        connection.rollback()
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM archived_years WHERE fiscal_year = %s", (year,))
+        connection.commit()
+        if os.path.exists(archive.path(year)):
+            os.remove(archive.path(year))
+        raise
+
+
+def drop_archived_partitions(connection, archive, year):
+    """year까지 보관한 연도의 파티션을 삭제하고 삭제한 파티션 이름 목록을 반환
+
+    삭제할 보관 연도마다 파일과 DB를 archived_years에 기록한 값과 대조한 뒤에만 DROP PARTITION을 실행한다.
+    (파티션 삭제는 행 트리거를 실행하지 않으므로 요약/잔고 테이블의 그 연도 행은 남음)
+    """
+    with connection.cursor() as cursor:
+        rows = archived_years(cursor)
+        ranges = archive_ranges([row[0] for row in rows])
+        targets = [row for row in rows if row[0] <= year and row[6] is None]
+        if not any(row[0] == year for row in rows):
+            raise ArchiveError(f"{year}년은 보관되지 않았습니다 (python manage.py archive export --year {year})")
+        for fiscal_year, file_name, *recorded, _, _ in targets:
+            recorded = tuple(recorded)
+            if not os.path.exists(archive.path(fiscal_year)):
+                raise ArchiveError(f"{fiscal_year}년 보관 파일이 없습니다: {archive.path(fiscal_year)}")
+            if archive.totals(fiscal_year) != recorded:
+                raise ArchiveError(f"{fiscal_year}년 보관 파일이 기록 {recorded}와 다릅니다.")
+            cursor.execute(ARCHIVE_TOTALS_SQL, ranges[fiscal_year])
+            if tuple(cursor.fetchone()) != recorded:
+                raise ArchiveError(f"{fiscal_year}년 DB 거래가 보관 당시 {recorded}와 다릅니다.")
+
+        boundary = ranges[year][1]
+        names = [name for name, bound, _, _ in transaction_partitions(cursor) if bound is not None and bound <= boundary]
+        if names:
+            cursor.execute(f"ALTER TABLE transactions DROP PARTITION {', '.join(names)}")
+        cursor.execute("DELETE FROM transaction_search WHERE transaction_date < %s", (boundary,))
+        cursor.execute(
+            "UPDATE archived_years SET dropped_at = CURRENT_TIMESTAMP WHERE fiscal_year <= %s AND dropped_at IS NULL",
+            (year,)
+        )
+    connection.commit()
+    return names
+
+
+def cmd_archive(args):
+    """지난 회계연도 보관: 목록(list), Parquet 보관 파일 내보내기(export), 보관한 연도의 파티션 삭제(drop)"""
+    from archive import LedgerArchive
+
+    if args.action != 'list' and args.year is None:
+        print(f"❌ {args.action}에는 --year가 필요합니다.")
+        return 1
+    archive = LedgerArchive(args.archive_dir)
+    connection = connect(args.secrets)
+    try:
+        if args.action == 'export':
+            count, income, expense = export_archive(connection, archive, args.year, args.batch_size)
+            print(f"✅ {args.year}년까지 {count:,}건 보관 (수입 {income:,.0f}원, 지출 {expense:,.0f}원): "
+                  f"{archive.path(args.year)}")
+        if args.action == 'drop' or (args.action == 'export' and args.drop):
+            names = drop_archived_partitions(connection, archive, args.year)
+            print(f"✅ 파티션 삭제: {', '.join(names) or '없음'}")
+
+        with connection.cursor() as cursor:
+            rows = archived_years(cursor)
+        if not rows:
+            print("📦 보관된 회계연도가 없습니다.")
+        for fiscal_year, file_name, count, income, expense, archived_at, dropped_at in rows:
+            state = f"파티션 삭제 {dropped_at:%Y-%m-%d}" if dropped_at else "DB에도 있음"
+            missing = "" if os.path.exists(os.path.join(args.archive_dir, file_name)) else " ⚠️ 파일 없음"
+            print(f"  - {fiscal_year}: {count:,}건, 수입 {income:,.0f}원, 지출 {expense:,.0f}원 "
+                  f"({file_name}, {state}){missing}")
+        return 0
+    except ArchiveError as e:
+        print(f"❌ {e}")
+        return 1
+    except ImportError as e:
+        print(f"❌ 보관 파일에는 pyarrow가 필요합니다: {e}")
+        return 1
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+def cmd_budget(args):
+    """예산 한도 목록(list), 설정(set), 삭제(delete), 예산 누계 확인(verify)"""
+    from budget import ALL_MONTHS, TOTAL_CATEGORY, BudgetEngine
+
+    budget_month = args.month or ALL_MONTHS
+    category = args.category or TOTAL_CATEGORY
+    if budget_month != ALL_MONTHS:
+        try:
+            datetime.strptime(budget_month, '%Y-%m')
+        except ValueError:
+            print("❌ --month는 YYYY-MM 형식이어야 합니다.")
+            return 1
+    storage = open_cli_storage(args)
+    try:
+        if args.action == 'set':
+            if args.amount is None:
+                print("❌ set에는 --amount가 필요합니다.")
+                return 1
+            storage.set_budget(budget_month, category, args.amount)
+            print(f"✅ 예산 저장: {budget_month} {category or '월 전체'} {args.amount:,.0f}원")
+        elif args.action == 'delete':
+            if not storage.delete_budget(budget_month, category):
+                print(f"❌ 해당 예산이 없습니다: {budget_month} {category or '월 전체'}")
+                return 1
+            print(f"✅ 예산 삭제: {budget_month} {category or '월 전체'}")
+        elif args.action == 'verify':
+            # 앱의 예산 엔진이 읽는 지출 누계(monthly_summary)를 transactions와 비교
+            drift = BudgetEngine(storage).verify()
+            if not drift:
+                print("✅ 예산 지출 누계가 transactions와 일치합니다.")
+                return 0
+            print(f"❌ 불일치 {len(drift)}건 (재구축: python manage.py summary rebuild)")
+            for (month_start, category), expected, actual in drift:
+                print(f"  - {month_start:%Y-%m} {category}: 실제 {expected} / 누계 {actual}")
+            return 1
+        else:
+            for row in sorted(storage.fetch_budgets(), key=lambda row: (row['budget_month'], row['category'])):
+                print(f"  - {row['budget_month']:<7} {row['category'] or '월 전체'}: {row['limit_amount']:,.0f}원")
+        return 0
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        storage.close()
+
+
+def cmd_queue(args):
+    """로컬 저장 대기열 상태 확인(status), DB 반영(flush), 보류 항목 되돌리기(retry)"""
+    from write_queue import WriteQueue
+
+    queue = WriteQueue(args.queue_path)
+    try:
+        if args.action == 'retry':
+            print(f"✅ 보류 항목 {len(queue.retry_failed())}건을 다시 반영 대상으로 돌렸습니다.")
+        elif args.action == 'flush':
+            storage = open_cli_storage(args)
+            try:
+                totals = queue.flush(storage)
+            except Exception as e:
+                print(f"❌ 반영 중 오류 (남은 항목은 대기열에 보존): {e}")
+                return 1
+            finally:
+                storage.close()
+            print(f"✅ 반영 {totals['saved']}건, 이미 있던 거래 {totals['duplicates']}건, 보류 {totals['failed']}건")
+
+        pending, failed = queue.counts()
+        print(f"📮 반영 대기 {pending}건, 보류 {failed}건")
+        for row_id, *row, error in queue.failed_rows():
+            print(f"  - #{row_id} {' '.join(map(str, row))}: {error}")
+        return 1 if failed else 0
+    finally:
+        queue.close()
+
+
+def cmd_import(args):
+    """은행/CSV 거래 내역 일괄 가져오기"""
+    from ledger_import import import_csv
+
+    mapping = {}
+    for item in args.map:
+        field, _, column = item.partition('=')
+        mapping[field.strip()] = column.strip()
+
+    storage = open_cli_storage(args)
+    totals = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'skipped': 0, 'rejected': 0}
+    try:
+        for report in import_csv(storage, args.file, mapping, chunksize=args.chunksize,
+                                 encoding=args.encoding, dry_run=args.dry_run):
+            for key in totals:
+                totals[key] += report[key]
+            print(f"📦 청크 {report['chunk']}: {report['rows']}행 - 저장 {report['inserted']}, "
+                  f"중복 {report['duplicates']}, 건너뜀 {report['skipped']}, 거부 {report['rejected']}")
+            for line, reason in report['errors']:
+                print(f"  - {line}번 줄: {reason}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        storage.close()
+
+    print(f"✅ 완료: 전체 {totals['rows']}행 - 저장 {totals['inserted']}, "
+          f"중복 {totals['duplicates']}, 건너뜀 {totals['skipped']}, 거부 {totals['rejected']}")
+    return 0
+
+
+def cmd_export(args):
+    """거래 내역을 CSV/Parquet으로 스트리밍 내보내기"""
+    from ledger_export import export_ledger
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    storage = open_cli_storage(args)
+    try:
+        count = export_ledger(
+            storage, args.output, fmt=fmt, batch_size=args.batch_size,
+            start_date=args.start, end_date=args.end,
+            transaction_type=args.type, category=args.category
+        )
+    except pymysql.Error as e:
+        print(f"❌ MySQL 오류: {e}")
+        return 1
+    finally:
+        storage.close()
+    print(f"✅ {count:,}건을 {args.output}에 내보냈습니다.")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="solux 회계 관리 시스템 관리 명령")
+    parser.add_argument('--secrets', default=SECRETS_FILE, help="secrets.toml 경로")
+    parser.add_argument('--embedded', metavar='DB_FILE',
+                        help="MySQL 대신 로컬 SQLite 저장소 사용 (budget/queue/import/export)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate', help="스키마 마이그레이션 적용")
+    migrate.add_argument('--dry-run', action='store_true', help="적용 예정 목록만 출력")
+    migrate.set_defaults(func=cmd_migrate)
+
+    summary = subparsers.add_parser('summary', help="monthly_summary 확인/재구축")
+    summary.add_argument('action', choices=['verify', 'rebuild'])
+    summary.set_defaults(func=cmd_summary)
+
+    balance = subparsers.add_parser('balance', help="누적 잔고(daily_balance/monthly_balance) 확인/재구축")
+    balance.add_argument('action', choices=['verify', 'rebuild'])
+    balance.set_defaults(func=cmd_balance)
+
+    partitions = subparsers.add_parser('partitions', help="transactions 연도별 파티션 목록/다음 해 파티션 추가")
+    partitions.add_argument('action', choices=['list', 'extend'])
+    partitions.add_argument('--through', type=int, help="extend: 이 연도까지 파티션 생성 (기본: 내년)")
+    partitions.set_defaults(func=cmd_partitions)
+
+    archive = subparsers.add_parser('archive', help="지난 회계연도를 Parquet으로 보관하고 파티션 삭제")
+    archive.add_argument('action', choices=['list', 'export', 'drop'])
+    archive.add_argument('--year', type=int, help="회계연도 (export: 이 해까지 보관, drop: 이 해까지 파티션 삭제)")
+    archive.add_argument('--drop', action='store_true', help="export 후 대조가 끝나면 바로 파티션 삭제")
+    archive.add_argument('--archive-dir', default=ARCHIVE_DIR, help="보관 파일 디렉토리")
+    archive.add_argument('--batch-size', type=int, default=10000, help="한 번에 읽을 행 수")
+    archive.set_defaults(func=cmd_archive)
+
+    budget = subparsers.add_parser('budget', help="예산 한도 목록/설정/삭제, 예산 누계 확인")
+    budget.add_argument('action', choices=['list', 'set', 'delete', 'verify'])
+    budget.add_argument('--month', help="적용 월 (YYYY-MM, 기본: 모든 달)")
+    budget.add_argument('--category', help="지출 카테고리 (기본: 월 전체)")
+    budget.add_argument('--amount', type=float, help="한도 금액 (set)")
+    budget.set_defaults(func=cmd_budget)
+
+    queue = subparsers.add_parser('queue', help="로컬 저장 대기열 상태/반영/보류 항목 재시도")
+    queue.add_argument('action', choices=['status', 'flush', 'retry'])
+    queue.add_argument('--queue-path', default=QUEUE_PATH, help="대기열 파일 경로")
+    queue.set_defaults(func=cmd_queue)
+
+    import_ = subparsers.add_parser('import', help="CSV 거래 내역 일괄 가져오기")
+    import_.add_argument('file', help="CSV 파일 경로")
+    import_.add_argument('--map', action='append', default=[], metavar='필드=열이름',
+                         help="열 매핑 (필드: date, type, amount, deposit, withdrawal, category, description)")
+    import_.add_argument('--chunksize', type=int, default=1000, help="청크(트랜잭션) 당 행 수")
+    import_.add_argument('--encoding', default='utf-8', help="CSV 인코딩 (은행 내보내기는 cp949인 경우가 많음)")
+    import_.add_argument('--dry-run', action='store_true', help="검증만 하고 저장하지 않음")
+    import_.set_defaults(func=cmd_import)
+
+    export = subparsers.add_parser('export', help="거래 내역 내보내기 (CSV/Parquet)")
+    export.add_argument('output', help="출력 파일 경로 (.csv 또는 .parquet)")
+    export.add_argument('--format', choices=['csv', 'parquet'], help="출력 형식 (기본: 확장자로 판단)")
+    export.add_argument('--start', help="시작 날짜 (YYYY-MM-DD)")
+    export.add_argument('--end', help="종료 날짜 (YYYY-MM-DD, 포함)")
+    export.add_argument('--type', choices=['수입', '지출'], help="거래 유형")
+    export.add_argument('--category', help="카테고리")
+    export.add_argument('--batch-size', type=int, default=10000, help="한 번에 읽을 행 수")
+    export.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+-- 001: 월 단위 구간 조회용 복합 인덱스
+-- get_monthly_data, 카테고리별 분석: transaction_date 구간 + 유형/카테고리/금액을 인덱스만으로 처리
+-- 월별 지출 한도 확인: transaction_type = '지출' + transaction_date 구간
+
+ALTER TABLE transactions
+    ADD INDEX idx_date_type_category_amount (transaction_date, transaction_type, category, amount),
+    ADD INDEX idx_type_date_amount (transaction_type, transaction_date, amount);
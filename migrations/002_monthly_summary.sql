@@ -0,0 +1,88 @@
+-- 002: 월별/유형별/카테고리별 합계 요약 테이블
+-- transactions의 INSERT/UPDATE/DELETE 트리거로 증분 갱신되며,
+-- 대시보드 지표, 월별 지출 한도 확인, 카테고리별 분석이 원본 행 대신 이 테이블을 읽는다.
+-- 드리프트 확인/재구축: python manage.py summary verify | rebuild
+-- (바이너리 로그 사용 시 트리거 생성에 log_bin_trust_function_creators 또는 SUPER 권한이 필요할 수 있음)
+
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    month_start DATE NOT NULL,
+    transaction_type ENUM('수입', '지출') NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    transaction_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (month_start, transaction_type, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 기존 거래로 초기 집계
+INSERT INTO monthly_summary (month_start, transaction_type, category, total_amount, transaction_count)
+SELECT
+    transaction_date - INTERVAL (DAYOFMONTH(transaction_date) - 1) DAY,
+    transaction_type,
+    category,
+    SUM(amount),
+    COUNT(*)
+FROM transactions
+GROUP BY 1, transaction_type, category
+ON DUPLICATE KEY UPDATE
+    total_amount = VALUES(total_amount),
+    transaction_count = VALUES(transaction_count);
+
+DELIMITER //
+
+CREATE TRIGGER trg_transactions_summary_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO monthly_summary (month_start, transaction_type, category, total_amount, transaction_count)
+    VALUES (NEW.transaction_date - INTERVAL (DAYOFMONTH(NEW.transaction_date) - 1) DAY,
+            NEW.transaction_type, NEW.category, NEW.amount, 1)
+    ON DUPLICATE KEY UPDATE
+        total_amount = total_amount + NEW.amount,
+        transaction_count = transaction_count + 1;
+END//
+
+CREATE TRIGGER trg_transactions_summary_update
+AFTER UPDATE ON transactions
+FOR EACH ROW
+BEGIN
+    UPDATE monthly_summary
+    SET total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE month_start = OLD.transaction_date - INTERVAL (DAYOFMONTH(OLD.transaction_date) - 1) DAY
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category;
+
+    INSERT INTO monthly_summary (month_start, transaction_type, category, total_amount, transaction_count)
+    VALUES (NEW.transaction_date - INTERVAL (DAYOFMONTH(NEW.transaction_date) - 1) DAY,
+            NEW.transaction_type, NEW.category, NEW.amount, 1)
+    ON DUPLICATE KEY UPDATE
+        total_amount = total_amount + NEW.amount,
+        transaction_count = transaction_count + 1;
+
+    DELETE FROM monthly_summary
+    WHERE month_start = OLD.transaction_date - INTERVAL (DAYOFMONTH(OLD.transaction_date) - 1) DAY
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category
+    AND transaction_count = 0;
+END//
+
+CREATE TRIGGER trg_transactions_summary_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    UPDATE monthly_summary
+    SET total_amount = total_amount - OLD.amount,
+        transaction_count = transaction_count - 1
+    WHERE month_start = OLD.transaction_date - INTERVAL (DAYOFMONTH(OLD.transaction_date) - 1) DAY
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category;
+
+    DELETE FROM monthly_summary
+    WHERE month_start = OLD.transaction_date - INTERVAL (DAYOFMONTH(OLD.transaction_date) - 1) DAY
+    AND transaction_type = OLD.transaction_type
+    AND category = OLD.category
+    AND transaction_count = 0;
+END//
+
+DELIMITER ;
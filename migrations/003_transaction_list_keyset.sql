@@ -0,0 +1,8 @@
+-- 003: 거래 목록 키셋 페이지네이션용 인덱스
+-- ORDER BY transaction_date, created_at, id 순서를 그대로 따라가므로 깊은 페이지도 첫 페이지와 같은 비용으로 읽는다.
+-- (InnoDB 보조 인덱스는 기본 키 id를 포함하므로 id는 명시하지 않음)
+
+ALTER TABLE transactions
+    ADD INDEX idx_date_created (transaction_date, created_at),
+    ADD INDEX idx_type_date_created (transaction_type, transaction_date, created_at),
+    ADD INDEX idx_category_date_created (category, transaction_date, created_at);
@@ -0,0 +1,7 @@
+-- 004: 거래 설명 전문 검색 (FULLTEXT, ngram 파서)
+-- ngram 파서는 띄어쓰기와 관계없이 글자 조각(기본 2글자, ngram_token_size)으로 색인하므로 한국어 부분 검색이 가능하다.
+-- LIKE '%회식%'의 전체 스캔 대신 MATCH(description) AGAINST (... IN BOOLEAN MODE)로 색인을 사용한다.
+-- (처음 만드는 FULLTEXT 인덱스는 FTS_DOC_ID 열을 추가하며 테이블을 한 번 재구축함)
+
+ALTER TABLE transactions
+    ADD FULLTEXT INDEX ft_description (description) WITH PARSER ngram;
@@ -0,0 +1,14 @@
+-- 005: 설명 전체를 포함한 내용 해시로 중복 판정
+-- 기존 unique_transaction은 description(100) 접두만 색인해 100자 이후가 다른 거래도 중복으로 거부했다.
+-- content_hash = SHA-256(날짜, 유형, 금액, 카테고리, 앞뒤 공백을 뺀 설명 전체) 저장 생성 열로,
+-- ALTER 시 기존 행이 모두 채워지고 이후 INSERT/UPDATE마다 MySQL이 다시 계산한다 (content_hash.py와 같은 식).
+-- 중복 확인/일괄 가져오기는 이 열의 유니크 인덱스 한 번(또는 IN 묶음)으로 찾는다.
+-- 적용 전 manage.py migrate가 해시가 겹치는 기존 거래를 찾아 보고하고, 있으면 적용을 멈춘다.
+-- (한 ALTER 문이므로 유니크 키 생성이 실패하면 열 추가도 함께 취소됨)
+
+ALTER TABLE transactions
+    ADD COLUMN content_hash CHAR(64) CHARACTER SET ascii COLLATE ascii_bin
+        AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), transaction_date, transaction_type, amount, category,
+                           TRIM(COALESCE(description, ''))), 256)) STORED NOT NULL,
+    DROP INDEX unique_transaction,
+    ADD UNIQUE KEY unique_transaction (content_hash);
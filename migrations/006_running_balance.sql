@@ -0,0 +1,106 @@
+-- 006: 누적 잔고 (동아리 전체 잔고를 날짜별로)
+-- daily_balance: 거래가 있는 날마다 그날 순액(수입 - 지출)과 그 달 1일부터의 누계
+-- monthly_balance: 월마다 그달 순액과 월말 누적 잔고
+-- X일 잔고 = X 이전 달의 월말 잔고 + X 달의 X일까지 누계 (기본 키 조회 두 번, 전체 합계 없음)
+-- 과거 날짜 거래가 들어오면 같은 달의 이후 날짜와 이후 달 행만 옮긴다 (이후 모든 날짜를 고치지 않음).
+-- transactions의 INSERT/UPDATE/DELETE 트리거가 apply_balance_delta 프로시저로 갱신한다.
+-- 드리프트 확인/재구축: python manage.py balance verify | rebuild
+
+CREATE TABLE IF NOT EXISTS daily_balance (
+    balance_date DATE NOT NULL,
+    month_start DATE NOT NULL,
+    net_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    month_balance DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (balance_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS monthly_balance (
+    month_start DATE NOT NULL,
+    net_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    closing_balance DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (month_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 기존 거래로 초기 누계
+INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+SELECT balance_date, month_start, net_amount,
+       SUM(net_amount) OVER (PARTITION BY month_start ORDER BY balance_date)
+FROM (
+    SELECT transaction_date AS balance_date,
+           transaction_date - INTERVAL (DAYOFMONTH(transaction_date) - 1) DAY AS month_start,
+           SUM(IF(transaction_type = '수입', amount, -amount)) AS net_amount
+    FROM transactions
+    GROUP BY transaction_date
+) days;
+
+INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+SELECT month_start, net_amount, SUM(net_amount) OVER (ORDER BY month_start)
+FROM (
+    SELECT month_start, SUM(net_amount) AS net_amount
+    FROM daily_balance
+    GROUP BY month_start
+) months;
+
+DELIMITER //
+
+CREATE PROCEDURE apply_balance_delta(IN p_date DATE, IN p_delta DECIMAL(14, 2))
+BEGIN
+    DECLARE v_month DATE DEFAULT p_date - INTERVAL (DAYOFMONTH(p_date) - 1) DAY;
+    DECLARE v_previous DECIMAL(14, 2);
+
+    -- 그날 누계 = 같은 달 직전 거래일 누계 + 순액, 같은 달 이후 날짜는 순액만큼 이동
+    SET v_previous = COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= v_month AND balance_date < p_date
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0);
+    INSERT INTO daily_balance (balance_date, month_start, net_amount, month_balance)
+    VALUES (p_date, v_month, p_delta, v_previous + p_delta)
+    ON DUPLICATE KEY UPDATE
+        net_amount = net_amount + p_delta,
+        month_balance = month_balance + p_delta;
+    UPDATE daily_balance SET month_balance = month_balance + p_delta
+    WHERE balance_date > p_date AND balance_date < v_month + INTERVAL 1 MONTH;
+
+    -- 그달 월말 잔고 = 직전 달 월말 잔고 + 순액, 이후 달은 순액만큼 이동
+    SET v_previous = COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < v_month
+        ORDER BY month_start DESC LIMIT 1
+    ), 0);
+    INSERT INTO monthly_balance (month_start, net_amount, closing_balance)
+    VALUES (v_month, p_delta, v_previous + p_delta)
+    ON DUPLICATE KEY UPDATE
+        net_amount = net_amount + p_delta,
+        closing_balance = closing_balance + p_delta;
+    UPDATE monthly_balance SET closing_balance = closing_balance + p_delta
+    WHERE month_start > v_month;
+END//
+
+CREATE TRIGGER trg_transactions_balance_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    CALL apply_balance_delta(NEW.transaction_date, IF(NEW.transaction_type = '수입', NEW.amount, -NEW.amount));
+END//
+
+CREATE TRIGGER trg_transactions_balance_update
+AFTER UPDATE ON transactions
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.transaction_date <=> NEW.transaction_date
+            AND OLD.transaction_type <=> NEW.transaction_type
+            AND OLD.amount <=> NEW.amount) THEN
+        CALL apply_balance_delta(OLD.transaction_date, IF(OLD.transaction_type = '수입', -OLD.amount, OLD.amount));
+        CALL apply_balance_delta(NEW.transaction_date, IF(NEW.transaction_type = '수입', NEW.amount, -NEW.amount));
+    END IF;
+END//
+
+CREATE TRIGGER trg_transactions_balance_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    CALL apply_balance_delta(OLD.transaction_date, IF(OLD.transaction_type = '수입', -OLD.amount, OLD.amount));
+END//
+
+DELIMITER ;
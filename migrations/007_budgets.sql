@@ -0,0 +1,16 @@
+-- 007: 월/카테고리별 예산 한도
+-- budget_month: 'YYYY-MM'이면 그 달만, '*'이면 모든 달 기본값 (그 달 전용 한도가 우선)
+-- category: 카테고리 이름이면 그 카테고리 지출, 빈 문자열이면 월 전체 지출
+-- 앱은 이 테이블과 monthly_summary 지출 합계를 한 번씩 읽어 메모리 누계로 한도를 확인한다 (budget.py).
+-- 예산 설정/확인: python manage.py budget list | set | delete | verify
+
+CREATE TABLE IF NOT EXISTS budgets (
+    budget_month VARCHAR(7) NOT NULL DEFAULT '*',
+    category VARCHAR(50) NOT NULL DEFAULT '',
+    limit_amount DECIMAL(14, 2) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (budget_month, category)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 기존 고정 한도 (매월 전체 지출 200,000원)
+INSERT IGNORE INTO budgets (budget_month, category, limit_amount) VALUES ('*', '', 200000);
@@ -0,0 +1,142 @@
+-- 008: transactions 연도별 RANGE 파티셔닝과 지난 회계연도 보관(archive)
+-- 거래 대부분이 이번 달/올해를 읽고 쓰므로 transaction_date로 연도별 파티션을 나눠
+-- 월 구간 조회(통계, 예산, 목록 필터)가 해당 연도 파티션의 인덱스만 읽도록 한다 (파티션 정리, partition pruning).
+-- 회계연도는 1월 1일 ~ 12월 31일이며, 파티션은 p<연도> (그 해 1월 1일 미만까지는 이전 파티션) + 이후 날짜용 pmax.
+--
+-- 파티션 테이블의 모든 유니크 키는 파티션 열을 포함해야 하므로:
+--   PRIMARY KEY (id) -> (id, transaction_date): id는 여전히 AUTO_INCREMENT로 유일하다.
+--   unique_transaction (content_hash) -> (content_hash, transaction_date): content_hash가 transaction_date를 포함한
+--   해시이므로(migrations/005) 두 열 키의 유일성은 기존 키와 같다. 중복 확인은 날짜도 함께 주어 파티션 하나만 찾는다.
+-- 파티션 테이블은 FULLTEXT 인덱스를 지원하지 않으므로 설명 검색 색인(migrations/004의 ft_description)은
+-- 트리거로 유지되는 transaction_search 테이블로 옮긴다 (SQLite의 transactions_fts와 같은 구조).
+--
+-- 보관: python manage.py archive export --year 2023 [--drop]
+--   해당 연도까지의 거래를 Parquet 파일로 내보내고 archived_years에 기록한 뒤, --drop이면 파티션을 DROP한다.
+--   archived_years에 기록된 연도의 거래는 추가/수정/삭제할 수 없다 (아래 BEFORE 트리거).
+--   파티션 DROP은 행 트리거를 실행하지 않으므로 monthly_summary/daily_balance/monthly_balance의 보관 연도 행은 그대로 남는다.
+-- 새 연도 파티션: python manage.py partitions extend (pmax에서 다음 해 파티션을 분리, 매년 연말 전에 실행)
+
+CREATE TABLE IF NOT EXISTS transaction_search (
+    transaction_id INT NOT NULL,
+    transaction_date DATE NOT NULL,
+    description TEXT,
+    PRIMARY KEY (transaction_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 기존 설명을 먼저 채우고 FULLTEXT 인덱스는 한 번에 생성
+INSERT INTO transaction_search (transaction_id, transaction_date, description)
+SELECT id, transaction_date, description FROM transactions;
+
+ALTER TABLE transaction_search
+    ADD FULLTEXT INDEX ft_description (description) WITH PARSER ngram;
+
+CREATE TABLE IF NOT EXISTS archived_years (
+    fiscal_year SMALLINT NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    row_count INT NOT NULL DEFAULT 0,
+    income_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    expense_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    dropped_at TIMESTAMP NULL,
+    PRIMARY KEY (fiscal_year)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+ALTER TABLE transactions
+    DROP INDEX ft_description,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, transaction_date),
+    DROP INDEX unique_transaction,
+    ADD UNIQUE KEY unique_transaction (content_hash, transaction_date);
+
+DELIMITER //
+
+-- 가장 이른 거래 연도부터 내년까지 연도별 파티션 생성 (파티션 목록이 데이터에 따라 달라 동적 SQL로 실행)
+CREATE PROCEDURE partition_transactions_by_year()
+BEGIN
+    DECLARE v_year INT;
+    DECLARE v_last INT;
+    DECLARE v_partitions TEXT DEFAULT '';
+
+    SELECT COALESCE(YEAR(MIN(transaction_date)), YEAR(CURDATE())),
+           GREATEST(YEAR(CURDATE()) + 1, COALESCE(YEAR(MAX(transaction_date)), 0))
+    INTO v_year, v_last
+    FROM transactions;
+    WHILE v_year <= v_last DO
+        SET v_partitions = CONCAT(v_partitions, 'PARTITION p', v_year,
+                                  ' VALUES LESS THAN (''', v_year + 1, '-01-01''), ');
+        SET v_year = v_year + 1;
+    END WHILE;
+    SET @partition_sql = CONCAT(
+        'ALTER TABLE transactions PARTITION BY RANGE COLUMNS (transaction_date) (',
+        v_partitions, 'PARTITION pmax VALUES LESS THAN (MAXVALUE))'
+    );
+    PREPARE partition_statement FROM @partition_sql;
+    EXECUTE partition_statement;
+    DEALLOCATE PREPARE partition_statement;
+END//
+
+DELIMITER ;
+
+CALL partition_transactions_by_year();
+
+DROP PROCEDURE partition_transactions_by_year;
+
+DELIMITER //
+
+CREATE TRIGGER trg_transactions_search_insert
+AFTER INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    INSERT INTO transaction_search (transaction_id, transaction_date, description)
+    VALUES (NEW.id, NEW.transaction_date, NEW.description);
+END//
+
+CREATE TRIGGER trg_transactions_search_update
+AFTER UPDATE ON transactions
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.transaction_date <=> NEW.transaction_date AND OLD.description <=> NEW.description) THEN
+        UPDATE transaction_search
+        SET transaction_date = NEW.transaction_date, description = NEW.description
+        WHERE transaction_id = NEW.id;
+    END IF;
+END//
+
+CREATE TRIGGER trg_transactions_search_delete
+AFTER DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    DELETE FROM transaction_search WHERE transaction_id = OLD.id;
+END//
+
+-- 보관된 회계연도(archived_years의 마지막 연도까지)의 거래는 변경 불가
+-- (보관 파일과 DB가 어긋나지 않도록, 또 DROP한 연도의 날짜가 다음 파티션에 들어가지 않도록)
+CREATE TRIGGER trg_transactions_archived_insert
+BEFORE INSERT ON transactions
+FOR EACH ROW
+BEGIN
+    IF NEW.transaction_date < (SELECT MAKEDATE(MAX(fiscal_year) + 1, 1) FROM archived_years) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = '보관된 회계연도의 거래는 추가할 수 없습니다';
+    END IF;
+END//
+
+CREATE TRIGGER trg_transactions_archived_update
+BEFORE UPDATE ON transactions
+FOR EACH ROW
+BEGIN
+    IF LEAST(OLD.transaction_date, NEW.transaction_date)
+       < (SELECT MAKEDATE(MAX(fiscal_year) + 1, 1) FROM archived_years) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = '보관된 회계연도의 거래는 수정할 수 없습니다';
+    END IF;
+END//
+
+CREATE TRIGGER trg_transactions_archived_delete
+BEFORE DELETE ON transactions
+FOR EACH ROW
+BEGIN
+    IF OLD.transaction_date < (SELECT MAKEDATE(MAX(fiscal_year) + 1, 1) FROM archived_years) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = '보관된 회계연도의 거래는 삭제할 수 없습니다';
+    END IF;
+END//
+
+DELIMITER ;
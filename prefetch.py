@@ -0,0 +1,109 @@
+"""
+solux 회계 관리 시스템 - 페이지 데이터 동시 조회
+한 페이지의 서로 독립적인 조회를 크기가 제한된 스레드 풀에서 동시에 실행
+(페이지 지연 시간 ≈ 가장 느린 조회 하나, Streamlit 의존 없음)
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class PrefetchResult:
+    """조회 하나의 결과 (value 또는 error 중 하나)"""
+
+    __slots__ = ('value', 'error', 'elapsed')
+
+    def __init__(self, value=None, error=None, elapsed=0.0):
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class Prefetcher:
+    """세션 간에 공유되는 조회 스레드 풀
+
+    max_workers로 DB에 동시에 보내는 조회 수를 제한하므로 연결 풀 크기 이하로 둔다.
+    같은 owner(세션)가 새로 fetch하면 이전 fetch에서 아직 시작하지 않은 조회는 취소된다
+    (사용자가 다른 메뉴로 이동해 재실행된 경우).
+    """
+
+    def __init__(self, max_workers=4, thread_name_prefix='prefetch'):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._pending = {}  # owner -> 진행 중인 future 목록
+        self._lock = threading.Lock()
+
+    def fetch(self, tasks, timeout=10.0, owner=None, setup=None):
+        """{이름: 인자 없는 함수}를 동시에 실행해 {이름: PrefetchResult} 반환
+
+        한 조회의 예외나 시간 초과는 그 조회의 결과에만 기록된다.
+        setup은 작업 스레드에서 조회 직전에 호출된다 (Streamlit 실행 컨텍스트 연결 등).
+        """
+        if owner is not None:
+            self.cancel(owner)
+
+        futures = {}
+        for name, func in tasks.items():
+            # 계측 기록기 등 ContextVar를 작업 스레드로 전달 (조회마다 별도 복사본)
+            context = contextvars.copy_context()
+            futures[name] = self._executor.submit(context.run, self._run, func, setup)
+        if owner is not None:
+            with self._lock:
+                self._pending[owner] = list(futures.values())
+
+        try:
+            wait(futures.values(), timeout=timeout)
+        finally:
+            # 시간 초과나 재실행 중단(StopException 등)으로 빠져나갈 때 시작 전 조회는 버림
+            for future in futures.values():
+                future.cancel()
+            if owner is not None:
+                with self._lock:
+                    if self._pending.get(owner) == list(futures.values()):
+                        del self._pending[owner]
+
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                results[name] = PrefetchResult(error=TimeoutError(f"{timeout}초 안에 끝나지 않음"), elapsed=timeout)
+            elif future.cancelled():
+                results[name] = PrefetchResult(error=TimeoutError("시작 전에 취소됨"))
+            else:
+                results[name] = future.result()
+        return results
+
+    def cancel(self, owner):
+        """owner의 아직 시작하지 않은 조회를 취소 (이미 실행 중인 조회는 끝까지 실행됨)"""
+        with self._lock:
+            pending = self._pending.pop(owner, [])
+        for future in pending:
+            future.cancel()
+
+    @staticmethod
+    def _run(func, setup):
+        start = time.perf_counter()
+        try:
+            if setup is not None:
+                setup()
+            return PrefetchResult(value=func(), elapsed=time.perf_counter() - start)
+        except Exception as e:
+            return PrefetchResult(error=e, elapsed=time.perf_counter() - start)
+
+    def shutdown(self):
+        """시작하지 않은 조회를 취소하고 스레드 풀을 닫음 (실행 중인 조회는 기다리지 않음)
+
+        Python 3.8의 ThreadPoolExecutor.shutdown에는 cancel_futures가 없으므로 owner별 목록을 직접 취소한다
+        (owner 없는 fetch는 반환 전에 자기 조회를 이미 정리함).
+        """
+        with self._lock:
+            pending = [future for futures in self._pending.values() for future in futures]
+            self._pending.clear()
+        for future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
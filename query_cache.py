@@ -0,0 +1,114 @@
+"""
+solux 회계 관리 시스템 - 조회 결과 캐시
+함수+인자 단위 키, 함수별 TTL, LRU 크기 제한, 태그 기반 무효화
+"""
+
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """TTL과 LRU 제거를 지원하는 스레드 안전 조회 캐시
+
+    각 항목은 태그(예: 'month:2024-05', 'categories')를 가지며,
+    쓰기 작업은 invalidate(태그...)로 관련 항목만 제거한다.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, 만료 시각, tags)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """(찾음 여부, 값) 반환, 찾으면 최근 사용으로 갱신"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, _ = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        """주어진 태그 중 하나라도 가진 항목을 제거하고 제거 수를 반환"""
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & tags]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """캐시 통계 dict"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+def cached(get_cache, ttl, tags=None):
+    """조회 함수 결과를 캐시하는 데코레이터
+
+    get_cache: QueryCache를 반환하는 함수 (Streamlit 재실행 간 공유 인스턴스)
+    ttl: 초 단위 유효 시간
+    tags: 함수 인자를 받아 무효화 태그 목록을 반환하는 함수
+
+    예외가 발생한 호출은 캐시하지 않는다. 호출자가 결과를 수정해도
+    캐시가 오염되지 않도록 저장/반환 시 깊은 복사본을 사용한다
+    (튜플/데이터클래스 안의 DataFrame까지 복사, 얕은 복사는 안쪽 DataFrame을 공유함).
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            found, value = cache.get(key)
+            if found:
+                return copy.deepcopy(value)
+            value = func(*args, **kwargs)
+            entry_tags = tags(*args, **kwargs) if tags else ()
+            cache.set(key, copy.deepcopy(value), ttl, entry_tags)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
@@ -0,0 +1,53 @@
+"""
+solux 회계 관리 시스템 - 거래 설명 전문 검색
+검색어를 MySQL FULLTEXT(ngram 파서) / SQLite FTS5 질의로 변환 (Streamlit 의존 없음)
+
+두 백엔드 모두 2글자 조각(bigram) 단위로 색인한다.
+- MySQL: WITH PARSER ngram (ngram_token_size=2 기본값)
+- SQLite: 설명을 description_ngrams()로 bigram 문자열로 바꿔 FTS5에 저장
+검색어의 각 단어는 bigram이 연속으로 나타나야 하는 구(phrase)로 검색하므로 "재입금"에서 "입금"도 찾는다.
+"""
+
+import re
+
+# ngram_token_size와 같은 값 (이보다 짧은 검색 단어는 색인으로 찾을 수 없어 무시)
+NGRAM_SIZE = 2
+
+SEARCH_ORDERS = ['relevance', 'date']
+
+_WORD = re.compile(r'\w+')
+
+
+def search_terms(query):
+    """검색어를 단어 목록으로 (구두점 제거, 소문자, 중복/짧은 단어 제외)"""
+    terms = []
+    for word in _WORD.findall((query or '').lower()):
+        if len(word) >= NGRAM_SIZE and word not in terms:
+            terms.append(word)
+    return terms
+
+
+def word_ngrams(word, size=NGRAM_SIZE):
+    return [word[i:i + size] for i in range(len(word) - size + 1)]
+
+
+def description_ngrams(text, size=NGRAM_SIZE):
+    """설명을 공백으로 구분한 bigram 문자열로 변환 (SQLite FTS5 색인용, 단어 경계를 넘는 조각은 만들지 않음)"""
+    grams = []
+    for word in _WORD.findall((text or '').lower()):
+        grams.extend(word_ngrams(word, size))
+    return ' '.join(grams)
+
+
+def mysql_boolean_query(terms):
+    """MATCH ... AGAINST (... IN BOOLEAN MODE)용 질의: 모든 단어를 필수 구로"""
+    return ' '.join('+"{}"'.format(term.replace('"', '')) for term in terms)
+
+
+def fts5_query(terms):
+    """FTS5 MATCH 질의: 단어마다 bigram 구, 단어끼리는 AND"""
+    phrases = []
+    for term in terms:
+        grams = ' '.join(gram.replace('"', '""') for gram in word_ngrams(term))
+        phrases.append(f'"{grams}"')
+    return ' AND '.join(phrases)
@@ -0,0 +1,974 @@
+"""
+solux 회계 관리 시스템 - 저장소 백엔드
+앱이 사용하는 조회/저장 작업을 백엔드별로 구현 (Streamlit 의존 없음)
+- MySQLStorage: 운영 MySQL (연결 풀), 보관된 회계연도의 월별 통계는 archive.LedgerArchive 파일에서
+- EmbeddedStorage: 로컬/오프라인 모드, SQLite 파일에 쓰고 집계는 DuckDB 열 지향 스냅샷에서 실행
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+
+import pymysql
+from pymysql.constants import ER
+
+from archive import ARCHIVE_DIR, LedgerArchive
+from budget import ALL_MONTHS, DEFAULT_MONTHLY_LIMIT, TOTAL_CATEGORY, check_rows
+from content_hash import SQLITE_HASH_SQL, collisions_sql, format_collisions, transaction_hash
+from db import month_range
+from instrumentation import record, span, sql_label
+from ledger_export import EXPORT_COLUMNS, build_export_query, iter_batches
+from search import description_ngrams, fts5_query, mysql_boolean_query, search_terms
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SQLITE_SETUP_FILE = os.path.join(BASE_DIR, "database_setup_sqlite.sql")
+EMBEDDED_PATH = os.path.join(BASE_DIR, "data", "solux_finance.db")
+
+STORAGE_BACKENDS = ['mysql', 'embedded']
+
+# 두 백엔드가 같은 SQL을 쓰는 조회 (EmbeddedStorage는 %s를 ?로 바꿔 실행)
+TRANSACTIONS_SQL = """
+SELECT * FROM transactions
+ORDER BY transaction_date DESC, created_at DESC
+LIMIT %s
+"""
+
+# 내용 해시 유니크 인덱스(unique_transaction) 한 번의 조회
+# (날짜도 함께 주어 MySQL 연도별 파티션 중 하나만 찾음, migrations/008)
+DUPLICATE_SQL = """
+SELECT COUNT(*) as count FROM transactions
+WHERE content_hash = %s AND transaction_date = %s
+"""
+
+# 일괄 가져오기에서 이미 저장된 해시를 묶어서 확인할 때 한 번에 보내는 개수
+HASH_LOOKUP_BATCH = 1000
+
+MONTHLY_DATA_SQL = """
+SELECT
+    transaction_date,
+    transaction_type,
+    SUM(amount) as daily_total
+FROM transactions
+WHERE transaction_date >= %s AND transaction_date < %s
+GROUP BY transaction_date, transaction_type
+ORDER BY transaction_date
+"""
+
+# 일자별 합계(원본)와 카테고리별 합계(요약 테이블)를 한 번의 왕복으로 조회
+MONTHLY_STATS_SQL = """
+SELECT 'day' as kind, transaction_date, transaction_type, NULL as category, SUM(amount) as total
+FROM transactions
+WHERE transaction_date >= %s AND transaction_date < %s
+GROUP BY transaction_date, transaction_type
+UNION ALL
+SELECT 'category', NULL, transaction_type, category, total_amount
+FROM monthly_summary
+WHERE month_start = %s
+AND transaction_count > 0
+"""
+
+# 예산 엔진(budget.py) 초기 적재: 한도 전체와 월/카테고리별 지출 합계 (요약 테이블)
+BUDGETS_SQL = """
+SELECT budget_month, category, limit_amount FROM budgets
+"""
+
+EXPENSE_TOTALS_SQL = """
+SELECT month_start, category, total_amount as total
+FROM monthly_summary
+WHERE transaction_type = '지출'
+AND transaction_count > 0
+"""
+
+# 저장 트랜잭션 안의 한도 확인: 그 달에 적용되는 한도와 그 달 지출 요약 행
+# (MySQL은 FOR UPDATE를 붙여 요약 행(빈 달은 간격)을 잠가 다른 프로세스의 동시 저장과 직렬화)
+MONTH_BUDGETS_SQL = """
+SELECT budget_month, category, limit_amount FROM budgets
+WHERE budget_month IN (%s, %s)
+"""
+
+MONTH_EXPENSE_SQL = """
+SELECT category, total_amount
+FROM monthly_summary
+WHERE month_start = %s
+AND transaction_type = '지출'
+"""
+
+# 추이 분석: 월/유형/카테고리별 합계 (요약 테이블, 보관된 연도의 행도 남아 있음)
+# 추이 분석 조회 시작 월 (요약 테이블 전체, MySQL DATE 최솟값)
+TREND_START = date(1000, 1, 1)
+
+MONTHLY_TOTALS_SQL = """
+SELECT month_start, transaction_type, category, total_amount as total
+FROM monthly_summary
+WHERE month_start >= %s AND month_start < %s
+AND transaction_count > 0
+"""
+
+# 예산 누계 확인용: 요약 테이블 대신 원본에서 일자/카테고리별로 다시 집계
+DAILY_EXPENSE_TOTALS_SQL = """
+SELECT transaction_date, category, SUM(amount) as total
+FROM transactions
+WHERE transaction_type = '지출'
+GROUP BY transaction_date, category
+"""
+
+# X일 잔고 = X 이전 달의 월말 잔고 + X 달의 X일까지 누계 (migrations/006, 기본 키 조회 두 번)
+BALANCE_AS_OF_SQL = """
+SELECT
+    COALESCE((
+        SELECT closing_balance FROM monthly_balance
+        WHERE month_start < %s
+        ORDER BY month_start DESC LIMIT 1
+    ), 0)
+    + COALESCE((
+        SELECT month_balance FROM daily_balance
+        WHERE balance_date >= %s AND balance_date <= %s
+        ORDER BY balance_date DESC LIMIT 1
+    ), 0) as balance
+"""
+
+# 기간 안의 거래일별 잔고 (그달 시작 잔고 = 월말 잔고 - 그달 순액)
+BALANCE_SERIES_SQL = """
+SELECT d.balance_date, d.net_amount, m.closing_balance - m.net_amount + d.month_balance as balance
+FROM daily_balance d
+JOIN monthly_balance m ON m.month_start = d.month_start
+WHERE d.balance_date >= %s AND d.balance_date <= %s
+ORDER BY d.balance_date
+"""
+
+# 보관된 마지막 회계연도의 다음 해 1월 1일 (이 날짜 이전 거래는 보관 파일에 있음, migrations/008)
+ARCHIVE_BOUNDARY_SQL = """
+SELECT MAKEDATE(MAX(fiscal_year) + 1, 1) as boundary FROM archived_years
+"""
+
+# 월별 조회마다 보관 경계를 다시 읽지 않도록 재사용하는 시간 (초)
+# 경계는 manage.py archive로만 바뀌므로, 다른 프로세스의 보관은 이 시간 안에 반영된다
+ARCHIVE_BOUNDARY_TTL = 300
+
+INSERT_SQL = """
+INSERT INTO transactions (transaction_date, transaction_type, amount, category, description)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+# SQLite는 content_hash를 생성 열 대신 앱이 계산해 함께 저장
+SQLITE_INSERT_SQL = """
+INSERT INTO transactions (transaction_date, transaction_type, amount, category, description, content_hash)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+def build_filters(transaction_type, category, start_date, end_date, table=None):
+    """거래 목록/검색 공통 필터 조건 목록과 파라미터"""
+    prefix = f"{table}." if table else ""
+    conditions = []
+    params = []
+    if transaction_type:
+        conditions.append(f"{prefix}transaction_type = %s")
+        params.append(transaction_type)
+    if category:
+        conditions.append(f"{prefix}category = %s")
+        params.append(category)
+    if start_date:
+        conditions.append(f"{prefix}transaction_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append(f"{prefix}transaction_date <= %s")
+        params.append(end_date)
+    return conditions, params
+
+
+def build_page_query(transaction_type, category, start_date, end_date, limit, cursor, direction):
+    """거래 목록 한 페이지 SQL과 파라미터 (필터 + (transaction_date, created_at, id) 키셋)"""
+    conditions, params = build_filters(transaction_type, category, start_date, end_date)
+
+    # 이전 페이지 경계 이후/이전 행만 읽음
+    op, order = ('<', 'DESC') if direction == 'next' else ('>', 'ASC')
+    if cursor:
+        cursor_date, cursor_created_at, cursor_id = cursor
+        conditions.append(
+            f"(transaction_date {op} %s OR (transaction_date = %s AND "
+            f"(created_at {op} %s OR (created_at = %s AND id {op} %s))))"
+        )
+        params.extend([cursor_date, cursor_date, cursor_created_at, cursor_created_at, cursor_id])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+    SELECT id, created_at, transaction_date, transaction_type, amount, category, description
+    FROM transactions
+    {where}
+    ORDER BY transaction_date {order}, created_at {order}, id {order}
+    LIMIT %s
+    """
+    params.append(limit)
+    return sql, params
+
+
+def build_hash_lookup(hashes):
+    """주어진 해시 중 이미 저장된 것을 찾는 SQL과 파라미터 (unique_transaction 인덱스 IN 조회)"""
+    placeholders = ', '.join(['%s'] * len(hashes))
+    return f"SELECT content_hash FROM transactions WHERE content_hash IN ({placeholders})", list(hashes)
+
+
+def search_order_by(order, table=None):
+    """검색 결과 정렬: relevance는 점수 높은 순(같으면 최신순), date는 최신순"""
+    prefix = f"{table}." if table else ""
+    by_date = f"{prefix}transaction_date DESC, {prefix}created_at DESC, {prefix}id DESC"
+    return f"score DESC, {by_date}" if order == 'relevance' else by_date
+
+
+def build_mysql_search_query(terms, transaction_type, category, start_date, end_date, order, limit, offset):
+    """MySQL 설명 검색 SQL과 파라미터 (terms는 search_terms 결과)"""
+    against = mysql_boolean_query(terms)
+    conditions, params = build_filters(transaction_type, category, start_date, end_date, table='t')
+    # transaction_search의 ft_description(ngram) FULLTEXT 인덱스로 후보를 찾고 나머지 조건은 그 결과에만 적용
+    # (파티션 테이블인 transactions에는 FULLTEXT 인덱스를 둘 수 없음, migrations/008)
+    where = ' AND '.join(["MATCH(s.description) AGAINST (%s IN BOOLEAN MODE)"] + conditions)
+    sql = f"""
+    SELECT t.id, t.created_at, t.transaction_date, t.transaction_type, t.amount, t.category, t.description,
+           MATCH(s.description) AGAINST (%s IN BOOLEAN MODE) as score
+    FROM transaction_search s
+    JOIN transactions t ON t.id = s.transaction_id AND t.transaction_date = s.transaction_date
+    WHERE {where}
+    ORDER BY {search_order_by(order, table='t')}
+    LIMIT %s OFFSET %s
+    """
+    return sql, [against, against] + params + [limit, offset]
+
+
+def read_archive_boundary(cursor):
+    """ARCHIVE_BOUNDARY_SQL 결과 (보관한 연도가 없거나 migrations/008 적용 전이면 None)"""
+    try:
+        cursor.execute(ARCHIVE_BOUNDARY_SQL)
+    except pymysql.err.ProgrammingError as e:
+        if e.args[0] == ER.NO_SUCH_TABLE:
+            return None
+        raise
+    row = cursor.fetchone()
+    return row['boundary'] if isinstance(row, dict) else row[0]
+
+
+class Storage:
+    """저장소 공통 인터페이스
+
+    조회 메서드는 dict 목록(열 이름 → 값)을 반환하고, 오류는 그대로 예외로 올린다
+    (Streamlit 오류 표시는 app.py의 호출부에서 처리).
+    """
+
+    backend = None
+
+    def fetch_transactions(self, limit=100):
+        """최근 거래 limit건"""
+        raise NotImplementedError
+
+    def fetch_transaction_page(self, transaction_type, category, start_date, end_date, limit, cursor, direction):
+        """build_page_query 조건의 거래 limit건"""
+        raise NotImplementedError
+
+    def fetch_categories(self, transaction_type=None):
+        """카테고리 이름 목록"""
+        raise NotImplementedError
+
+    def fetch_monthly_data(self, year_month):
+        """월의 일자/유형별 합계 (transaction_date, transaction_type, daily_total)"""
+        raise NotImplementedError
+
+    def fetch_monthly_stats(self, year_month):
+        """MonthlyStats.from_rows 입력 (kind, transaction_date, transaction_type, category, total)"""
+        raise NotImplementedError
+
+    def search_transactions(self, query, transaction_type=None, category=None, start_date=None, end_date=None,
+                            order='relevance', limit=50, offset=0):
+        """설명 전문 검색 (search.py 참고), 행마다 score(클수록 관련도 높음) 포함"""
+        raise NotImplementedError
+
+    def transaction_exists(self, transaction_date, transaction_type, amount, category, description):
+        """같은 내용(content_hash.transaction_hash)의 거래가 있는지"""
+        raise NotImplementedError
+
+    def existing_hashes(self, hashes):
+        """주어진 내용 해시 중 이미 저장된 것의 집합"""
+        raise NotImplementedError
+
+    def balance_as_of(self, as_of):
+        """as_of 날짜가 끝났을 때의 동아리 잔고 (전체 기간 수입 - 지출)"""
+        raise NotImplementedError
+
+    def fetch_balance_series(self, start_date, end_date):
+        """기간 안의 거래일별 잔고 (balance_date, net_amount, balance)"""
+        raise NotImplementedError
+
+    def fetch_monthly_totals(self, start_month, end_month):
+        """[start_month, end_month) 월 1일 구간의 월/유형/카테고리별 합계 (month_start, transaction_type, category, total)"""
+        raise NotImplementedError
+
+    def archive_boundary(self):
+        """보관된 회계연도의 끝(다음 해 1월 1일), 이보다 이른 거래는 DB 대신 보관 파일에 있음 (없으면 None)"""
+        return None
+
+    def fetch_budgets(self):
+        """예산 한도 전체 (budget_month, category, limit_amount)"""
+        raise NotImplementedError
+
+    def set_budget(self, budget_month, category, limit_amount):
+        """예산 한도 추가 또는 변경 (budget.py의 ALL_MONTHS/TOTAL_CATEGORY 참고)"""
+        raise NotImplementedError
+
+    def delete_budget(self, budget_month, category):
+        """예산 한도 삭제, 삭제 여부 반환"""
+        raise NotImplementedError
+
+    def fetch_expense_totals(self):
+        """월/카테고리별 지출 합계 (month_start, category, total) - 요약 테이블"""
+        raise NotImplementedError
+
+    def fetch_daily_expense_totals(self):
+        """일자/카테고리별 지출 합계 (transaction_date, category, total) - 원본 transactions"""
+        raise NotImplementedError
+
+    def save_transaction(self, transaction_date, transaction_type, amount, category, description,
+                         allow_over_limit=False):
+        """지출이면 같은 트랜잭션 안에서 그 달 예산 한도를 확인하고 저장, 중복은 unique_transaction 키 위반으로 판단
+
+        다른 프로세스의 동시 저장과 직렬화된 DB 값으로 확인한다 (budget.BudgetEngine.check는 사전 확인).
+        반환값: (상태, 한도를 넘는 BudgetStatus 목록) - 상태는 'saved', 'duplicate', 'over_limit' 중 하나
+        """
+        raise NotImplementedError
+
+    def load_categories(self):
+        """{카테고리 이름: 유형}"""
+        raise NotImplementedError
+
+    def insert_ignore(self, rows):
+        """(날짜, 유형, 금액, 카테고리, 설명) 목록을 한 트랜잭션으로 저장하고, 중복을 건너뛴 뒤 저장된 행 수를 반환"""
+        raise NotImplementedError
+
+    def stream_transactions(self, batch_size=10000, **filters):
+        """build_export_query 조건의 거래를 batch_size 행(튜플 목록)씩 yield"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MySQLStorage(Storage):
+    """운영 MySQL 저장소 (ConnectionPool에서 연결을 대여)
+
+    manage.py archive로 보관한 회계연도는 파티션이 삭제되었을 수 있으므로
+    그 기간의 월별 통계는 archive(LedgerArchive)의 Parquet 파일에서 계산한다.
+    보관 경계는 boundary_ttl초 동안 재사용한다 (지난해 조회마다 DB 왕복을 더하지 않도록).
+    """
+
+    backend = 'mysql'
+
+    def __init__(self, pool, archive=None, boundary_ttl=ARCHIVE_BOUNDARY_TTL):
+        self.pool = pool
+        self.archive = archive or LedgerArchive()
+        self.boundary_ttl = boundary_ttl
+        self._boundary = None  # (보관 경계, 읽은 시각)
+
+    def close(self):
+        self.pool.close_all()
+
+    @contextmanager
+    def _cursor(self, cursorclass=pymysql.cursors.DictCursor):
+        with self.pool.connection() as connection:
+            with connection.cursor(cursorclass) as cursor:
+                yield cursor
+
+    def fetch_transactions(self, limit=100):
+        with self._cursor() as cursor:
+            cursor.execute(TRANSACTIONS_SQL, (limit,))
+            return cursor.fetchall()
+
+    def fetch_transaction_page(self, transaction_type, category, start_date, end_date, limit, cursor, direction):
+        sql, params = build_page_query(transaction_type, category, start_date, end_date, limit, cursor, direction)
+        with self._cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            return list(db_cursor.fetchall())
+
+    def fetch_categories(self, transaction_type=None):
+        with self._cursor() as cursor:
+            if transaction_type:
+                sql = "SELECT name FROM categories WHERE type = %s ORDER BY name"
+                cursor.execute(sql, (transaction_type,))
+            else:
+                sql = "SELECT name FROM categories ORDER BY type, name"
+                cursor.execute(sql)
+            return [row['name'] for row in cursor.fetchall()]
+
+    def _archived(self, year_month):
+        """그 달이 보관된 회계연도인지 (올해는 보관할 수 없으므로 DB에 묻지 않음)"""
+        month_start = month_range(year_month)[0]
+        if month_start.year >= date.today().year:
+            return False
+        boundary = self._cached_archive_boundary()
+        return boundary is not None and month_start < boundary
+
+    def _cached_archive_boundary(self):
+        cached = self._boundary
+        if cached is not None and time.monotonic() - cached[1] < self.boundary_ttl:
+            return cached[0]
+        boundary = self.archive_boundary()
+        # 튜플 하나를 바꿔 넣으므로 세션 스레드끼리 잠그지 않음 (동시에 만료되면 각자 한 번씩 읽을 뿐)
+        self._boundary = (boundary, time.monotonic())
+        return boundary
+
+    def archive_boundary(self):
+        """항상 DB에서 읽음 (budget.BudgetEngine.verify 등 최신 값이 필요한 곳, 월별 조회는 _cached_archive_boundary)"""
+        with self._cursor() as cursor:
+            return read_archive_boundary(cursor)
+
+    def fetch_monthly_data(self, year_month):
+        if self._archived(year_month):
+            with span('frame', f"보관 파일 일자별 합계 {year_month}"):
+                return self.archive.monthly_data(year_month)
+        with self._cursor() as cursor:
+            cursor.execute(MONTHLY_DATA_SQL, month_range(year_month))
+            return cursor.fetchall()
+
+    def fetch_monthly_stats(self, year_month):
+        if self._archived(year_month):
+            with span('frame', f"보관 파일 월별 통계 {year_month}"):
+                return self.archive.monthly_stats(year_month)
+        month_start, next_month_start = month_range(year_month)
+        with self._cursor() as cursor:
+            cursor.execute(MONTHLY_STATS_SQL, (month_start, next_month_start, month_start))
+            return cursor.fetchall()
+
+    def search_transactions(self, query, transaction_type=None, category=None, start_date=None, end_date=None,
+                            order='relevance', limit=50, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        sql, params = build_mysql_search_query(terms, transaction_type, category, start_date, end_date,
+                                               order, limit, offset)
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            return list(cursor.fetchall())
+
+    def transaction_exists(self, transaction_date, transaction_type, amount, category, description):
+        content_hash = transaction_hash(transaction_date, transaction_type, amount, category, description)
+        with self._cursor() as cursor:
+            cursor.execute(DUPLICATE_SQL, (content_hash, transaction_date))
+            return cursor.fetchone()['count'] > 0
+
+    def existing_hashes(self, hashes):
+        hashes = list(hashes)
+        found = set()
+        with self._cursor(pymysql.cursors.Cursor) as cursor:
+            for start in range(0, len(hashes), HASH_LOOKUP_BATCH):
+                cursor.execute(*build_hash_lookup(hashes[start:start + HASH_LOOKUP_BATCH]))
+                found.update(row[0] for row in cursor.fetchall())
+        return found
+
+    def balance_as_of(self, as_of):
+        with self._cursor() as cursor:
+            cursor.execute(BALANCE_AS_OF_SQL, (as_of.replace(day=1), as_of.replace(day=1), as_of))
+            return cursor.fetchone()['balance']
+
+    def fetch_balance_series(self, start_date, end_date):
+        with self._cursor() as cursor:
+            cursor.execute(BALANCE_SERIES_SQL, (start_date, end_date))
+            return list(cursor.fetchall())
+
+    def fetch_monthly_totals(self, start_month, end_month):
+        with self._cursor() as cursor:
+            cursor.execute(MONTHLY_TOTALS_SQL, (start_month, end_month))
+            return list(cursor.fetchall())
+
+    def fetch_budgets(self):
+        with self._cursor() as cursor:
+            cursor.execute(BUDGETS_SQL)
+            return list(cursor.fetchall())
+
+    def set_budget(self, budget_month, category, limit_amount):
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO budgets (budget_month, category, limit_amount) VALUES (%s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE limit_amount = VALUES(limit_amount)",
+                    (budget_month, category, limit_amount)
+                )
+            connection.commit()
+
+    def delete_budget(self, budget_month, category):
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                deleted = cursor.execute(
+                    "DELETE FROM budgets WHERE budget_month = %s AND category = %s", (budget_month, category)
+                )
+            connection.commit()
+        return deleted > 0
+
+    def fetch_expense_totals(self):
+        with self._cursor() as cursor:
+            cursor.execute(EXPENSE_TOTALS_SQL)
+            return list(cursor.fetchall())
+
+    def fetch_daily_expense_totals(self):
+        with self._cursor() as cursor:
+            cursor.execute(DAILY_EXPENSE_TOTALS_SQL)
+            return list(cursor.fetchall())
+
+    def save_transaction(self, transaction_date, transaction_type, amount, category, description,
+                         allow_over_limit=False):
+        with self.pool.connection() as connection:
+            for attempt in range(3):
+                try:
+                    exceeded = []
+                    with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+                        if transaction_type == '지출':
+                            month_start = transaction_date.replace(day=1)
+                            # 해당 월 지출 요약 행을 잠가 동시 저장 시 한도 확인을 직렬화
+                            cursor.execute(MONTH_EXPENSE_SQL + " FOR UPDATE", (month_start,))
+                            expense_rows = cursor.fetchall()
+                            cursor.execute(MONTH_BUDGETS_SQL, (ALL_MONTHS, transaction_date.strftime('%Y-%m')))
+                            exceeded = check_rows(cursor.fetchall(), expense_rows, transaction_date, amount, category)
+                            if exceeded and not allow_over_limit:
+                                connection.rollback()
+                                return 'over_limit', exceeded
+
+                        # 중복 여부는 unique_transaction(content_hash) 키 위반으로 판단
+                        cursor.execute(INSERT_SQL, (transaction_date, transaction_type, amount, category, description))
+                    connection.commit()
+                    return 'saved', exceeded
+                except pymysql.err.IntegrityError as e:
+                    connection.rollback()
+                    if e.args[0] == ER.DUP_ENTRY:
+                        return 'duplicate', []
+                    raise
+                except pymysql.err.OperationalError as e:
+                    connection.rollback()
+                    # 빈 월에 대한 간격 잠금끼리 교착되면 한 쪽을 재시도
+                    if e.args[0] == ER.LOCK_DEADLOCK and attempt < 2:
+                        continue
+                    raise
+                except Exception:
+                    connection.rollback()
+                    raise
+
+    def load_categories(self):
+        with self._cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute("SELECT name, type FROM categories")
+            return dict(cursor.fetchall())
+
+    def insert_ignore(self, rows):
+        with self.pool.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    # pymysql은 INSERT ... VALUES의 executemany를 다중 행 INSERT로 묶어 전송
+                    inserted = cursor.executemany(INSERT_SQL.replace("INSERT INTO", "INSERT IGNORE INTO"), rows) or 0
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        return inserted
+
+    def stream_transactions(self, batch_size=10000, **filters):
+        """SSCursor로 배치 단위 스트리밍
+
+        결과 전체를 클라이언트에 버퍼링하지 않으므로 배치 하나 분량의 메모리만 사용한다.
+        스트림이 끝날 때까지 연결 하나를 점유한다.
+        """
+        sql, params = build_export_query(**filters)
+        with self._cursor(pymysql.cursors.SSCursor) as cursor:
+            cursor.execute(sql, params)
+            yield from iter_batches(cursor, batch_size)
+
+
+def _sqlite_value(value):
+    """SQLite 파라미터 변환 (날짜는 ISO 문자열, Decimal/numpy 스칼라는 숫자)"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+# 내보내기 행의 금액 위치와 MySQL DECIMAL(12, 2)의 소수 자릿수
+EXPORT_AMOUNT_INDEX = EXPORT_COLUMNS.index('amount')
+CENTS = Decimal('0.01')
+
+
+def _decimal_amounts(rows):
+    """SQLite NUMERIC 금액(정수 또는 소수가 있으면 REAL)을 MySQL처럼 Decimal로 바꾼 내보내기 행
+
+    float를 그대로 두면 Parquet decimal128 열로 변환할 수 없으므로 문자열을 거쳐 센트 단위로 맞춘다.
+    """
+    i = EXPORT_AMOUNT_INDEX
+    return [row[:i] + (Decimal(str(row[i])).quantize(CENTS),) + row[i + 1:] for row in rows]
+
+
+def _qmark(sql):
+    return sql.replace('%s', '?')
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+# DATE/TIMESTAMP로 선언한 열은 MySQL과 같은 date/datetime 객체로 읽음
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+
+class EmbeddedStorage(Storage):
+    """로컬/오프라인 저장소
+
+    쓰기와 건별 조회는 SQLite 파일(WAL)에서, 월 집계는 DuckDB가 있으면
+    transactions의 열 지향 스냅샷에서 실행한다. 스냅샷은 집계 요청 시 새로 추가된 id만 덧붙이며,
+    앱 밖에서 기존 행을 수정/삭제했다면 refresh_analytics(full=True)로 다시 적재한다.
+    DuckDB가 설치되어 있지 않으면 집계도 SQLite(요약 테이블/인덱스)로 처리한다.
+    """
+
+    backend = 'embedded'
+
+    def __init__(self, path=EMBEDDED_PATH, setup_file=SQLITE_SETUP_FILE, analytics=True):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._analytics_lock = threading.Lock()
+        self._duckdb = None if analytics else False
+        self._snapshot_max_id = 0
+        connection = self._connection()
+        self._upgrade_schema(connection)
+        new_budgets = not connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'budgets'"
+        ).fetchone()
+        with open(setup_file, 'r', encoding='utf-8') as f:
+            connection.executescript(f.read())
+        if new_budgets:
+            # migrations/007의 기본 한도와 같은 값
+            self.set_budget(ALL_MONTHS, TOTAL_CATEGORY, DEFAULT_MONTHLY_LIMIT)
+
+    @staticmethod
+    def _upgrade_schema(connection):
+        """content_hash 열이 생기기 전에 만든 파일을 새 중복 판정 키로 전환 (migrations/005에 해당)
+
+        열 추가와 이전 접두 키/updated_at 트리거 삭제만 하고, 해시 채우기와 새 인덱스/트리거는
+        설정 스크립트가 만든다. 해시가 겹치는 기존 거래가 있으면 파일을 바꾸지 않고 오류를 낸다.
+        """
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(transactions)")}
+        if not columns or 'content_hash' in columns:
+            return
+        collisions = connection.execute(collisions_sql(SQLITE_HASH_SQL)).fetchall()
+        if collisions:
+            raise ValueError(
+                "내용이 같은 거래가 있어 중복 판정 키를 전환할 수 없습니다. 중복 거래를 정리한 뒤 다시 여세요.\n"
+                + "\n".join(format_collisions(collisions))
+            )
+        connection.executescript("""
+            BEGIN IMMEDIATE;
+            ALTER TABLE transactions ADD COLUMN content_hash TEXT;
+            DROP INDEX IF EXISTS unique_transaction;
+            DROP TRIGGER IF EXISTS trg_transactions_updated_at;
+            COMMIT;
+        """)
+
+    def _connection(self):
+        """스레드별 SQLite 연결 (Streamlit 세션 스레드끼리 연결을 공유하지 않음)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None,
+                detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+            )
+            connection.row_factory = _dict_row
+            # 전문 검색 색인 트리거가 쓰는 함수 (database_setup_sqlite.sql)
+            connection.create_function('description_ngrams', 1, description_ngrams, deterministic=True)
+            connection.create_function('transaction_hash', 5, transaction_hash, deterministic=True)
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _query(self, sql, params=()):
+        start = time.perf_counter()
+        rows = self._connection().execute(_qmark(sql), [_sqlite_value(p) for p in params]).fetchall()
+        record('sql', sql_label(sql), time.perf_counter() - start, rows=len(rows))
+        return rows
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡는 트랜잭션 (MySQL의 FOR UPDATE 직렬화에 해당)"""
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def fetch_transactions(self, limit=100):
+        return self._query(TRANSACTIONS_SQL, (limit,))
+
+    def fetch_transaction_page(self, transaction_type, category, start_date, end_date, limit, cursor, direction):
+        sql, params = build_page_query(transaction_type, category, start_date, end_date, limit, cursor, direction)
+        return self._query(sql, params)
+
+    def fetch_categories(self, transaction_type=None):
+        if transaction_type:
+            rows = self._query("SELECT name FROM categories WHERE type = %s ORDER BY name", (transaction_type,))
+        else:
+            rows = self._query("SELECT name FROM categories ORDER BY type, name")
+        return [row['name'] for row in rows]
+
+    def fetch_monthly_data(self, year_month):
+        analytics = self._analytics()
+        if analytics is None:
+            return self._query(MONTHLY_DATA_SQL, month_range(year_month))
+        return self._analytics_query(analytics, MONTHLY_DATA_SQL, month_range(year_month))
+
+    def fetch_monthly_stats(self, year_month):
+        month_start, next_month_start = month_range(year_month)
+        analytics = self._analytics()
+        if analytics is None:
+            return self._query(MONTHLY_STATS_SQL, (month_start, next_month_start, month_start))
+        # 열 지향 스냅샷에서는 카테고리별 합계도 원본에서 바로 집계
+        sql = """
+        SELECT 'day' as kind, transaction_date, transaction_type, NULL as category, SUM(amount) as total
+        FROM transactions
+        WHERE transaction_date >= %s AND transaction_date < %s
+        GROUP BY transaction_date, transaction_type
+        UNION ALL
+        SELECT 'category', NULL, transaction_type, category, SUM(amount)
+        FROM transactions
+        WHERE transaction_date >= %s AND transaction_date < %s
+        GROUP BY transaction_type, category
+        """
+        return self._analytics_query(analytics, sql, (month_start, next_month_start, month_start, next_month_start))
+
+    def search_transactions(self, query, transaction_type=None, category=None, start_date=None, end_date=None,
+                            order='relevance', limit=50, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        conditions, params = build_filters(transaction_type, category, start_date, end_date, table='t')
+        where = ' AND '.join(["transactions_fts MATCH %s"] + conditions)
+        # bm25()는 작을수록 관련도가 높으므로 부호를 바꿔 MySQL 점수와 같은 방향으로 맞춤
+        sql = f"""
+        SELECT t.id, t.created_at, t.transaction_date, t.transaction_type, t.amount, t.category, t.description,
+               -bm25(transactions_fts) as score
+        FROM transactions_fts
+        JOIN transactions t ON t.id = transactions_fts.rowid
+        WHERE {where}
+        ORDER BY {search_order_by(order, table='t')}
+        LIMIT %s OFFSET %s
+        """
+        return self._query(sql, [fts5_query(terms)] + params + [limit, offset])
+
+    def transaction_exists(self, transaction_date, transaction_type, amount, category, description):
+        content_hash = transaction_hash(transaction_date, transaction_type, amount, category, description)
+        return self._query(DUPLICATE_SQL, (content_hash, transaction_date))[0]['count'] > 0
+
+    def existing_hashes(self, hashes):
+        hashes = list(hashes)
+        found = set()
+        for start in range(0, len(hashes), HASH_LOOKUP_BATCH):
+            rows = self._query(*build_hash_lookup(hashes[start:start + HASH_LOOKUP_BATCH]))
+            found.update(row['content_hash'] for row in rows)
+        return found
+
+    def balance_as_of(self, as_of):
+        return self._query(BALANCE_AS_OF_SQL, (as_of.replace(day=1), as_of.replace(day=1), as_of))[0]['balance']
+
+    def fetch_balance_series(self, start_date, end_date):
+        return self._query(BALANCE_SERIES_SQL, (start_date, end_date))
+
+    def fetch_monthly_totals(self, start_month, end_month):
+        return self._query(MONTHLY_TOTALS_SQL, (start_month, end_month))
+
+    def fetch_budgets(self):
+        return self._query(BUDGETS_SQL)
+
+    def set_budget(self, budget_month, category, limit_amount):
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO budgets (budget_month, category, limit_amount) VALUES (?, ?, ?) "
+                "ON CONFLICT (budget_month, category) DO UPDATE SET limit_amount = excluded.limit_amount",
+                (budget_month, category, _sqlite_value(limit_amount))
+            )
+
+    def delete_budget(self, budget_month, category):
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM budgets WHERE budget_month = ? AND category = ?", (budget_month, category)
+            )
+            return cursor.rowcount > 0
+
+    def fetch_expense_totals(self):
+        return self._query(EXPENSE_TOTALS_SQL)
+
+    def fetch_daily_expense_totals(self):
+        return self._query(DAILY_EXPENSE_TOTALS_SQL)
+
+    @staticmethod
+    def _insert_params(row):
+        # (날짜, 유형, 금액, 카테고리, 설명) + 내용 해시
+        return [_sqlite_value(value) for value in row] + [transaction_hash(*row)]
+
+    def save_transaction(self, transaction_date, transaction_type, amount, category, description,
+                         allow_over_limit=False):
+        params = self._insert_params((transaction_date, transaction_type, amount, category, description))
+        exceeded = []
+        try:
+            # BEGIN IMMEDIATE가 다른 프로세스의 쓰기를 막으므로 확인과 저장 사이에 지출이 바뀌지 않음
+            with self._transaction() as connection:
+                if transaction_type == '지출':
+                    expense_rows = connection.execute(
+                        _qmark(MONTH_EXPENSE_SQL), (_sqlite_value(transaction_date.replace(day=1)),)
+                    ).fetchall()
+                    budget_rows = connection.execute(
+                        _qmark(MONTH_BUDGETS_SQL), (ALL_MONTHS, transaction_date.strftime('%Y-%m'))
+                    ).fetchall()
+                    exceeded = check_rows(budget_rows, expense_rows, transaction_date, amount, category)
+                    if exceeded and not allow_over_limit:
+                        return 'over_limit', exceeded
+                connection.execute(_qmark(SQLITE_INSERT_SQL), params)
+        except sqlite3.IntegrityError as e:
+            if 'UNIQUE' in str(e):
+                return 'duplicate', []
+            raise
+        return 'saved', exceeded
+
+    def load_categories(self):
+        return {row['name']: row['type'] for row in self._query("SELECT name, type FROM categories")}
+
+    def insert_ignore(self, rows):
+        sql = _qmark(SQLITE_INSERT_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO"))
+        with self._transaction() as connection:
+            # rowcount는 total_changes와 달리 트리거(요약/색인)가 바꾼 행은 세지 않음
+            return connection.executemany(sql, [self._insert_params(row) for row in rows]).rowcount
+
+    def stream_transactions(self, batch_size=10000, **filters):
+        sql, params = build_export_query(**filters)
+        # 내보내기는 튜플 행을 기대하므로 별도 커서에서 row_factory 없이 읽음
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute(_qmark(sql), [_sqlite_value(p) for p in params])
+            for rows in iter_batches(cursor, batch_size):
+                yield _decimal_amounts(rows)
+        finally:
+            cursor.close()
+
+    # --- 집계용 DuckDB 스냅샷 ---
+
+    def _analytics(self):
+        """최신 상태로 맞춘 DuckDB 연결, DuckDB가 없으면 None"""
+        if self._duckdb is False:
+            return None
+        with self._analytics_lock:
+            if self._duckdb is None:
+                try:
+                    import duckdb
+                except ImportError:
+                    self._duckdb = False
+                    return None
+                self._duckdb = duckdb.connect()
+                self._duckdb.execute("""
+                    CREATE TABLE transactions (
+                        id BIGINT,
+                        transaction_date DATE,
+                        transaction_type VARCHAR,
+                        amount DECIMAL(14, 2),
+                        category VARCHAR
+                    )
+                """)
+            self._refresh_snapshot()
+            return self._duckdb
+
+    def refresh_analytics(self, full=False):
+        """집계 스냅샷 갱신 (full=True면 전체 재적재)"""
+        if self._duckdb in (None, False):
+            return
+        with self._analytics_lock:
+            if full:
+                self._snapshot_max_id = -1
+            self._refresh_snapshot()
+
+    def _refresh_snapshot(self, batch_size=100000):
+        # 잠금 보유 상태에서 호출: 스냅샷 이후 추가된 id만 배치 단위로 덧붙임
+        import pandas as pd
+
+        max_id = self._query("SELECT COALESCE(MAX(id), 0) as max_id FROM transactions")[0]['max_id']
+        if max_id == self._snapshot_max_id:
+            return
+        if max_id < self._snapshot_max_id or self._snapshot_max_id < 0:
+            # 테이블이 비워졌거나 전체 재적재 요청
+            self._duckdb.execute("DELETE FROM transactions")
+            self._snapshot_max_id = 0
+
+        with span('frame', "집계 스냅샷 적재"):
+            cursor = self._connection().cursor()
+            cursor.row_factory = None
+            # 문자열 그대로 넘기고 형 변환은 DuckDB에서 (Python 객체 변환 비용 절약)
+            columns = "id, CAST(transaction_date AS TEXT), transaction_type, CAST(amount AS REAL), category"
+            if self._snapshot_max_id == 0:
+                # 처음 적재는 날짜순으로 넣어 DuckDB 존 맵이 월 구간 조회에서 행 그룹을 건너뛰게 함
+                # (idx_date_type_category_amount가 모든 열을 덮으므로 정렬 없이 인덱스 순서로 읽음)
+                cursor.execute(
+                    f"SELECT {columns} FROM transactions WHERE id <= ? ORDER BY transaction_date", (max_id,)
+                )
+            else:
+                cursor.execute(
+                    f"SELECT {columns} FROM transactions WHERE id > ? AND id <= ? ORDER BY id",
+                    (self._snapshot_max_id, max_id)
+                )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                new_rows = pd.DataFrame(rows, columns=['id', 'transaction_date', 'transaction_type', 'amount', 'category'])
+                self._duckdb.register('new_rows', new_rows)
+                self._duckdb.execute("""
+                    INSERT INTO transactions
+                    SELECT id, CAST(transaction_date AS DATE), transaction_type,
+                           CAST(amount AS DECIMAL(14, 2)), category
+                    FROM new_rows
+                """)
+                self._duckdb.unregister('new_rows')
+            cursor.close()
+        self._snapshot_max_id = max_id
+
+    def _analytics_query(self, analytics, sql, params):
+        # DuckDB 연결의 cursor()는 같은 데이터베이스에 대한 스레드별 연결
+        start = time.perf_counter()
+        cursor = analytics.cursor()
+        try:
+            cursor.execute(_qmark(sql), list(params))
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        record('sql', sql_label("[duckdb] " + sql), time.perf_counter() - start, rows=len(rows))
+        return rows
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+        if self._duckdb:
+            self._duckdb.close()
+            self._duckdb = None
+
+
+def open_storage(backend, pool_factory=None, path=None, archive_dir=None):
+    """설정 이름으로 저장소 생성 (pool_factory는 MySQL 연결 풀을 만드는 함수, archive_dir은 보관 파일 디렉토리)"""
+    if backend == 'embedded':
+        return EmbeddedStorage(path or EMBEDDED_PATH)
+    if backend == 'mysql':
+        return MySQLStorage(pool_factory(), archive=LedgerArchive(archive_dir or ARCHIVE_DIR))
+    raise ValueError(f"알 수 없는 저장소: {backend} (선택: {', '.join(STORAGE_BACKENDS)})")
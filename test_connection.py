@@ -1,139 +1,429 @@
 #!/usr/bin/env python3
 """
-데이터베이스 연결 테스트 스크립트
+데이터베이스 연결/지연 시간/실행 계획 진단
+- 연결 지연 시간: TCP 연결, MySQL 핸드셰이크(인증 포함), 왕복(SELECT 1)을 N회 측정
+- app.py가 실행하는 조회별 p50/p95/p99 지연 시간과 EXPLAIN (전체 스캔, 사용 가능한 인덱스 없음 표시)
+- 기대 스키마(database_setup.sql + migrations/) 대비 인덱스 누락/열 불일치
+- 테이블/인덱스 크기
+기준을 넘거나 문제가 있으면 종료 코드 1 (배포 전 점검용), 연결 자체가 안 되면 2
+사용법: python test_connection.py [--samples 20] [--format text|json] [--output report.json]
 Python 3.8-3.9 호환
 """
 
-import pymysql
+import argparse
+import json
+import socket
 import sys
-import os
-import toml
-
-def test_mysql_connection():
-    """MySQL 연결 테스트"""
-    
-    # .streamlit/secrets.toml 파일에서 설정 읽기
-    secrets_file = ".streamlit/secrets.toml"
-    
-    if not os.path.exists(secrets_file):
-        print(f"❌ secrets 파일 없음: {secrets_file}")
-        return False
-    
-    try:
-        with open(secrets_file, 'r', encoding='utf-8') as f:
-            secrets = toml.load(f)
-        
-        db_config = {
-            'host': secrets['db']['host'],
-            'port': int(secrets['db']['port']),
-            'user': secrets['db']['user'],
-            'password': secrets['db']['password'],
-            'database': secrets['db']['database'],
-            'charset': 'utf8mb4'
-        }
-    except Exception as e:
-        print(f"❌ secrets 파일 읽기 오류: {e}")
-        return False
-    
-    print("🔍 데이터베이스 연결 테스트 시작...")
-    print(f"호스트: {db_config['host']}")
-    print(f"포트: {db_config['port']}")
-    print(f"사용자: {db_config['user']}")
-    print(f"데이터베이스: {db_config['database']}")
-    print("-" * 50)
-    
+import time
+from datetime import date, datetime, timedelta
+
+import pymysql
+
+from budget import ALL_MONTHS
+from db import SECRETS_FILE, load_db_config, month_range
+from ledger_export import build_export_query
+from search import search_terms
+from storage import (
+    BALANCE_AS_OF_SQL, BALANCE_SERIES_SQL, BUDGETS_SQL, DAILY_EXPENSE_TOTALS_SQL, DUPLICATE_SQL,
+    EXPENSE_TOTALS_SQL, MONTH_BUDGETS_SQL, MONTH_EXPENSE_SQL, MONTHLY_DATA_SQL, MONTHLY_STATS_SQL, MONTHLY_TOTALS_SQL,
+    TRANSACTIONS_SQL, TREND_START, build_hash_lookup, build_mysql_search_query, build_page_query
+)
+
+# 기대 인덱스: {테이블: {인덱스 이름: [열 순서]}} (database_setup.sql + migrations/001~008)
+# InnoDB 보조 인덱스에 자동으로 붙는 기본 키 열은 적지 않음
+EXPECTED_INDEXES = {
+    'transactions': {
+        'PRIMARY': ['id', 'transaction_date'],
+        'unique_transaction': ['content_hash', 'transaction_date'],
+        'idx_date_type_category_amount': ['transaction_date', 'transaction_type', 'category', 'amount'],
+        'idx_type_date_amount': ['transaction_type', 'transaction_date', 'amount'],
+        'idx_date_created': ['transaction_date', 'created_at'],
+        'idx_type_date_created': ['transaction_type', 'transaction_date', 'created_at'],
+        'idx_category_date_created': ['category', 'transaction_date', 'created_at'],
+    },
+    'transaction_search': {
+        'PRIMARY': ['transaction_id'],
+        'ft_description': ['description'],
+    },
+    'categories': {
+        'PRIMARY': ['id'],
+        'name': ['name'],
+    },
+    'monthly_summary': {
+        'PRIMARY': ['month_start', 'transaction_type', 'category'],
+    },
+    'daily_balance': {
+        'PRIMARY': ['balance_date'],
+    },
+    'monthly_balance': {
+        'PRIMARY': ['month_start'],
+    },
+    'budgets': {
+        'PRIMARY': ['budget_month', 'category'],
+    },
+    'archived_years': {
+        'PRIMARY': ['fiscal_year'],
+    },
+}
+
+# EXPLAIN에서 표시만 하고 실패로 보지 않는 Extra 항목
+PLAN_WARNINGS = {
+    'Using filesort': "정렬(filesort)",
+    'Using temporary': "임시 테이블",
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_stats(timings):
+    """밀리초 측정값 목록의 p50/p95/p99/최대"""
+    return {
+        'n': len(timings),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def measure_connect(config, samples, timeout=10):
+    """TCP 연결, 핸드셰이크(연결 전체 - TCP), 연결 후 왕복(SELECT 1) 지연 시간
+
+    매 회 새 TCP 소켓과 새 MySQL 연결을 만든다 (연결 풀을 쓰지 않는 첫 화면/재연결 비용).
+    """
+    tcp, connect, handshake, round_trip = [], [], [], []
+    for _ in range(samples):
+        start = time.perf_counter()
+        with socket.create_connection((config['host'], config['port']), timeout=timeout):
+            tcp_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        connection = pymysql.connect(connect_timeout=timeout, **config)
+        connect_ms = (time.perf_counter() - start) * 1000
+        try:
+            with connection.cursor() as cursor:
+                start = time.perf_counter()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                round_trip.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+        tcp.append(tcp_ms)
+        connect.append(connect_ms)
+        handshake.append(max(connect_ms - tcp_ms, 0.0))
+    return {
+        'tcp': latency_stats(tcp),
+        'connect': latency_stats(connect),
+        'handshake': latency_stats(handshake),
+        'round_trip': latency_stats(round_trip),
+    }
+
+
+def app_queries(cursor):
+    """app.py(storage.py)가 실행하는 조회 목록 [(이름, SQL, 파라미터, 전체 스캔을 허용하는 테이블)]
+
+    파라미터는 실제 데이터에서 고른 값(가장 최근 거래의 월/카테고리/해시/설명)을 쓴다.
+    """
+    cursor.execute("""
+        SELECT transaction_date, category, description, content_hash
+        FROM transactions ORDER BY id DESC LIMIT 100
+    """)
+    recent = cursor.fetchall()
+    latest = recent[0] if recent else {}
+    today = date.today()
+    month_start, next_month_start = month_range((latest.get('transaction_date') or today).strftime('%Y-%m'))
+    category = latest.get('category') or '식비'
+    hashes = [row['content_hash'] for row in recent] or ['0' * 64]
+    words = [word for word in (latest.get('description') or '').split() if search_terms(word)]
+    terms = search_terms(words[0] if words else '회식')
+
+    queries = [
+        ("최근 거래", TRANSACTIONS_SQL, (100,), set()),
+        ("거래 목록 첫 페이지", *build_page_query(None, None, None, None, 50, None, 'next'), set()),
+        ("거래 목록 (유형 필터)", *build_page_query('지출', None, None, None, 50, None, 'next'), set()),
+        ("거래 목록 (카테고리 필터)", *build_page_query(None, category, None, None, 50, None, 'next'), set()),
+        ("카테고리 목록", "SELECT name FROM categories WHERE type = %s ORDER BY name", ('지출',), {'categories'}),
+        ("월별 일자별 합계", MONTHLY_DATA_SQL, (month_start, next_month_start), set()),
+        ("월별 통계", MONTHLY_STATS_SQL, (month_start, next_month_start, month_start), set()),
+        ("설명 검색",
+         *build_mysql_search_query(terms, None, None, None, None, 'relevance', 50, 0), set()),
+        ("중복 확인", DUPLICATE_SQL, (hashes[0], latest.get('transaction_date') or today), set()),
+        ("가져오기 해시 조회", *build_hash_lookup(hashes), set()),
+        ("잔고 조회", BALANCE_AS_OF_SQL, (today.replace(day=1), today.replace(day=1), today), set()),
+        ("잔고 추이 (1년)", BALANCE_SERIES_SQL, (today - timedelta(days=365), today), set()),
+        # 추이 분석: 지난 달 전체는 요약 테이블을 모두 읽고(오래 캐시) 이번 달만 자주 다시 조회
+        ("추이 지난 달 합계", MONTHLY_TOTALS_SQL, (TREND_START, today.replace(day=1)), {'monthly_summary'}),
+        ("추이 이번 달 합계", MONTHLY_TOTALS_SQL, month_range(today.strftime('%Y-%m')), set()),
+        ("예산 한도", BUDGETS_SQL, (), {'budgets'}),
+        ("예산 누계 적재", EXPENSE_TOTALS_SQL, (), {'monthly_summary'}),
+        ("예산 누계 확인 (관리 화면)", DAILY_EXPENSE_TOTALS_SQL, (), {'transactions'}),
+        # 저장 트랜잭션의 한도 확인 (실제 저장은 FOR UPDATE를 붙이지만 진단은 잠그지 않고 같은 실행 계획만 확인)
+        ("저장 전 그 달 지출", MONTH_EXPENSE_SQL, (month_start,), set()),
+        ("저장 전 그 달 예산 한도", MONTH_BUDGETS_SQL, (ALL_MONTHS, month_start.strftime('%Y-%m')), {'budgets'}),
+        ("내보내기 (1년)", *build_export_query(start_date=today - timedelta(days=365), end_date=today), set()),
+    ]
+    return queries
+
+
+def plan_findings(plan, scan_ok):
+    """EXPLAIN 행 목록에서 (문제 목록, 경고 목록)"""
+    problems, warnings = [], []
+    for row in plan:
+        table = row.get('table')
+        if not table or table.startswith('<'):
+            # 테이블 없는 조회 또는 파생/합집합 임시 결과
+            continue
+        if row['type'] == 'ALL' and table not in scan_ok:
+            reason = "사용 가능한 인덱스 없음" if not row.get('possible_keys') else "인덱스를 쓰지 않음"
+            problems.append(f"{table}: 전체 스캔 (약 {row.get('rows') or 0:,}행, {reason})")
+        elif row['type'] == 'index' and table not in scan_ok:
+            warnings.append(f"{table}: 인덱스 전체 스캔 ({row['key']})")
+        extra = row.get('Extra') or ''
+        for marker, label in PLAN_WARNINGS.items():
+            if marker in extra:
+                warnings.append(f"{table}: {label}")
+    return problems, warnings
+
+
+def measure_queries(connection, samples, max_p95_ms):
+    """조회별 지연 시간과 실행 계획"""
+    results = []
+    with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        queries = app_queries(cursor)
+        for name, sql, params, scan_ok in queries:
+            result = {'name': name}
+            try:
+                cursor.execute("EXPLAIN " + sql, params)
+                plan = cursor.fetchall()
+                timings = []
+                for _ in range(samples):
+                    start = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append((time.perf_counter() - start) * 1000)
+            except pymysql.Error as e:
+                result.update(error=str(e), problems=[f"실행 오류: {e}"], warnings=[])
+                results.append(result)
+                continue
+
+            problems, warnings = plan_findings(plan, scan_ok)
+            result.update(latency_stats(timings))
+            if result['p95_ms'] > max_p95_ms:
+                problems.append(f"p95 {result['p95_ms']:.1f}ms > 기준 {max_p95_ms}ms")
+            result['plan'] = [
+                {key: row.get(key) for key in ('table', 'partitions', 'type', 'possible_keys', 'key', 'rows', 'Extra')}
+                for row in plan
+            ]
+            result.update(problems=problems, warnings=warnings)
+            results.append(result)
+    return results
+
+
+def check_indexes(connection):
+    """기대 인덱스 대비 누락/열 불일치 (문제 목록, 기대에 없는 인덱스 목록)"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """)
+        actual = {}
+        for table, index, column in cursor.fetchall():
+            actual.setdefault(table, {}).setdefault(index, []).append(column)
+
+    problems = []
+    for table, indexes in EXPECTED_INDEXES.items():
+        if table not in actual:
+            problems.append(f"{table}: 테이블 없음 (python manage.py migrate)")
+            continue
+        for index, columns in indexes.items():
+            found = actual[table].get(index)
+            if found is None:
+                problems.append(f"{table}.{index}: 인덱스 없음 ({', '.join(columns)})")
+            elif found != columns:
+                problems.append(f"{table}.{index}: 열 불일치 (기대 {', '.join(columns)} / 실제 {', '.join(found)})")
+    extra = [
+        f"{table}.{index} ({', '.join(columns)})"
+        for table, indexes in sorted(actual.items()) if table in EXPECTED_INDEXES
+        for index, columns in indexes.items() if index not in EXPECTED_INDEXES[table]
+    ]
+    return problems, extra
+
+
+def table_sizes(connection):
+    """테이블별 행 수(추정)/데이터/인덱스 크기와 인덱스별 크기 (innodb_index_stats 권한이 없으면 None)"""
+    with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("""
+            SELECT TABLE_NAME as name, TABLE_ROWS as approx_rows,
+                   DATA_LENGTH as data_bytes, INDEX_LENGTH as index_bytes
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY DATA_LENGTH + INDEX_LENGTH DESC
+        """)
+        tables = cursor.fetchall()
+        try:
+            cursor.execute("""
+                SELECT table_name, index_name, stat_value * @@innodb_page_size as bytes
+                FROM mysql.innodb_index_stats
+                WHERE database_name = DATABASE() AND stat_name = 'size'
+                ORDER BY bytes DESC
+            """)
+            indexes = [
+                {'table': row['table_name'], 'index': row['index_name'], 'bytes': int(row['bytes'])}
+                for row in cursor.fetchall()
+            ]
+        except pymysql.Error:
+            indexes = None
+    return {
+        'tables': [{key: int(value or 0) if key != 'name' else value for key, value in row.items()} for row in tables],
+        'indexes': indexes,
+    }
+
+
+def run_diagnostics(config, samples, max_connect_ms, max_p95_ms):
+    """진단 보고서 dict (failures가 비어 있지 않으면 기준 초과)"""
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'target': f"{config['host']}:{config['port']}/{config['database']}",
+        'samples': samples,
+        'thresholds': {'max_connect_p95_ms': max_connect_ms, 'max_query_p95_ms': max_p95_ms},
+        'failures': [],
+    }
+    report['connect'] = measure_connect(config, samples)
+    if report['connect']['connect']['p95_ms'] > max_connect_ms:
+        report['failures'].append(
+            f"연결 p95 {report['connect']['connect']['p95_ms']:.1f}ms > 기준 {max_connect_ms}ms"
+        )
+
+    connection = pymysql.connect(**config)
     try:
-        # 연결 시도
-        connection = pymysql.connect(**db_config)
-        print("✅ 데이터베이스 연결 성공!")
-        
-        # 테이블 존재 확인
-        with connection.cursor() as cursor:
-            cursor.execute("SHOW TABLES")
-            tables = cursor.fetchall()
-            
-            print(f"📋 발견된 테이블: {len(tables)}개")
-            for table in tables:
-                print(f"  - {table[0]}")
-            
-            # transactions 테이블 데이터 확인
-            if tables:
-                cursor.execute("SELECT COUNT(*) as count FROM transactions")
-                result = cursor.fetchone()
-                print(f"📊 거래 내역 수: {result[0]}건")
-                
-                # 최근 거래 3건 조회
-                cursor.execute("""
-                    SELECT transaction_date, transaction_type, amount, category, description 
-                    FROM transactions 
-                    ORDER BY created_at DESC 
-                    LIMIT 3
-                """)
-                recent_transactions = cursor.fetchall()
-                
-                if recent_transactions:
-                    print("📈 최근 거래 내역:")
-                    for tx in recent_transactions:
-                        print(f"  - {tx[0]}: {tx[1]} {tx[2]:,}원 ({tx[3]}) - {tx[4]}")
-                else:
-                    print("📈 거래 내역이 없습니다.")
-        
+        report['queries'] = measure_queries(connection, samples, max_p95_ms)
+        report['index_problems'], report['extra_indexes'] = check_indexes(connection)
+        report['sizes'] = table_sizes(connection)
+    finally:
         connection.close()
-        print("✅ 테스트 완료!")
-        return True
-        
-    except pymysql.Error as e:
-        print(f"❌ MySQL 오류: {e}")
-        return False
+
+    report['failures'] += [
+        f"조회 '{result['name']}': {problem}" for result in report['queries'] for problem in result['problems']
+    ]
+    report['failures'] += [f"인덱스 {problem}" for problem in report['index_problems']]
+    return report
+
+
+def _size(nbytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if nbytes < 1024 or unit == 'GB':
+            return f"{nbytes:,.0f}{unit}" if unit == 'B' else f"{nbytes:,.1f}{unit}"
+        nbytes /= 1024
+
+
+def format_text(report):
+    """사람이 읽는 보고서 줄 목록"""
+    lines = [
+        "🚀 동아리 회계 관리 시스템 - DB 진단",
+        f"대상: {report['target']} (측정 {report['samples']}회, {report['generated_at']})",
+        "",
+        "🔌 연결 지연 시간 (ms)",
+    ]
+    labels = {'tcp': "TCP 연결", 'handshake': "핸드셰이크", 'connect': "연결 전체", 'round_trip': "왕복(SELECT 1)"}
+    for key, label in labels.items():
+        stats = report['connect'][key]
+        lines.append(f"  {label:<14} p50 {stats['p50_ms']:>8.2f}  p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f}")
+
+    lines += ["", "⏱️ 조회별 지연 시간 (ms)과 실행 계획"]
+    for result in report['queries']:
+        mark = "❌" if result['problems'] else ("⚠️" if result['warnings'] else "✅")
+        if 'error' in result:
+            lines.append(f"  {mark} {result['name']}: {result['error']}")
+            continue
+        keys = ', '.join(sorted({row['key'] for row in result['plan'] if row['key']})) or '-'
+        # 파티션 테이블은 EXPLAIN이 읽는 파티션을 보여줌 (월 구간 조회는 한 연도 파티션이어야 함)
+        partitions = '; '.join(
+            f"{row['table']} {row['partitions']}" for row in result['plan'] if row.get('partitions')
+        )
+        lines.append(
+            f"  {mark} {result['name']}: p50 {result['p50_ms']:.2f}  p95 {result['p95_ms']:.2f}  "
+            f"p99 {result['p99_ms']:.2f}  (인덱스: {keys}{', 파티션: ' + partitions if partitions else ''})"
+        )
+        for message in result['problems'] + result['warnings']:
+            lines.append(f"      - {message}")
+
+    lines += ["", "🗂️ 인덱스 (기대 스키마 대비)"]
+    if report['index_problems']:
+        lines += [f"  ❌ {problem}" for problem in report['index_problems']]
+    else:
+        lines.append("  ✅ 기대 인덱스가 모두 있습니다.")
+    lines += [f"  ℹ️ 기대 목록에 없는 인덱스: {index}" for index in report['extra_indexes']]
+
+    lines += ["", "💾 테이블 크기 (행 수는 통계 추정치)"]
+    for table in report['sizes']['tables']:
+        lines.append(
+            f"  {table['name']:<20} 약 {table['approx_rows']:>12,}행  "
+            f"데이터 {_size(table['data_bytes']):>10}  인덱스 {_size(table['index_bytes']):>10}"
+        )
+    if report['sizes']['indexes'] is None:
+        lines.append("  (인덱스별 크기는 mysql.innodb_index_stats 조회 권한이 필요합니다)")
+    else:
+        lines.append("  인덱스별:")
+        lines += [
+            f"    {index['table']}.{index['index']:<32} {_size(index['bytes']):>10}"
+            for index in report['sizes']['indexes']
+        ]
+
+    lines.append("")
+    if report['failures']:
+        lines.append(f"❌ 기준 초과/문제 {len(report['failures'])}건")
+        lines += [f"  - {failure}" for failure in report['failures']]
+    else:
+        lines.append("🎉 모든 진단을 통과했습니다.")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DB 연결 지연 시간/조회 실행 계획/인덱스 진단")
+    parser.add_argument('--secrets', default=SECRETS_FILE, help="secrets.toml 경로")
+    parser.add_argument('--samples', type=int, default=20, help="연결/조회별 측정 횟수")
+    parser.add_argument('--format', choices=['text', 'json'], default='text')
+    parser.add_argument('--output', help="보고서 파일 (기본: 표준 출력)")
+    parser.add_argument('--max-connect-ms', type=float, default=1000, help="연결 전체 p95 기준 (ms)")
+    parser.add_argument('--max-query-p95-ms', type=float, default=200, help="조회별 p95 기준 (ms)")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_db_config(args.secrets)
     except Exception as e:
-        print(f"❌ 일반 오류: {e}")
-        return False
-
-def test_streamlit_secrets():
-    """Streamlit secrets 파일 테스트"""
-    print("\n🔍 Streamlit secrets 파일 테스트...")
-    
-    secrets_file = ".streamlit/secrets.toml"
-    
-    if os.path.exists(secrets_file):
-        print(f"✅ secrets 파일 발견: {secrets_file}")
-        
-        try:
-            with open(secrets_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                print("📄 파일 내용:")
-                print(content)
-        except Exception as e:
-            print(f"❌ 파일 읽기 오류: {e}")
+        print(f"❌ secrets 파일 읽기 오류 ({args.secrets}): {e}", file=sys.stderr)
+        return 2
+
+    try:
+        report = run_diagnostics(config, max(args.samples, 1), args.max_connect_ms, args.max_query_p95_ms)
+    except (OSError, pymysql.Error) as e:
+        print(f"❌ 데이터베이스에 연결할 수 없습니다 ({config['host']}:{config['port']}): {e}", file=sys.stderr)
+        print("💡 다음을 확인하세요:", file=sys.stderr)
+        print("  1. MySQL 서버가 실행 중인가?", file=sys.stderr)
+        print("  2. 데이터베이스 연결 정보가 올바른가?", file=sys.stderr)
+        print("  3. 방화벽이 3306 포트를 허용하는가?", file=sys.stderr)
+        print("  4. 사용자 권한이 올바른가?", file=sys.stderr)
+        return 2
+
+    if args.format == 'json':
+        output = json.dumps(report, ensure_ascii=False, indent=2, default=str)
     else:
-        print(f"❌ secrets 파일 없음: {secrets_file}")
-        print("💡 .streamlit/secrets.toml 파일을 생성하고 데이터베이스 정보를 입력하세요.")
-
-def main():
-    """메인 함수"""
-    print("🚀 동아리 회계 관리 시스템 - 연결 테스트")
-    print("=" * 60)
-    
-    # Streamlit secrets 테스트
-    test_streamlit_secrets()
-    
-    print("\n" + "=" * 60)
-    
-    # MySQL 연결 테스트
-    success = test_mysql_connection()
-    
-    print("\n" + "=" * 60)
-    
-    if success:
-        print("🎉 모든 테스트가 성공했습니다!")
-        print("💡 이제 'streamlit run app.py' 명령으로 앱을 실행할 수 있습니다.")
+        output = '\n'.join(format_text(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"✅ 보고서 저장: {args.output}", file=sys.stderr)
     else:
-        print("⚠️ 일부 테스트가 실패했습니다.")
-        print("💡 다음을 확인하세요:")
-        print("  1. MySQL 서버가 실행 중인가?")
-        print("  2. 데이터베이스 연결 정보가 올바른가?")
-        print("  3. 방화벽이 3306 포트를 허용하는가?")
-        print("  4. 사용자 권한이 올바른가?")
+        print(output)
+    return 1 if report['failures'] else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+pytest 공통 설정
+저장소 루트의 모듈을 import할 수 있게 하고, MySQL 연결 픽스처를 제공 (MySQL이 없으면 해당 테스트는 건너뜀)
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def mysql_connection():
+    """.streamlit/secrets.toml의 [db] 설정으로 연결한 MySQL (DictCursor)"""
+    import pymysql
+    from db import SECRETS_FILE, load_db_config
+
+    try:
+        config = load_db_config(os.path.join(ROOT, SECRETS_FILE))
+        connection = pymysql.connect(connect_timeout=5, cursorclass=pymysql.cursors.DictCursor, **config)
+    except (ImportError, OSError, KeyError, pymysql.err.OperationalError) as e:
+        pytest.skip(f"MySQL을 사용할 수 없음: {e}")
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def embedded_storage():
+    """빈 메모리 SQLite 저장소 (DuckDB 집계 스냅샷 없이, 테스트 스레드 하나에서만 사용)"""
+    from storage import EmbeddedStorage
+
+    storage = EmbeddedStorage(':memory:', analytics=False)
+    yield storage
+    storage.close()
@@ -0,0 +1,62 @@
+"""MySQL 저장소의 보관 경계: 지난해 월별 조회마다 DB를 다시 읽지 않고 boundary_ttl 동안 재사용"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from storage import ARCHIVE_BOUNDARY_SQL, MySQLStorage
+
+BOUNDARY = date(2020, 1, 1)
+
+
+class BoundaryPool:
+    """ARCHIVE_BOUNDARY_SQL에만 답하고 실행한 SQL을 기록하는 연결 풀 (MySQL 서버 없이)"""
+
+    def __init__(self):
+        self.executed = []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self, cursorclass=None):
+        yield self
+
+    def execute(self, sql, params=None):
+        assert sql == ARCHIVE_BOUNDARY_SQL
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return {'boundary': BOUNDARY}
+
+
+def test_archived_reuses_boundary_within_ttl():
+    pool = BoundaryPool()
+    storage = MySQLStorage(pool, boundary_ttl=300)
+
+    assert storage._archived('2019-05')
+    assert not storage._archived('2020-05')
+    assert storage._archived('2019-12')
+    assert len(pool.executed) == 1
+
+    # 올해는 보관할 수 없으므로 경계를 읽지 않음
+    assert not storage._archived(date.today().strftime('%Y-%m'))
+    assert len(pool.executed) == 1
+
+
+def test_boundary_is_read_again_after_ttl():
+    pool = BoundaryPool()
+    storage = MySQLStorage(pool, boundary_ttl=0)
+
+    storage._archived('2019-05')
+    storage._archived('2019-06')
+    assert len(pool.executed) == 2
+
+
+def test_archive_boundary_always_reads_database():
+    pool = BoundaryPool()
+    storage = MySQLStorage(pool, boundary_ttl=300)
+
+    storage._archived('2019-05')
+    assert storage.archive_boundary() == BOUNDARY
+    assert len(pool.executed) == 2
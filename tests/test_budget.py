@@ -0,0 +1,84 @@
+"""예산 한도: 엔진의 사전 확인과 저장 트랜잭션 안의 DB 확인"""
+
+from datetime import date
+from decimal import Decimal
+
+from budget import DEFAULT_MONTHLY_LIMIT, TOTAL_CATEGORY, BudgetEngine
+from storage import EmbeddedStorage
+
+MAY = date(2024, 5, 10)
+
+
+def test_save_transaction_rejects_expense_over_monthly_limit(embedded_storage):
+    assert embedded_storage.save_transaction(MAY, '지출', 150000, '식비', "MT 장보기") == ('saved', [])
+
+    status, exceeded = embedded_storage.save_transaction(MAY, '지출', 60000, '교통비', "MT 버스")
+    assert status == 'over_limit'
+    assert [(budget.category, budget.limit, budget.spent) for budget in exceeded] == [
+        (TOTAL_CATEGORY, DEFAULT_MONTHLY_LIMIT, Decimal(210000))
+    ]
+    assert not embedded_storage.transaction_exists(MAY, '지출', 60000, '교통비', "MT 버스")
+
+    # 경고를 무시하고 저장하면 저장하되 넘는 예산을 함께 알려줌
+    status, exceeded = embedded_storage.save_transaction(MAY, '지출', 60000, '교통비', "MT 버스", allow_over_limit=True)
+    assert status == 'saved'
+    assert [budget.category for budget in exceeded] == [TOTAL_CATEGORY]
+
+
+def test_save_transaction_checks_category_and_month_budgets(embedded_storage):
+    embedded_storage.set_budget('2024-05', '식비', 50000)
+    embedded_storage.save_transaction(MAY, '지출', 40000, '식비', "간식")
+
+    status, exceeded = embedded_storage.save_transaction(MAY, '지출', 20000, '식비', "간식 2")
+    assert status == 'over_limit'
+    assert [(budget.label, budget.spent) for budget in exceeded] == [('식비', Decimal(60000))]
+
+    # 다른 달과 다른 카테고리에는 그 달 전용 한도가 적용되지 않음
+    assert embedded_storage.save_transaction(date(2024, 6, 1), '지출', 60000, '식비', "간식 3")[0] == 'saved'
+    assert embedded_storage.save_transaction(MAY, '지출', 20000, '교통비', "택시")[0] == 'saved'
+
+
+def test_income_is_never_limited(embedded_storage):
+    assert embedded_storage.save_transaction(MAY, '수입', 1000000, '회비', "학기 회비") == ('saved', [])
+
+
+def test_limit_is_enforced_against_writes_the_engine_has_not_seen(tmp_path):
+    path = str(tmp_path / 'ledger.db')
+    app_storage = EmbeddedStorage(path, analytics=False)
+    other_process = EmbeddedStorage(path, analytics=False)
+    try:
+        engine = BudgetEngine(app_storage)
+        assert engine.check(MAY, '지출', 20000, '식비') == []
+
+        # manage.py import 등 다른 프로세스의 저장은 다음 새로 읽기 전까지 엔진 누계에 없음
+        other_process.insert_ignore([(MAY, '지출', 190000, '식비', "다른 프로세스의 지출")])
+        assert engine.check(MAY, '지출', 20000, '식비') == []
+
+        status, exceeded = app_storage.save_transaction(MAY, '지출', 20000, '식비', "앱에서 입력")
+        assert status == 'over_limit'
+        assert exceeded[0].spent == Decimal(210000)
+
+        engine.reload()
+        assert [budget.category for budget in engine.check(MAY, '지출', 20000, '식비')] == [TOTAL_CATEGORY]
+    finally:
+        app_storage.close()
+        other_process.close()
+
+
+def test_record_after_unlocked_save_does_not_double_count_reload(embedded_storage):
+    engine = BudgetEngine(embedded_storage)
+    engine.reload()
+
+    # app.save_transaction: 엔진 잠금 밖에서 저장하고 저장 전 loads 값으로 반영
+    loads = engine.loads
+    embedded_storage.save_transaction(MAY, '지출', 30000, '식비', "점심")
+    engine.record(MAY, '지출', 30000, '식비', since=loads)
+    assert engine.spent('2024-05') == Decimal(30000)
+
+    loads = engine.loads
+    embedded_storage.save_transaction(MAY, '지출', 20000, '식비', "저녁")
+    # 저장 커밋 뒤 다른 세션이 누계를 다시 읽어 이미 이 거래가 들어 있음
+    engine.reload()
+    engine.record(MAY, '지출', 20000, '식비', since=loads)
+    assert engine.spent('2024-05') == Decimal(50000)
+    assert engine.verify() == []
@@ -0,0 +1,65 @@
+"""추이 차트 PNG 캐시: 같은 데이터/제목은 다시 그리지 않고, 값/날짜/열/제목이 바뀌면 새로 그림"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import charts
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 한글 글꼴이 없는 환경의 글리프 경고 (캐시 동작과 무관)
+pytestmark = pytest.mark.filterwarnings('ignore:Glyph .* missing from font')
+
+
+def trend_frame(days=5):
+    index = [date(2024, 5, 1) + timedelta(days=i) for i in range(days)]
+    return pd.DataFrame({'수입': [5000.0] * days, '지출': [1000.0] * days}, index=index)
+
+
+@pytest.fixture
+def draws(monkeypatch):
+    """빈 PNG 캐시에서 draw_trend 호출 횟수를 기록"""
+    charts.png_cache.clear()
+    calls = []
+    draw = charts.draw_trend
+
+    def counting_draw(chart_data, title, **kwargs):
+        calls.append(title)
+        return draw(chart_data, title, **kwargs)
+
+    monkeypatch.setattr(charts, 'draw_trend', counting_draw)
+    yield calls
+    charts.png_cache.clear()
+
+
+def test_repeated_render_hits_cache(draws):
+    first = charts.render_trend_png(trend_frame(), "5월 추이")
+    # 재실행마다 새로 만들어지는 같은 내용의 DataFrame
+    second = charts.render_trend_png(trend_frame(), "5월 추이")
+
+    assert first.startswith(PNG_SIGNATURE)
+    assert second == first
+    assert draws == ["5월 추이"]
+    assert charts.png_cache.stats()['hits'] == 1
+
+
+@pytest.mark.parametrize('changed', [
+    trend_frame().assign(지출=[1000.0] * 4 + [2500.0]),
+    trend_frame(days=6),
+    trend_frame().set_axis([date(2024, 6, 1) + timedelta(days=i) for i in range(5)]),
+    trend_frame().rename(columns={'수입': '잔고'}),
+], ids=['값', '행 수', '날짜', '열'])
+def test_changed_data_misses_cache(draws, changed):
+    original = charts.render_trend_png(trend_frame(), "5월 추이")
+
+    assert charts.render_trend_png(changed, "5월 추이") != original
+    assert len(draws) == 2
+
+
+def test_changed_title_misses_cache(draws):
+    charts.render_trend_png(trend_frame(), "5월 추이")
+    charts.render_trend_png(trend_frame(), "6월 추이")
+
+    assert draws == ["5월 추이", "6월 추이"]
@@ -0,0 +1,189 @@
+"""연결 풀: 대여 대기 시간 초과, 생존 확인/재연결, 유휴 정리, 반납 시 정리 (MySQL 서버 없이 가짜 연결로)"""
+
+import threading
+import time
+
+import pymysql
+import pytest
+
+from db import ConnectionPool
+from instrumentation import Recorder, activate, deactivate
+
+
+class FakeConnection:
+    """ConnectionPool이 쓰는 ping/rollback/close만 흉내 내는 연결"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.alive = True
+        self.rollback_fails = False
+        self.rollbacks = 0
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def rollback(self):
+        if self.rollback_fails:
+            raise pymysql.err.OperationalError(2013, "Lost connection")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeServer:
+    """연결 클래스 자리에 넘기는 호출 가능 객체 (만든 연결 기록, refuse=True면 연결 실패)"""
+
+    def __init__(self):
+        self.connections = []
+        self.refuse = False
+
+    def __call__(self, **kwargs):
+        if self.refuse:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server")
+        connection = FakeConnection(**kwargs)
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+def make_pool(server, **kwargs):
+    return ConnectionPool({'host': 'db.test'}, connection_class=server, **kwargs)
+
+
+def test_released_connection_is_rolled_back_and_reused(server):
+    pool = make_pool(server)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert first.kwargs == {'host': 'db.test'}
+    assert first.rollbacks == 1
+    assert pool.stats.snapshot()['connects'] == 1
+    assert pool.stats.snapshot()['checkouts'] == 2
+    assert pool.size() == (1, 0)
+
+
+def test_acquire_times_out_when_pool_is_full(server):
+    pool = make_pool(server, max_size=1, checkout_timeout=0.05)
+    held = pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_acquire_waits_for_release(server):
+    pool = make_pool(server, max_size=1, checkout_timeout=5)
+    held = pool.acquire()
+    timer = threading.Timer(0.05, pool.release, args=(held,))
+    timer.start()
+
+    try:
+        assert pool.acquire() is held
+    finally:
+        timer.join()
+    assert pool.stats.snapshot()['wait_max'] >= 0.04
+
+
+def test_dead_idle_connection_is_replaced(server):
+    pool = make_pool(server)
+    dead = pool.acquire()
+    pool.release(dead)
+    dead.alive = False
+
+    fresh = pool.acquire()
+
+    assert fresh is not dead
+    assert dead.closed
+    assert pool.stats.snapshot()['reconnects'] == 1
+    assert pool.size() == (1, 0)
+
+
+def test_idle_connections_past_timeout_are_evicted(server):
+    pool = make_pool(server, idle_timeout=0.01)
+    stale = pool.acquire()
+    pool.release(stale)
+    time.sleep(0.03)
+
+    fresh = pool.acquire()
+
+    assert fresh is not stale
+    assert stale.closed
+    assert pool.stats.snapshot()['evictions'] == 1
+    assert pool.stats.snapshot()['reconnects'] == 0
+
+
+def test_failed_rollback_discards_connection(server):
+    pool = make_pool(server)
+    broken = pool.acquire()
+    broken.rollback_fails = True
+
+    pool.release(broken)
+
+    assert broken.closed
+    assert pool.size() == (0, 0)
+
+
+def test_operational_error_inside_with_discards_connection(server):
+    pool = make_pool(server)
+
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection() as connection:
+            raise pymysql.err.OperationalError(2013, "Lost connection")
+
+    assert connection.closed
+    assert connection.rollbacks == 0
+    assert pool.size() == (0, 0)
+
+
+def test_failed_connect_frees_the_slot(server):
+    pool = make_pool(server, max_size=1, checkout_timeout=0.05)
+    server.refuse = True
+
+    with pytest.raises(pymysql.err.OperationalError):
+        pool.acquire()
+    assert pool.size() == (0, 0)
+
+    # 자리가 반환되지 않았다면 여기서 대기 시간 초과
+    server.refuse = False
+    assert pool.acquire() is server.connections[0]
+
+
+def test_failed_reconnect_frees_the_slot(server):
+    pool = make_pool(server, max_size=1, checkout_timeout=0.05)
+    dead = pool.acquire()
+    pool.release(dead)
+    dead.alive = False
+    server.refuse = True
+
+    with pytest.raises(pymysql.err.OperationalError):
+        pool.acquire()
+
+    assert dead.closed
+    assert pool.size() == (0, 0)
+
+
+def test_checkouts_are_recorded_for_the_current_run(server):
+    pool = make_pool(server)
+    recorder = Recorder(page="테스트")
+    token = activate(recorder)
+    try:
+        pool.release(pool.acquire())
+        pool.release(pool.acquire())
+    finally:
+        deactivate(token)
+
+    # app.show_pool_stats의 이번 실행 수치: 공유 풀 통계 대신 이 기록기의 이벤트
+    names = [name for kind, name, _, _, _ in recorder.events if kind == 'connect']
+    assert names == ['새 연결', '연결 대여', '연결 대여']
@@ -0,0 +1,95 @@
+"""거래 내용 해시: Python 정규화 규칙과 MySQL 저장 생성 열(migrations/005, 008)의 값이 같은지"""
+
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from content_hash import HASH_SEPARATOR, TRANSACTION_HASH_SQL, transaction_hash
+
+MAY = date(2024, 5, 10)
+
+# 정규화 규칙의 경계: 공백/제어 문자, NULL 설명, 반올림되는 금액, 한글/이모지
+TRICKY_ROWS = [
+    (MAY, '지출', Decimal('12000'), '식비', "간식"),
+    (MAY, '지출', Decimal('12000.50'), '식비', "  앞뒤 공백  "),
+    (MAY, '지출', Decimal('0.01'), '기타 지출', "탭\t과 줄바꿈\n"),
+    (MAY, '수입', Decimal('99999999.99'), '회비', None),
+    (MAY, '수입', Decimal('30000'), '회비', ""),
+    (MAY, '지출', Decimal('4500'), '식비', "☕ 커피 · 동아리방"),
+]
+
+
+def test_hash_is_sha256_of_normalized_fields():
+    expected = hashlib.sha256(
+        HASH_SEPARATOR.join(['2024-05-10', '지출', '12000.00', '식비', '간식']).encode('utf-8')
+    ).hexdigest()
+
+    assert transaction_hash(MAY, '지출', 12000, '식비', " 간식 ") == expected
+
+
+def test_dates_are_normalized_to_iso_day():
+    hashes = {transaction_hash(value, '지출', 1000, '식비', "택시") for value in
+              (MAY, datetime(2024, 5, 10, 18, 30), '2024-05-10')}
+    assert len(hashes) == 1
+
+
+def test_amounts_are_quantized_to_cents():
+    same = {transaction_hash(MAY, '지출', value, '식비', "택시") for value in
+            (1234.5, '1234.50', Decimal('1234.5'), Decimal('1234.500'))}
+    assert len(same) == 1
+    # DECIMAL(10, 2)처럼 소수 셋째 자리에서 반올림
+    assert transaction_hash(MAY, '지출', '1234.565', '식비', "택시") == transaction_hash(MAY, '지출', '1234.57', '식비', "택시")
+    assert transaction_hash(MAY, '지출', '1234.564', '식비', "택시") != transaction_hash(MAY, '지출', '1234.57', '식비', "택시")
+
+
+def test_description_strips_only_spaces_and_treats_none_as_empty():
+    assert transaction_hash(MAY, '지출', 1000, '식비', None) == transaction_hash(MAY, '지출', 1000, '식비', "")
+    assert transaction_hash(MAY, '지출', 1000, '식비', "  간식 ") == transaction_hash(MAY, '지출', 1000, '식비', "간식")
+    # MySQL TRIM은 공백만 지우므로 탭/줄바꿈은 내용으로 남음
+    assert transaction_hash(MAY, '지출', 1000, '식비', "간식\n") != transaction_hash(MAY, '지출', 1000, '식비', "간식")
+    assert transaction_hash(MAY, '지출', 1000, '식비', "\t간식") != transaction_hash(MAY, '지출', 1000, '식비', "간식")
+
+
+def test_separator_keeps_field_boundaries():
+    assert transaction_hash(MAY, '지출', 1000, '식비', "간식") != transaction_hash(MAY, '지출', 1000, '식비간', "식")
+
+
+def test_embedded_storage_stores_the_same_hash(embedded_storage):
+    embedded_storage.insert_ignore(TRICKY_ROWS)
+
+    hashes = [transaction_hash(*row) for row in TRICKY_ROWS]
+    assert embedded_storage.existing_hashes(hashes) == set(hashes)
+
+
+def test_mysql_hash_expression_matches_python(mysql_connection):
+    # migrations/005의 생성 열과 같은 식을 같은 열 타입으로 계산 (DB에 쓰지 않음)
+    sql = f"""
+    SELECT {TRANSACTION_HASH_SQL} as content_hash
+    FROM (SELECT CAST(%s AS DATE) as transaction_date, %s as transaction_type,
+                 CAST(%s AS DECIMAL(10, 2)) as amount, %s as category, %s as description) as transactions
+    """
+    with mysql_connection.cursor() as cursor:
+        for row in TRICKY_ROWS:
+            cursor.execute(sql, row)
+            assert cursor.fetchone()['content_hash'] == transaction_hash(*row), row
+
+
+def test_stored_content_hash_matches_python(mysql_connection):
+    with mysql_connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, transaction_date, transaction_type, amount, category, description, content_hash
+            FROM transactions ORDER BY id DESC LIMIT 500
+        """)
+        rows = cursor.fetchall()
+    if not rows:
+        pytest.skip("거래가 없음")
+
+    mismatched = [
+        row['id'] for row in rows
+        if row['content_hash'] != transaction_hash(
+            row['transaction_date'], row['transaction_type'], row['amount'], row['category'], row['description']
+        )
+    ]
+    assert mismatched == []
@@ -0,0 +1,199 @@
+"""임베디드(SQLite) 저장소: 중복 판정 키, 요약/잔고 트리거, 전문 검색, 키셋 페이지"""
+
+from datetime import date
+
+import pytest
+
+from content_hash import transaction_hash
+
+
+def execute(storage, sql, params=()):
+    """앱 밖의 수정/삭제 (트리거 동작 확인용)"""
+    with storage._transaction() as connection:
+        connection.execute(sql, params)
+
+
+def expense_totals(storage):
+    return {(row['month_start'], row['category']): row['total'] for row in storage.fetch_expense_totals()}
+
+
+# --- 중복 판정 키 (content_hash) ---
+
+def test_save_transaction_reports_duplicate_content(embedded_storage):
+    row = (date(2024, 5, 1), '지출', 12000, '식비', "정기 모임 간식")
+
+    assert embedded_storage.save_transaction(*row) == ('saved', [])
+    assert embedded_storage.save_transaction(*row) == ('duplicate', [])
+    assert embedded_storage.transaction_exists(*row)
+    assert embedded_storage.save_transaction(date(2024, 5, 1), '지출', 12000, '식비', "정기 모임 간식 2") == ('saved', [])
+
+
+def test_duplicate_key_compares_full_description(embedded_storage):
+    # 이전 키는 설명 앞 100자만 비교했음 (migrations/005)
+    prefix = "가" * 100
+    assert embedded_storage.save_transaction(date(2024, 5, 1), '지출', 1000, '식비', prefix + "A") == ('saved', [])
+    assert embedded_storage.save_transaction(date(2024, 5, 1), '지출', 1000, '식비', prefix + "B") == ('saved', [])
+
+
+def test_insert_ignore_skips_existing_and_repeated_rows(embedded_storage):
+    first = (date(2024, 5, 1), '수입', 30000, '회비', "송지민 회비")
+    second = (date(2024, 5, 2), '수입', 30000, '회비', "김하늘 회비")
+    embedded_storage.save_transaction(*first)
+
+    assert embedded_storage.insert_ignore([first, second, second]) == 1
+    assert embedded_storage.existing_hashes([transaction_hash(*first), transaction_hash(*second), '0' * 64]) == {
+        transaction_hash(*first), transaction_hash(*second)
+    }
+
+
+# --- 월/카테고리 요약 트리거 ---
+
+def test_summary_follows_insert_update_delete(embedded_storage):
+    may, june = date(2024, 5, 1), date(2024, 6, 1)
+    embedded_storage.insert_ignore([
+        (date(2024, 5, 3), '지출', 10000, '식비', "점심"),
+        (date(2024, 5, 20), '지출', 5000, '식비', "간식"),
+        (date(2024, 5, 21), '지출', 7000, '교통비', "택시"),
+    ])
+    assert expense_totals(embedded_storage) == {(may, '식비'): 15000, (may, '교통비'): 7000}
+
+    # 다른 달/카테고리로 옮기면 이전 행에서 빼고 새 행에 더함
+    execute(embedded_storage, "UPDATE transactions SET transaction_date = ?, category = ? WHERE description = ?",
+            ('2024-06-02', '교통비', "간식"))
+    assert expense_totals(embedded_storage) == {(may, '식비'): 10000, (may, '교통비'): 7000, (june, '교통비'): 5000}
+
+    execute(embedded_storage, "DELETE FROM transactions WHERE description = ?", ("점심",))
+    assert expense_totals(embedded_storage) == {(may, '교통비'): 7000, (june, '교통비'): 5000}
+
+
+def test_monthly_stats_categories_come_from_summary(embedded_storage):
+    embedded_storage.insert_ignore([
+        (date(2024, 5, 3), '수입', 50000, '회비', "회비"),
+        (date(2024, 5, 3), '지출', 10000, '식비', "점심"),
+        (date(2024, 5, 4), '지출', 2000, '식비', "간식"),
+    ])
+    rows = embedded_storage.fetch_monthly_stats('2024-05')
+
+    categories = {(row['transaction_type'], row['category']): row['total'] for row in rows if row['kind'] == 'category'}
+    days = {(row['transaction_date'], row['transaction_type']): row['total'] for row in rows if row['kind'] == 'day'}
+    assert categories == {('수입', '회비'): 50000, ('지출', '식비'): 12000}
+    assert days == {(date(2024, 5, 3), '수입'): 50000, (date(2024, 5, 3), '지출'): 10000,
+                    (date(2024, 5, 4), '지출'): 2000}
+
+
+# --- 누적 잔고 트리거 ---
+
+def test_balance_as_of_spans_months(embedded_storage):
+    embedded_storage.insert_ignore([
+        (date(2024, 4, 10), '수입', 100000, '회비', "4월 회비"),
+        (date(2024, 5, 3), '지출', 30000, '식비', "회식"),
+        (date(2024, 5, 20), '수입', 20000, '후원금', "동문 후원"),
+    ])
+
+    assert embedded_storage.balance_as_of(date(2024, 4, 9)) == 0
+    assert embedded_storage.balance_as_of(date(2024, 4, 30)) == 100000
+    assert embedded_storage.balance_as_of(date(2024, 5, 3)) == 70000
+    assert embedded_storage.balance_as_of(date(2024, 12, 31)) == 90000
+
+
+def test_backdated_and_removed_transactions_update_later_balances(embedded_storage):
+    embedded_storage.insert_ignore([
+        (date(2024, 5, 3), '수입', 50000, '회비', "회비"),
+        (date(2024, 6, 3), '지출', 10000, '식비', "점심"),
+    ])
+    # 이전 달에 소급 입력하면 이후 월말 잔고가 모두 바뀜
+    embedded_storage.save_transaction(date(2024, 4, 1), '지출', 5000, '식비', "소급 입력")
+    assert embedded_storage.balance_as_of(date(2024, 6, 30)) == 35000
+
+    execute(embedded_storage, "UPDATE transactions SET amount = ? WHERE description = ?", (20000, "점심"))
+    execute(embedded_storage, "DELETE FROM transactions WHERE description = ?", ("소급 입력",))
+    assert embedded_storage.balance_as_of(date(2024, 5, 31)) == 50000
+    assert embedded_storage.balance_as_of(date(2024, 6, 30)) == 30000
+
+    series = embedded_storage.fetch_balance_series(date(2024, 4, 1), date(2024, 6, 30))
+    assert [(row['balance_date'], row['balance']) for row in series if row['net_amount']] == [
+        (date(2024, 5, 3), 50000), (date(2024, 6, 3), 30000)
+    ]
+
+
+# --- 설명 전문 검색 (FTS5 n-gram) ---
+
+@pytest.fixture
+def searchable(embedded_storage):
+    embedded_storage.insert_ignore([
+        (date(2024, 3, 5), '지출', 45000, '식비', "개강 총회 회식"),
+        (date(2024, 4, 2), '지출', 12000, '식비', "스터디 점심"),
+        (date(2024, 4, 9), '지출', 80000, '행사비', "해커톤 대관료"),
+        (date(2024, 5, 1), '수입', 30000, '회비', "총회 회비 송지민"),
+    ])
+    return embedded_storage
+
+
+def descriptions(rows):
+    return [row['description'] for row in rows]
+
+
+def test_search_matches_partial_korean_words(searchable):
+    assert descriptions(searchable.search_transactions("회식")) == ["개강 총회 회식"]
+    # 단어 일부(2글자 n-gram)로도 찾음
+    assert descriptions(searchable.search_transactions("커톤")) == ["해커톤 대관료"]
+    assert searchable.search_transactions("없는말") == []
+
+
+def test_search_applies_filters_and_date_order(searchable):
+    rows = searchable.search_transactions("총회", order='date')
+    assert descriptions(rows) == ["총회 회비 송지민", "개강 총회 회식"]
+    assert all(row['score'] is not None for row in rows)
+
+    assert descriptions(searchable.search_transactions("총회", transaction_type='지출')) == ["개강 총회 회식"]
+    assert descriptions(searchable.search_transactions("총회", start_date=date(2024, 4, 1))) == ["총회 회비 송지민"]
+
+
+def test_search_index_follows_update_and_delete(searchable):
+    execute(searchable, "UPDATE transactions SET description = ? WHERE description = ?",
+            ("스터디 저녁", "스터디 점심"))
+    assert searchable.search_transactions("점심") == []
+    assert descriptions(searchable.search_transactions("저녁")) == ["스터디 저녁"]
+
+    execute(searchable, "DELETE FROM transactions WHERE description = ?", ("스터디 저녁",))
+    assert searchable.search_transactions("스터디") == []
+
+
+# --- 키셋 페이지 ---
+
+def page_key(row):
+    return row['transaction_date'], row['created_at'], row['id']
+
+
+def test_keyset_pages_cover_every_row_once(embedded_storage):
+    # 같은 날짜(그리고 같은 created_at)가 페이지 경계에 걸치도록 날짜를 겹침
+    embedded_storage.insert_ignore([
+        (date(2024, 5, 1 + i // 4), '지출', 1000 + i, '식비', f"거래 {i}") for i in range(23)
+    ])
+    expected = embedded_storage.fetch_transaction_page(None, None, None, None, 100, None, 'next')
+
+    pages, cursor = [], None
+    while True:
+        rows = embedded_storage.fetch_transaction_page(None, None, None, None, 5, cursor, 'next')
+        if not rows:
+            break
+        pages.append(rows)
+        cursor = page_key(rows[-1])
+
+    assert [len(rows) for rows in pages] == [5, 5, 5, 5, 3]
+    assert [row['id'] for rows in pages for row in rows] == [row['id'] for row in expected]
+
+    # 'prev'는 기준 행보다 최근 행을 오래된 순으로 반환 (앱에서 뒤집어 표시)
+    previous = embedded_storage.fetch_transaction_page(None, None, None, None, 5, page_key(pages[2][0]), 'prev')
+    assert [row['id'] for row in reversed(previous)] == [row['id'] for row in pages[1]]
+
+
+def test_keyset_pages_apply_filters(embedded_storage):
+    embedded_storage.insert_ignore([
+        (date(2024, 5, 1 + i), '지출' if i % 2 else '수입', 1000, '식비' if i % 2 else '회비', f"거래 {i}")
+        for i in range(10)
+    ])
+    rows = embedded_storage.fetch_transaction_page('지출', None, date(2024, 5, 3), date(2024, 5, 8), 10, None, 'next')
+
+    assert [row['transaction_date'] for row in rows] == [date(2024, 5, 8), date(2024, 5, 6), date(2024, 5, 4)]
+    assert {row['transaction_type'] for row in rows} == {'지출'}
@@ -0,0 +1,98 @@
+"""거래 내역 내보내기: 저장소에서 배치 단위로 스트리밍해 CSV/Parquet에 기록"""
+
+import io
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pyarrow.parquet as pq
+
+from ledger_export import EXPORT_COLUMNS, export_ledger, new_export_path, remove_stale_exports
+
+ROWS = 2500
+BATCH_SIZE = 1000
+
+
+def ledger_rows(count, start=date(2024, 1, 1)):
+    categories = [('회비', '수입'), ('식비', '지출'), ('교통비', '지출')]
+    rows = []
+    for i in range(count):
+        category, transaction_type = categories[i % len(categories)]
+        rows.append((start + timedelta(days=i % 365), transaction_type, (i % 50 + 1) * 1000, category, f"거래 {i}"))
+    return rows
+
+
+def test_stream_transactions_yields_fixed_size_batches(embedded_storage):
+    embedded_storage.insert_ignore(ledger_rows(ROWS))
+
+    batches = embedded_storage.stream_transactions(batch_size=BATCH_SIZE)
+    first = next(batches)
+    sizes = [len(first)] + [len(batch) for batch in batches]
+
+    assert sizes == [1000, 1000, 500]
+    assert len(first[0]) == len(EXPORT_COLUMNS)
+
+
+def test_stream_transactions_applies_filters_in_date_order(embedded_storage):
+    embedded_storage.insert_ignore(ledger_rows(ROWS))
+
+    rows = [row for batch in embedded_storage.stream_transactions(
+        batch_size=BATCH_SIZE, start_date=date(2024, 3, 1), end_date=date(2024, 3, 31), transaction_type='지출'
+    ) for row in batch]
+
+    dates = [row[1] for row in rows]
+    assert rows and dates == sorted(dates)
+    assert all(date(2024, 3, 1) <= day <= date(2024, 3, 31) for day in dates)
+    assert {row[2] for row in rows} == {'지출'}
+
+
+def test_export_csv_writes_every_row(embedded_storage):
+    embedded_storage.insert_ignore(ledger_rows(ROWS))
+    out = io.BytesIO()
+
+    count = export_ledger(embedded_storage, out, fmt='csv', batch_size=BATCH_SIZE)
+
+    lines = out.getvalue().decode('utf-8-sig').splitlines()
+    assert count == ROWS
+    assert lines[0].split(',') == EXPORT_COLUMNS
+    assert len(lines) == ROWS + 1
+
+
+def test_export_parquet_writes_one_row_group_per_batch(embedded_storage):
+    embedded_storage.insert_ignore(ledger_rows(ROWS))
+    out = io.BytesIO()
+
+    count = export_ledger(embedded_storage, out, fmt='parquet', batch_size=BATCH_SIZE)
+
+    parquet = pq.ParquetFile(io.BytesIO(out.getvalue()))
+    assert count == ROWS
+    assert parquet.metadata.num_rows == ROWS
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [1000, 1000, 500]
+
+
+def test_export_parquet_keeps_fractional_embedded_amounts(embedded_storage):
+    # CSV 가져오기는 '1,234.50' 같은 금액을 float로 넘기므로 SQLite에는 REAL로 저장됨
+    embedded_storage.save_transaction(date(2024, 5, 1), '지출', 10000.5, '식비', "소수 금액")
+    embedded_storage.save_transaction(date(2024, 5, 2), '지출', 1234.56, '식비', "소수 금액 2")
+    embedded_storage.save_transaction(date(2024, 5, 3), '수입', 20000, '회비', "정수 금액")
+    out = io.BytesIO()
+
+    count = export_ledger(embedded_storage, out, fmt='parquet')
+
+    amounts = pq.read_table(io.BytesIO(out.getvalue()), columns=['amount']).column('amount').to_pylist()
+    assert count == 3
+    assert amounts == [Decimal('10000.50'), Decimal('1234.56'), Decimal('20000.00')]
+
+
+def test_remove_stale_exports_keeps_recent_files(tmp_path):
+    directory = str(tmp_path / 'exports')
+    old = new_export_path(directory, 'csv')
+    recent = new_export_path(directory, 'parquet')
+    for path in (old, recent):
+        open(path, 'wb').close()
+    os.utime(old, (1000, 1000))
+    open(os.path.join(directory, 'README.txt'), 'w').close()
+
+    assert remove_stale_exports(directory, max_age=3600) == 1
+    assert sorted(os.listdir(directory)) == sorted(['README.txt', os.path.basename(recent)])
+    assert remove_stale_exports(str(tmp_path / 'missing'), max_age=3600) == 0
@@ -0,0 +1,24 @@
+"""내보내기 메모리: benchmarks/bench_export.py를 새 프로세스에서 실행해 저장소 스트리밍 경로의 최대 RSS 증가량 확인"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_EXPORT = os.path.join(ROOT, 'benchmarks', 'bench_export.py')
+
+# 배치가 작을수록 스트리밍과 전체 적재의 차이가 빨리 드러남 (1000행 × 40배치)
+ROWS = 40_000
+BATCH_SIZE = 1000
+MAX_GROWTH_MB = 10.0
+
+
+def test_export_rss_does_not_grow_with_rows():
+    result = subprocess.run(
+        [sys.executable, BENCH_EXPORT, '--rows', str(ROWS), '--batch-size', str(BATCH_SIZE),
+         '--max-growth-mb', str(MAX_GROWTH_MB)],
+        cwd=ROOT, capture_output=True, text=True, timeout=600
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert f"{ROWS:,}행" in result.stdout, result.stdout
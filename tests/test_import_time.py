@@ -0,0 +1,29 @@
+"""앱 시작 시간: benchmarks/bench_import.py를 새 프로세스에서 실행해 상한과 지연 import를 확인"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_IMPORT = os.path.join(ROOT, 'benchmarks', 'bench_import.py')
+
+# bench_import.py 기본값과 같은 상한 (Streamlit 자체 import 시간 제외)
+MAX_APP_MS = 150.0
+
+
+def test_app_import_within_budget(tmp_path):
+    pytest.importorskip('streamlit')
+    output = tmp_path / 'import.json'
+
+    result = subprocess.run(
+        [sys.executable, BENCH_IMPORT, '--runs', '3', '--max-ms', str(MAX_APP_MS), '--output', str(output)],
+        cwd=ROOT, capture_output=True, text=True, timeout=300
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+
+    assert report['heavy_modules'] == [], result.stderr
+    assert report['app_ms'] <= MAX_APP_MS, result.stderr
+    assert result.returncode == 0, result.stderr
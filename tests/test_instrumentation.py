@@ -0,0 +1,162 @@
+"""성능 계측: 기록기 요약, 계측 연결의 SQL 왕복 기록, 구조화 로그/Prometheus 텍스트 파일"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+
+import pymysql
+import pytest
+
+import instrumentation
+from instrumentation import (
+    InstrumentedConnection, Recorder, activate, configure_sinks, deactivate, emit, record, sinks_configured, span
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SQL = "SELECT *\n  FROM transactions\n  LIMIT 3"
+REPLY_SIZE = 120
+
+
+class ScriptedServer(pymysql.connections.Connection):
+    """소켓 없이 query마다 정해진 바이트를 주고받고 행 수를 돌려주는 연결 (InstrumentedConnection 아래에 끼움)"""
+
+    def __init__(self, affected_rows=3, reply_size=REPLY_SIZE):
+        super().__init__(defer_connect=True)
+        self.affected_rows = affected_rows
+        self.reply_size = reply_size
+
+    def _write_bytes(self, data):
+        pass
+
+    def _read_bytes(self, num_bytes):
+        return b'\0' * num_bytes
+
+    def query(self, sql, unbuffered=False):
+        self._write_bytes(sql.encode('utf-8') if isinstance(sql, str) else sql)
+        self._read_bytes(self.reply_size)
+        return self.affected_rows
+
+
+class ScriptedInstrumentedConnection(InstrumentedConnection, ScriptedServer):
+    pass
+
+
+@pytest.fixture
+def sinks(monkeypatch):
+    """모듈 전역 기록 설정/누계를 테스트마다 새로 (solux.perf 로거 핸들러는 끝나면 닫음)"""
+    monkeypatch.setattr(instrumentation, '_sinks', {'logger': None, 'prom_file': None})
+    monkeypatch.setattr(instrumentation, '_totals', defaultdict(float))
+    yield
+    logger = logging.getLogger('solux.perf')
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def recorded_rerun(page="대시보드"):
+    recorder = Recorder(page=page)
+    token = activate(recorder)
+    try:
+        connection = ScriptedInstrumentedConnection()
+        connection.query(SQL)
+        record('connect', '연결 대여', 0.002)
+        with span('frame', '거래 내역 DataFrame'):
+            pass
+    finally:
+        deactivate(token)
+    return recorder
+
+
+def test_instrumented_connection_records_round_trip():
+    recorder = recorded_rerun()
+
+    [(kind, name, seconds, rows, nbytes)] = [event for event in recorder.events if event[0] == 'sql']
+    assert (kind, name, rows) == ('sql', "SELECT * FROM transactions LIMIT 3", 3)
+    assert nbytes == len(SQL) + REPLY_SIZE
+    assert seconds >= 0
+
+
+def test_nothing_is_recorded_without_active_recorder():
+    connection = ScriptedInstrumentedConnection()
+    assert connection.query("SELECT 1") == 3
+    record('connect', '연결 대여', 0.1)
+    with span('render', '차트'):
+        pass
+    assert instrumentation.current_recorder() is None
+
+
+def test_summary_groups_events_by_kind():
+    summary = recorded_rerun().summary()
+
+    assert summary['page'] == "대시보드"
+    assert summary['round_trips'] == 1
+    assert summary['by_kind']['connect']['count'] == 1
+    assert summary['by_kind']['frame']['count'] == 1
+    assert summary['by_kind']['sql']['rows'] == 3
+    assert summary['by_kind']['render']['count'] == 0
+
+
+def test_log_sink_writes_one_json_line_per_rerun_and_rotates(sinks, tmp_path):
+    log_file = tmp_path / 'perf.log'
+    configure_sinks(log_file=str(log_file), max_bytes=600, backup_count=2)
+    assert sinks_configured()
+
+    for _ in range(4):
+        emit(recorded_rerun())
+
+    lines = log_file.read_text(encoding='utf-8').splitlines()
+    entry = json.loads(lines[-1])
+    assert entry['page'] == "대시보드"
+    assert entry['round_trips'] == 1
+    [sql] = entry['sql']
+    assert (sql['sql'], sql['rows'], sql['bytes']) == ("SELECT * FROM transactions LIMIT 3", 3, len(SQL) + REPLY_SIZE)
+    assert set(entry['by_kind']) == {'connect', 'sql', 'frame'}
+    # 한 줄이 max_bytes의 절반을 넘으므로 이전 기록은 perf.log.1, perf.log.2로 밀려남
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['perf.log', 'perf.log.1', 'perf.log.2']
+
+
+def test_prometheus_textfile_accumulates_counters(sinks, tmp_path):
+    prom_file = tmp_path / 'solux.prom'
+    configure_sinks(prom_file=str(prom_file))
+
+    emit(recorded_rerun("대시보드"))
+    emit(recorded_rerun("대시보드"))
+    emit(recorded_rerun("거래 목록"))
+
+    lines = prom_file.read_text(encoding='utf-8').splitlines()
+    assert '# TYPE solux_reruns_total counter' in lines
+    assert 'solux_reruns_total{page="대시보드"} 2' in lines
+    assert 'solux_reruns_total{page="거래 목록"} 1' in lines
+    assert 'solux_events_total{page="대시보드",kind="sql"} 2' in lines
+    assert 'solux_rows_total{page="대시보드",kind="sql"} 6' in lines
+    # 임시 파일로 쓴 뒤 교체하므로 남는 파일이 없음
+    assert [path.name for path in tmp_path.iterdir()] == ['solux.prom']
+
+
+@pytest.fixture
+def instrumented_mysql():
+    from db import SECRETS_FILE, load_db_config
+
+    try:
+        config = load_db_config(os.path.join(ROOT, SECRETS_FILE))
+        connection = InstrumentedConnection(connect_timeout=5, **config)
+    except (ImportError, OSError, KeyError, pymysql.err.OperationalError) as e:
+        pytest.skip(f"MySQL을 사용할 수 없음: {e}")
+    yield connection
+    connection.close()
+
+
+def test_instrumented_mysql_connection_counts_rows_and_bytes(instrumented_mysql):
+    recorder = Recorder()
+    token = activate(recorder)
+    try:
+        with instrumented_mysql.cursor() as cursor:
+            cursor.execute("SELECT 1 UNION ALL SELECT 2")
+    finally:
+        deactivate(token)
+
+    [(kind, name, _, rows, nbytes)] = recorder.events
+    assert (kind, name, rows) == ('sql', "SELECT 1 UNION ALL SELECT 2", 2)
+    assert nbytes > 0
@@ -0,0 +1,108 @@
+"""일괄 가져오기: 청크 검증과 중복/건너뜀/거부 집계"""
+
+import io
+from datetime import date
+
+import pandas as pd
+
+from ledger_import import import_csv, normalize_chunk
+from storage import EmbeddedStorage
+
+CATEGORIES = {'회비': '수입', '기타 수입': '수입', '식비': '지출', '기타 지출': '지출'}
+
+BANK_MAPPING = {'date': '거래일자', 'deposit': '입금액', 'withdrawal': '출금액', 'description': '적요'}
+LEDGER_MAPPING = {'date': '날짜', 'type': '유형', 'amount': '금액', 'category': '카테고리', 'description': '설명'}
+
+
+def chunk(text):
+    return pd.read_csv(io.StringIO(text), dtype=str, skipinitialspace=True)
+
+
+def test_normalize_bank_columns_with_default_categories():
+    valid, rejected = normalize_chunk(chunk(
+        "거래일자,입금액,출금액,적요\n"
+        "2024-03-02,\"30,000원\",,3월 회비\n"
+        "2024-03-05,,12000, 간식 \n"
+        "2024-13-01,,5000,날짜 오류\n"
+        "2024-03-06,,,금액 없음\n"
+    ), BANK_MAPPING, CATEGORIES)
+
+    assert list(valid.itertuples(index=False, name=None)) == [
+        (date(2024, 3, 2), '수입', 30000, '기타 수입', "3월 회비"),
+        (date(2024, 3, 5), '지출', 12000, '기타 지출', "간식"),
+    ]
+    # 헤더가 1번 줄
+    assert rejected == [(4, "날짜 형식 오류"), (5, "금액 오류")]
+
+
+def test_normalize_reports_first_failed_rule_per_row():
+    valid, rejected = normalize_chunk(chunk(
+        "날짜,유형,금액,카테고리,설명\n"
+        "2024-03-02,지출,-8000,식비,환불 아님\n"
+        "2024-03-02,기타,8000,식비,유형 오류\n"
+        "2024-03-02,지출,8000,회비,유형 불일치\n"
+        "2024-03-02,지출,8000,없는 카테고리,미등록\n"
+        "2024-03-02,지출,8000,식비,\n"
+    ), LEDGER_MAPPING, CATEGORIES)
+
+    # 금액 부호는 유형 열이 정하므로 절댓값으로 저장
+    assert valid['amount'].tolist() == [8000]
+    assert rejected == [
+        (3, "거래 유형 오류"), (4, "카테고리 유형 불일치"), (5, "등록되지 않은 카테고리"), (6, "설명 없음")
+    ]
+
+
+LEDGER_CSV = (
+    "날짜,유형,금액,카테고리,설명\n"
+    "2024-03-02,수입,30000,회비,3월 회비\n"
+    "2024-03-05,지출,12000,식비,간식\n"
+    "2024-03-05,지출,12000,식비,간식\n"
+    "2023-11-20,지출,50000,식비,보관된 해 회식\n"
+    "2024-03-07,지출,abc,식비,금액 오류\n"
+)
+
+
+def run_import(storage, **kwargs):
+    return list(import_csv(storage, io.StringIO(LEDGER_CSV), LEDGER_MAPPING, **kwargs))
+
+
+def test_import_counts_existing_and_in_chunk_duplicates(embedded_storage):
+    embedded_storage.insert_ignore([(date(2024, 3, 2), '수입', 30000, '회비', "3월 회비")])
+
+    [report] = run_import(embedded_storage)
+
+    assert {key: report[key] for key in ('rows', 'inserted', 'duplicates', 'skipped', 'rejected')} == {
+        'rows': 5, 'inserted': 2, 'duplicates': 2, 'skipped': 0, 'rejected': 1
+    }
+    assert report['errors'] == [(6, "금액 오류")]
+
+    # 다시 가져오면 모두 중복
+    [again] = run_import(embedded_storage)
+    assert (again['inserted'], again['duplicates'], again['skipped']) == (0, 4, 0)
+
+
+def test_dry_run_counts_without_saving(embedded_storage):
+    [report] = run_import(embedded_storage, dry_run=True)
+
+    assert (report['inserted'], report['duplicates'], report['skipped']) == (0, 1, 0)
+    assert not embedded_storage.transaction_exists(date(2024, 3, 5), '지출', 12000, '식비', "간식")
+
+
+class ArchivedYearStorage(EmbeddedStorage):
+    """MySQL의 보관 연도 트리거처럼 2023년 행을 INSERT IGNORE가 조용히 건너뛰고,
+    저장 직전에 다른 세션이 '간식' 거래를 먼저 저장하는 저장소"""
+
+    def insert_ignore(self, rows):
+        super().insert_ignore([row for row in rows if row[4] == "간식"])
+        return super().insert_ignore([row for row in rows if row[0].year != 2023])
+
+
+def test_rows_skipped_for_other_reasons_are_not_duplicates():
+    storage = ArchivedYearStorage(':memory:', analytics=False)
+    try:
+        [report] = run_import(storage)
+    finally:
+        storage.close()
+
+    # '간식'은 그 사이 저장된 중복 2건(청크 안 1건 포함), 2023년 행은 중복이 아닌 건너뜀
+    assert (report['inserted'], report['duplicates'], report['skipped']) == (1, 2, 1)
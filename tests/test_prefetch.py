@@ -0,0 +1,119 @@
+"""페이지 동시 조회: 조회별 결과 격리, ContextVar 전달, 캐시 재사용, 시작 전 조회 취소"""
+
+import contextvars
+import threading
+
+import pytest
+
+from instrumentation import Recorder, activate, deactivate, record
+from prefetch import Prefetcher
+from query_cache import QueryCache, cached
+
+page = contextvars.ContextVar('page', default=None)
+
+
+@pytest.fixture
+def prefetcher():
+    prefetcher = Prefetcher(max_workers=2)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def test_errors_and_timeouts_stay_in_their_own_result(prefetcher):
+    release = threading.Event()
+
+    def fail():
+        raise ValueError("조회 오류")
+
+    results = prefetcher.fetch({'ok': lambda: 42, 'fail': fail, 'slow': release.wait}, timeout=0.1)
+    release.set()
+
+    assert results['ok'].ok and results['ok'].value == 42
+    assert isinstance(results['fail'].error, ValueError)
+    assert isinstance(results['slow'].error, TimeoutError)
+
+
+def test_context_vars_reach_workers_without_leaking(prefetcher):
+    recorder = Recorder(page="대시보드")
+    token = activate(recorder)
+    page_token = page.set("대시보드")
+
+    def query(name):
+        # 작업 스레드에서 바꾼 값은 그 조회의 복사본에만 남음
+        seen = page.get()
+        page.set(name)
+        record('sql', name, 0.01, rows=1)
+        return seen
+
+    try:
+        results = prefetcher.fetch({name: (lambda name=name: query(name)) for name in ('월별', '잔고')})
+    finally:
+        page.reset(page_token)
+        deactivate(token)
+
+    assert {name: result.value for name, result in results.items()} == {'월별': "대시보드", '잔고': "대시보드"}
+    assert sorted(name for _, name, _, _, _ in recorder.events) == ['월별', '잔고']
+    assert page.get() is None
+
+
+def test_prefetched_cached_queries_are_reused(prefetcher):
+    cache = QueryCache()
+    calls = []
+
+    @cached(lambda: cache, ttl=60)
+    def fetch_month(year_month):
+        calls.append(year_month)
+        return {'month': year_month}
+
+    # app.prefetch처럼 캐시된 조회 함수를 작업 스레드에서 실행하면 결과가 조회 캐시에 남음
+    results = prefetcher.fetch({'month': lambda: fetch_month('2024-05')})
+
+    assert results['month'].value == {'month': '2024-05'}
+    assert fetch_month('2024-05') == {'month': '2024-05'}
+    assert calls == ['2024-05']
+    assert cache.stats()['hits'] == 1
+
+
+def blocked_fetch(prefetcher, owner):
+    """작업 스레드 하나를 막아 둔 채 두 번째 조회가 대기 중인 fetch를 다른 스레드에서 시작"""
+    started, release = threading.Event(), threading.Event()
+    results = {}
+
+    def blocker():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    thread = threading.Thread(target=lambda: results.update(
+        prefetcher.fetch({'blocker': blocker, 'queued': lambda: 'ran'}, timeout=5, owner=owner)
+    ))
+    thread.start()
+    assert started.wait(5)
+    return thread, release, results
+
+
+def test_cancel_drops_queued_queries_of_owner():
+    prefetcher = Prefetcher(max_workers=1)
+    try:
+        thread, release, results = blocked_fetch(prefetcher, owner='session-1')
+
+        prefetcher.cancel('session-1')
+        release.set()
+        thread.join(5)
+
+        assert results['blocker'].value == 'done'
+        assert isinstance(results['queued'].error, TimeoutError)
+    finally:
+        prefetcher.shutdown()
+
+
+def test_shutdown_cancels_queued_queries():
+    prefetcher = Prefetcher(max_workers=1)
+    thread, release, results = blocked_fetch(prefetcher, owner='session-1')
+
+    prefetcher.shutdown()
+    release.set()
+    thread.join(5)
+
+    assert results['blocker'].value == 'done'
+    assert isinstance(results['queued'].error, TimeoutError)
@@ -0,0 +1,63 @@
+"""조회 결과 캐시: 반환값 수정이 캐시를 오염시키지 않는지, 태그 무효화"""
+
+import pandas as pd
+
+from analytics import MonthlyStats
+from query_cache import QueryCache, cached
+
+
+def make_cached(func, tags=None):
+    cache = QueryCache(max_entries=8)
+    return cache, cached(lambda: cache, ttl=60, tags=tags)(func)
+
+
+def test_mutating_frame_inside_tuple_does_not_change_cache():
+    calls = []
+
+    def fetch_page(page):
+        calls.append(page)
+        return pd.DataFrame({'amount': [1000.0, 2000.0]}), True
+
+    _, fetch = make_cached(fetch_page)
+    frame, _ = fetch(1)
+    frame.loc[0, 'amount'] = -1.0
+    frame['extra'] = 'x'
+
+    cached_frame, has_more = fetch(1)
+    assert calls == [1]
+    assert has_more is True
+    assert cached_frame['amount'].tolist() == [1000.0, 2000.0]
+    assert 'extra' not in cached_frame.columns
+
+
+def test_mutating_dataclass_frame_does_not_change_cache():
+    def fetch_stats(year_month):
+        return MonthlyStats.from_rows(year_month, [
+            {'kind': 'category', 'transaction_date': None, 'transaction_type': '지출',
+             'category': '식비', 'total': 5000},
+        ])
+
+    _, fetch = make_cached(fetch_stats)
+    stats = fetch('2024-05')
+    stats.categories.loc[0, 'total'] = 0.0
+    stats.categories.drop(index=0, inplace=True)
+
+    again = fetch('2024-05')
+    assert again.categories['total'].tolist() == [5000.0]
+    assert again.expense == 5000.0
+
+
+def test_invalidate_removes_only_tagged_entries():
+    calls = []
+
+    def fetch_month(year_month):
+        calls.append(year_month)
+        return year_month
+
+    cache, fetch = make_cached(fetch_month, tags=lambda year_month: [f"month:{year_month}"])
+    fetch('2024-05')
+    fetch('2024-06')
+    assert cache.invalidate('month:2024-05') == 1
+    fetch('2024-05')
+    fetch('2024-06')
+    assert calls == ['2024-05', '2024-06', '2024-05']
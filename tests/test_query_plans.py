@@ -0,0 +1,48 @@
+"""월 단위 조회가 반개구간 조건으로 인덱스 range 접근을 쓰는지 EXPLAIN으로 확인 (migrations/001, 002)"""
+
+import pytest
+
+from db import month_range
+from storage import MONTHLY_DATA_SQL, MONTHLY_STATS_SQL, MONTHLY_TOTALS_SQL
+
+# 행이 너무 적으면 옵티마이저가 인덱스 대신 전체 스캔을 고를 수 있음
+MIN_ROWS = 1000
+
+# (조회, 파라미터를 만드는 함수, {테이블: (기대 접근 방식, 기대 인덱스)})
+# 요약 테이블의 한 달(month_start = %s)은 기본 키 앞부분 동등 조건이라 ref
+MONTH_QUERIES = {
+    "월별 일자별 합계": (MONTHLY_DATA_SQL, lambda start, end: (start, end),
+                   {'transactions': ('range', 'idx_date_type_category_amount')}),
+    "월별 통계": (MONTHLY_STATS_SQL, lambda start, end: (start, end, start),
+              {'transactions': ('range', 'idx_date_type_category_amount'), 'monthly_summary': ('ref', 'PRIMARY')}),
+    "추이 분석 월별 합계": (MONTHLY_TOTALS_SQL, lambda start, end: (start, end),
+                    {'monthly_summary': ('range', 'PRIMARY')}),
+}
+
+
+@pytest.fixture(scope='module')
+def busiest_month(mysql_connection):
+    with mysql_connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) as count FROM transactions")
+        if cursor.fetchone()['count'] < MIN_ROWS:
+            pytest.skip(f"거래가 {MIN_ROWS}건 미만 (benchmarks/ledger_gen.py로 데이터 생성)")
+        cursor.execute("""
+            SELECT DATE_FORMAT(transaction_date, '%Y-%m') as year_month
+            FROM transactions
+            GROUP BY year_month
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)
+        return cursor.fetchone()['year_month']
+
+
+@pytest.mark.parametrize('name', list(MONTH_QUERIES))
+def test_month_query_uses_range_access(mysql_connection, busiest_month, name):
+    sql, params, expected = MONTH_QUERIES[name]
+    with mysql_connection.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params(*month_range(busiest_month)))
+        plan = [row for row in cursor.fetchall() if row['table'] in expected]
+
+    assert {row['table'] for row in plan} == set(expected)
+    for row in plan:
+        assert (row['type'], row['key']) == expected[row['table']], f"{name} {row['table']}: {row['type']} (key={row['key']})"
@@ -0,0 +1,125 @@
+"""추이 분석: 학기 구분, 연도가 바뀌는 전월/전년 비교, 지난 달 합계 표 캐시"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from analytics import TrendStats, month_totals_frame, semester_labels
+
+
+def totals(*rows):
+    """(월 1일, 유형, 카테고리, 금액) 행들의 month_totals_frame"""
+    return month_totals_frame([(pd.Timestamp(month), kind, category, total) for month, kind, category, total in rows])
+
+
+def test_semester_labels_split_at_march_and_september():
+    months = pd.date_range('2023-01-01', '2024-12-01', freq='MS')
+
+    labels = dict(zip(months.strftime('%Y-%m'), semester_labels(months)))
+
+    # 1~2월은 전년도 2학기 (겨울방학), 3~8월은 1학기 (여름방학 포함), 9~12월은 2학기
+    assert labels['2023-01'] == labels['2023-02'] == '2022-2학기'
+    assert labels['2023-03'] == labels['2023-08'] == '2023-1학기'
+    assert labels['2023-09'] == labels['2023-12'] == labels['2024-02'] == '2023-2학기'
+    assert labels['2024-03'] == '2024-1학기'
+    assert labels['2024-12'] == '2024-2학기'
+
+
+def test_month_summary_compares_across_year_boundary():
+    closed = totals(
+        ('2023-01-01', '지출', '식비', 50000),
+        ('2023-12-01', '지출', '식비', 80000),
+        ('2023-12-01', '수입', '회비', 200000),
+    )
+    current = totals(('2024-01-01', '지출', '식비', 100000))
+
+    stats = TrendStats.from_frames([closed, current], date(2024, 1, 1))
+    summary = stats.month_summary(date(2024, 1, 1))
+
+    # 거래 없는 달(2023-02~11)도 0으로 채운 연속 구간이라 shift(1)/shift(12)가 전월/전년 동월
+    assert len(stats.monthly) == 13
+    assert summary.loc['지출', '전월'] == 80000
+    assert summary.loc['지출', '전년 동월'] == 50000
+    assert summary.loc['지출', '전년 대비(%)'] == pytest.approx(100.0)
+    assert summary.loc['수입', '이번 달'] == 0
+    assert summary.loc['잔액', '전월'] == 120000
+
+
+def test_from_frames_extends_to_current_month_without_transactions():
+    closed = totals(('2023-11-01', '지출', '식비', 10000))
+
+    stats = TrendStats.from_frames([closed, pd.DataFrame()], date(2024, 2, 1))
+
+    assert [month.strftime('%Y-%m') for month in stats.monthly.index] == ['2023-11', '2023-12', '2024-01', '2024-02']
+    assert stats.monthly['지출'].tolist() == [10000, 0, 0, 0]
+
+
+def test_semesters_compare_with_same_semester_last_year():
+    frame = totals(
+        ('2022-09-01', '지출', '행사비', 100000),
+        ('2023-02-01', '지출', '식비', 20000),
+        ('2023-03-01', '지출', '식비', 30000),
+        ('2023-09-01', '지출', '행사비', 150000),
+        ('2024-01-01', '지출', '식비', 30000),
+    )
+
+    table = TrendStats.from_frames([frame], date(2024, 1, 1)).semesters()
+
+    assert table.index.tolist() == ['2022-2학기', '2023-1학기', '2023-2학기']
+    assert table['지출'].tolist() == [120000, 30000, 180000]
+    assert table.loc['2023-2학기', '지출 전년 대비(%)'] == pytest.approx(50.0)
+    assert pd.isna(table.loc['2023-1학기', '지출 전년 대비(%)'])
+
+
+@pytest.fixture
+def trend_app(embedded_storage, monkeypatch):
+    """임베디드 저장소를 쓰고 fetch_monthly_totals 호출을 기록하는 app 모듈"""
+    pytest.importorskip('streamlit')
+    import app
+
+    calls = []
+    fetch = embedded_storage.fetch_monthly_totals
+
+    def counting_fetch(start_month, end_month):
+        calls.append((start_month, end_month))
+        return fetch(start_month, end_month)
+
+    monkeypatch.setattr(embedded_storage, 'fetch_monthly_totals', counting_fetch)
+    monkeypatch.setattr(app, 'get_storage', lambda: embedded_storage)
+    app.get_query_cache().clear()
+    yield app, calls
+    app.get_query_cache().clear()
+
+
+def test_closed_month_totals_are_cached_until_backdated_write(trend_app, embedded_storage):
+    app, calls = trend_app
+    this_month = date.today().replace(day=1)
+    backdated = date(this_month.year - 1, this_month.month, 1)
+    embedded_storage.insert_ignore([(backdated, '지출', 10000, '식비', "지난해 간식")])
+
+    first = app._fetch_closed_month_totals(this_month)
+    assert app._fetch_closed_month_totals(this_month).equals(first)
+    assert len(calls) == 1
+
+    # 이번 달 거래는 지난 달 합계 표를 무효화하지 않음
+    app.invalidate_cache(date.today(), '식비')
+    app._fetch_closed_month_totals(this_month)
+    assert len(calls) == 1
+
+    # 지난 달에 소급 입력하면 closed_months 태그로 다시 조회
+    embedded_storage.insert_ignore([(backdated, '지출', 5000, '식비', "소급 입력")])
+    app.invalidate_cache(backdated, '식비')
+    refreshed = app._fetch_closed_month_totals(this_month)
+    assert len(calls) == 2
+    assert refreshed.loc[pd.Timestamp(backdated), ('지출', '식비')] == 15000
+
+
+def test_new_month_reads_closed_totals_again(trend_app):
+    app, calls = trend_app
+
+    app._fetch_closed_month_totals(date(2024, 6, 1))
+    app._fetch_closed_month_totals(date(2024, 7, 1))
+
+    # 달이 바뀌면 before 인자가 달라 이전 달 캐시를 쓰지 않음
+    assert [end_month for _, end_month in calls] == [date(2024, 6, 1), date(2024, 7, 1)]
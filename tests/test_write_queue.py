@@ -0,0 +1,129 @@
+"""저장 대기열: 반영 결과(저장/중복/보류)를 on_flushed로 알리고 보류 항목을 다시 시도"""
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from budget import BudgetEngine
+from storage import EmbeddedStorage
+from write_queue import WriteQueue
+
+SAVED = (date(2024, 5, 1), '지출', Decimal(12000), '식비', "정기 모임 간식")
+EXISTING = (date(2024, 5, 2), '지출', Decimal(8000), '교통비', "택시")
+# transaction_type CHECK 제약 위반: INSERT OR IGNORE가 경고 없이 건너뜀
+REJECTED = (date(2024, 5, 3), '기타', Decimal(5000), '식비', "유형 오류")
+FAILING = (date(2024, 5, 4), '지출', Decimal(3000), '식비', "저장 오류")
+
+
+class FailingStorage(EmbeddedStorage):
+    """설명이 FAILING인 행이 들어 있으면 묶음 전체를 오류로 거부하는 저장소"""
+
+    def insert_ignore(self, rows):
+        if any(row[4] == FAILING[4] for row in rows):
+            raise sqlite3.IntegrityError("저장 오류")
+        return super().insert_ignore(rows)
+
+
+@pytest.fixture
+def storage():
+    storage = FailingStorage(':memory:', analytics=False)
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def queue():
+    queue = WriteQueue(':memory:')
+    yield queue
+    queue.close()
+
+
+def test_flush_reports_saved_duplicate_and_failed_rows(storage, queue):
+    storage.insert_ignore([EXISTING])
+    for row in (SAVED, EXISTING, REJECTED, FAILING):
+        assert queue.enqueue(*row) == 'queued'
+    calls = []
+
+    totals = queue.flush(storage, on_flushed=lambda *rows: calls.append(rows))
+
+    assert totals == {'saved': 1, 'duplicates': 1, 'failed': 2}
+    [(saved, duplicates, failed)] = calls
+    assert (saved, duplicates) == ([SAVED], [EXISTING])
+    assert sorted(failed) == [REJECTED, FAILING]
+    assert queue.counts() == (0, 2)
+
+
+def enqueue_pending(queue, engine, *rows):
+    """app.save_transaction의 대기열 경로: 저널에 넣고 반영 전까지 예산 대기 지출로 더함"""
+    for row in rows:
+        assert queue.enqueue(*row) == 'queued'
+        engine.add_pending(*row)
+
+
+def test_queued_expenses_survive_reload_until_flushed(storage, queue):
+    storage.insert_ignore([EXISTING])
+    engine = BudgetEngine(storage)
+    enqueue_pending(queue, engine, SAVED, EXISTING, FAILING)
+    queued_spend = EXISTING[2] + SAVED[2] + EXISTING[2] + FAILING[2]
+    assert engine.spent('2024-05') == queued_spend
+
+    # 주기적 새로 읽기/일괄 가져오기 후 reload()는 DB 내용만 읽지만 대기 지출은 그대로 남음
+    engine.reload()
+    assert engine.spent('2024-05') == queued_spend
+
+    queue.flush(storage, on_flushed=engine.queue_flushed)
+
+    assert engine.spent('2024-05') == EXISTING[2] + SAVED[2]
+    assert engine.verify() == []
+
+
+def test_reload_during_flush_does_not_double_count(storage, queue):
+    engine = BudgetEngine(storage)
+    enqueue_pending(queue, engine, SAVED)
+
+    def reload_then_settle(saved, duplicates, failed):
+        # 저장 커밋 뒤 콜백 전에 다른 세션이 새로 읽은 경우
+        engine.reload()
+        engine.queue_flushed(saved, duplicates, failed)
+
+    queue.flush(storage, on_flushed=reload_then_settle)
+
+    assert engine.spent('2024-05') == SAVED[2]
+
+
+def test_retried_rows_are_pending_again(storage, queue):
+    engine = BudgetEngine(storage)
+    enqueue_pending(queue, engine, FAILING)
+    queue.flush(storage, on_flushed=engine.queue_flushed)
+    assert engine.spent('2024-05') == 0
+
+    for row in queue.retry_failed():
+        engine.add_pending(*row)
+    assert engine.spent('2024-05') == FAILING[2]
+    # 앱을 다시 시작해 pending_rows()로 다시 채워도 같은 거래는 한 번만 더함
+    for row in queue.pending_rows():
+        engine.add_pending(*row)
+    assert engine.spent('2024-05') == FAILING[2]
+
+
+def test_unknown_flushed_rows_do_not_go_negative(storage, queue):
+    # 예산을 읽지 못해 대기 지출 없이 대기열에 넣은 거래 (app.save_transaction의 예외 경로)
+    storage.insert_ignore([EXISTING])
+    engine = BudgetEngine(storage)
+    engine.reload()
+    queue.enqueue(*EXISTING)
+
+    queue.flush(storage, on_flushed=engine.queue_flushed)
+
+    assert engine.spent('2024-05') == EXISTING[2]
+
+
+def test_retry_failed_returns_rows_and_requeues_them(storage, queue):
+    queue.enqueue(*FAILING)
+    queue.flush(storage)
+
+    assert queue.retry_failed() == [FAILING]
+    assert queue.counts() == (1, 0)
+    assert queue.retry_failed() == []
@@ -0,0 +1,312 @@
+"""
+solux 회계 관리 시스템 - 로컬 저장 대기열
+검증된 거래를 로컬 SQLite 저널에 먼저 기록하고, 백그라운드 스레드가 저장소로 묶어서 반영 (Streamlit 의존 없음)
+원격 DB가 느리거나 잠시 끊겨도 입력한 거래가 사라지지 않으며, 재시작하면 남은 항목부터 반영한다.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pymysql
+
+from content_hash import transaction_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUEUE_PATH = os.path.join(BASE_DIR, "data", "write_queue.db")
+
+QUEUE_SCHEMA = """
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS pending_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    transaction_date TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    queued_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+"""
+
+# 연결 문제로 보고 같은 묶음을 나중에 다시 보내는 오류
+# (그 밖의 오류는 한 행씩 다시 보내 문제 행만 실패로 보류하고 나머지는 반영)
+RETRYABLE_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError, sqlite3.OperationalError, OSError)
+
+# 트리거의 SIGNAL(보관된 회계연도 거래 거부, migrations/008)은 OperationalError로 오지만 다시 보내도 같은 결과
+ER_SIGNAL_EXCEPTION = 1644
+
+
+def _retryable(error):
+    if isinstance(error, pymysql.err.OperationalError) and error.args and error.args[0] == ER_SIGNAL_EXCEPTION:
+        return False
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def _row_params(row):
+    """저널의 (날짜, 유형, 금액, 카테고리, 설명) 문자열 행 → 저장소에 넘기는 값"""
+    transaction_date, transaction_type, amount, category, description = row
+    return date.fromisoformat(transaction_date), transaction_type, Decimal(amount), category, description
+
+
+class WriteQueue:
+    """거래 저장 대기열 (로컬 SQLite 저널 + 백그라운드 반영 스레드)
+
+    enqueue()는 저널에 커밋(synchronous=FULL)만 하고 바로 반환한다.
+    반영은 내용 해시로 이미 저장된 행을 빼고 INSERT IGNORE로 보내므로(unique_transaction 키),
+    DB 커밋 후 저널 삭제 전에 멈춰 같은 묶음을 다시 보내도 거래가 두 번 저장되지 않는다.
+    연결 오류가 나면 묶음을 저널에 남긴 채 interval부터 max_backoff까지 두 배씩 늘려 다시 시도한다.
+    """
+
+    def __init__(self, path=QUEUE_PATH, batch_size=500, interval=2.0, max_backoff=60.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.executescript(QUEUE_SCHEMA)
+        # 커밋마다 디스크에 기록 (대기열의 목적이 유실 방지이므로 NORMAL보다 강하게)
+        self._connection.execute("PRAGMA synchronous = FULL")
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._status_lock = threading.Lock()
+        self.saved = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.last_flush_at = None
+        self.last_error = None
+        self.last_error_at = None
+        self.retry_at = None
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params)
+
+    def enqueue(self, transaction_date, transaction_type, amount, category, description):
+        """거래를 저널에 기록하고 반영 스레드를 깨움
+
+        반환값: 'queued', 또는 같은 내용이 이미 대기 중이면 'duplicate'
+        """
+        content_hash = transaction_hash(transaction_date, transaction_type, amount, category, description)
+        cursor = self._execute(
+            "INSERT OR IGNORE INTO pending_writes "
+            "(content_hash, transaction_date, transaction_type, amount, category, description, queued_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (content_hash, transaction_date.isoformat(), transaction_type, str(Decimal(str(amount))),
+             category, description, datetime.now().isoformat(timespec='seconds'))
+        )
+        if cursor.rowcount == 0:
+            return 'duplicate'
+        self._wake.set()
+        return 'queued'
+
+    def counts(self):
+        """(반영 대기 수, 실패로 보류된 수)"""
+        row = self._execute(
+            "SELECT COALESCE(SUM(failed = 0), 0), COALESCE(SUM(failed <> 0), 0) FROM pending_writes"
+        ).fetchone()
+        return row[0], row[1]
+
+    def failed_rows(self, limit=50):
+        """실패로 보류된 항목 [(id, 날짜, 유형, 금액, 카테고리, 설명, 오류)]"""
+        return self._execute(
+            "SELECT id, transaction_date, transaction_type, amount, category, description, last_error "
+            "FROM pending_writes WHERE failed <> 0 ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+
+    def pending_rows(self):
+        """반영 대기 중인(보류 제외) 행 목록 (날짜, 유형, 금액, 카테고리, 설명)"""
+        rows = self._execute(
+            "SELECT transaction_date, transaction_type, amount, category, description "
+            "FROM pending_writes WHERE failed = 0 ORDER BY id"
+        ).fetchall()
+        return [_row_params(row) for row in rows]
+
+    def retry_failed(self):
+        """보류된 항목을 다시 반영 대상으로 돌리고 그 행 목록 (날짜, 유형, 금액, 카테고리, 설명)을 반환
+
+        보류될 때 on_flushed로 뺀 예산 대기 지출을 호출자가 다시 더할 수 있도록 행을 돌려준다.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT transaction_date, transaction_type, amount, category, description "
+                "FROM pending_writes WHERE failed <> 0 ORDER BY id"
+            ).fetchall()
+            self._connection.execute("UPDATE pending_writes SET failed = 0 WHERE failed <> 0")
+        self._wake.set()
+        return [_row_params(row) for row in rows]
+
+    def status(self):
+        """반영 상태 dict (대기/보류 수, 누적 반영/중복/실패 수, 마지막 반영/오류 시각)"""
+        pending, failed_rows = self.counts()
+        with self._status_lock:
+            return {
+                'pending': pending,
+                'failed_rows': failed_rows,
+                'saved': self.saved,
+                'duplicates': self.duplicates,
+                'failed': self.failed,
+                'last_flush_at': self.last_flush_at,
+                'last_error': self.last_error,
+                'last_error_at': self.last_error_at,
+                'retry_at': self.retry_at,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+    def _claim(self):
+        rows = self._execute(
+            "SELECT id, content_hash, transaction_date, transaction_type, amount, category, description "
+            "FROM pending_writes WHERE failed = 0 ORDER BY id LIMIT ?", (self.batch_size,)
+        ).fetchall()
+        return [(row[0], row[1], _row_params(row[2:])) for row in rows]
+
+    def _forget(self, ids):
+        with self._lock:
+            self._connection.executemany("DELETE FROM pending_writes WHERE id = ?", [(i,) for i in ids])
+
+    def _mark(self, ids, error, failed=False):
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE pending_writes SET attempts = attempts + 1, last_error = ?, failed = ? WHERE id = ?",
+                [(error, int(failed), i) for i in ids]
+            )
+
+    def _send(self, storage, batch):
+        """묶음을 저장소에 반영하고 (저장된 항목, 이미 있던 항목, DB가 거부한 항목) 반환, 오류는 그대로 올림"""
+        existing = storage.existing_hashes([content_hash for _, content_hash, _ in batch])
+        new_items = [item for item in batch if item[1] not in existing]
+        duplicates = [item for item in batch if item[1] in existing]
+        rejected = []
+        if new_items:
+            # 조회와 저장 사이에 다른 곳에서 저장된 행은 INSERT IGNORE가 건너뜀
+            inserted = storage.insert_ignore([params for _, _, params in new_items])
+            if inserted < len(new_items):
+                # INSERT IGNORE는 형식/제약 위반 행도 경고로 넘기므로 실제로 저장됐는지 다시 확인
+                stored = storage.existing_hashes([content_hash for _, content_hash, _ in new_items])
+                rejected = [item for item in new_items if item[1] not in stored]
+                new_items = [item for item in new_items if item[1] in stored]
+        return new_items, duplicates, rejected
+
+    def flush(self, storage, on_flushed=None):
+        """대기 중인 항목을 batch_size씩 모두 반영하고 이번에 반영/중복/실패한 수를 반환
+
+        on_flushed(저장된 행, 이미 있던 행, 보류된 행)는 묶음마다 호출된다 (행은 (날짜, 유형, 금액, 카테고리, 설명)).
+        보류된 행은 DB가 거부했거나 오류로 실패해 retry_failed() 전까지 다시 보내지 않는 행이다.
+        연결 오류는 아직 보내지 못한 항목을 저널에 남기고 그대로 올린다.
+        """
+        totals = {'saved': 0, 'duplicates': 0, 'failed': 0}
+        with self._flush_lock:
+            try:
+                while True:
+                    batch = self._claim()
+                    if not batch:
+                        break
+                    self._flush_batch(storage, batch, on_flushed, totals)
+            finally:
+                with self._status_lock:
+                    self.saved += totals['saved']
+                    self.duplicates += totals['duplicates']
+                    self.failed += totals['failed']
+        with self._status_lock:
+            self.last_flush_at = datetime.now()
+        return totals
+
+    def _flush_batch(self, storage, batch, on_flushed, totals):
+        saved, duplicates, failed = [], [], []
+        try:
+            try:
+                saved, duplicates, rejected = self._send(storage, batch)
+            except Exception as e:
+                if _retryable(e):
+                    self._mark([row_id for row_id, _, _ in batch], str(e))
+                    raise
+                # 묶음 전체가 오류로 거부되면 한 행씩 보내 문제 행만 보류
+                rejected = []
+                for item in batch:
+                    try:
+                        one_saved, one_duplicate, one_rejected = self._send(storage, [item])
+                    except Exception as e:
+                        if _retryable(e):
+                            self._mark([item[0]], str(e))
+                            raise
+                        self._mark([item[0]], str(e), failed=True)
+                        failed.append(item)
+                        continue
+                    saved += one_saved
+                    duplicates += one_duplicate
+                    rejected += one_rejected
+            self._mark([row_id for row_id, _, _ in rejected], "DB가 저장하지 않은 행 (형식/제약 위반)", failed=True)
+            failed += rejected
+        finally:
+            # 도중에 연결이 끊겨도 이미 보낸 항목은 저널에서 지우고 결과에 반영
+            self._forget([row_id for row_id, _, _ in saved + duplicates])
+            totals['saved'] += len(saved)
+            totals['duplicates'] += len(duplicates)
+            totals['failed'] += len(failed)
+            if on_flushed is not None and (saved or duplicates or failed):
+                try:
+                    on_flushed(
+                        [params for _, _, params in saved],
+                        [params for _, _, params in duplicates],
+                        [params for _, _, params in failed]
+                    )
+                except Exception as e:
+                    # 반영은 끝났으므로 후속 처리(캐시/예산 갱신) 오류는 기록만
+                    with self._status_lock:
+                        self.last_error = f"반영 후 처리 오류: {e}"
+                        self.last_error_at = datetime.now()
+
+    def start(self, storage, on_flushed=None):
+        """백그라운드 반영 스레드 시작 (시작하자마자 이전 실행에서 남은 항목부터 반영)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(storage, on_flushed), name="write-queue-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, storage, on_flushed):
+        delay = self.interval
+        while not self._stop.is_set():
+            try:
+                self.flush(storage, on_flushed)
+                delay = self.interval
+                with self._status_lock:
+                    self.retry_at = None
+            except Exception as e:
+                delay = min(delay * 2, self.max_backoff)
+                with self._status_lock:
+                    self.last_error = str(e)
+                    self.last_error_at = datetime.now()
+                    self.retry_at = datetime.now() + timedelta(seconds=delay)
+            # 새 항목이 들어오거나 flush_now()가 불리면 바로, 아니면 delay 뒤에 다시 확인
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def flush_now(self):
+        """반영 스레드를 깨워 기다리지 않고 바로 반영"""
+        self._wake.set()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._connection.close()